@@ -316,6 +316,24 @@ def system(session, disable_grpc):
         )
 
 
+@nox.session(python=DEFAULT_PYTHON_VERSION)
+def benchmark(session):
+    """Run the benchmarks of the handwritten client layer.
+
+    Extra arguments are passed to pytest-benchmark, e.g.
+    ``nox -s benchmark -- --benchmark-autosave`` to save the results for
+    comparison with ``--benchmark-compare``.
+    """
+    session.install("mock", "pytest", "pytest-benchmark")
+    session.install("-e", ".")
+    session.run(
+        "py.test",
+        "--benchmark-only",
+        os.path.join("tests", "benchmarks"),
+        *session.posargs,
+    )
+
+
 @nox.session(python=DEFAULT_PYTHON_VERSION)
 def cover(session):
     """Run the final coverage report.
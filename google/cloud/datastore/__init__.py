@@ -59,9 +59,12 @@ from google.cloud.datastore.version import __version__
 from google.cloud.datastore.batch import Batch
 from google.cloud.datastore.client import Client
 from google.cloud.datastore.entity import Entity
+from google.cloud.datastore.gql import GqlQuery
 from google.cloud.datastore.key import Key
 from google.cloud.datastore.query import Query
 from google.cloud.datastore.query_profile import ExplainOptions
+from google.cloud.datastore.query_profile import QueryProfiler
+from google.cloud.datastore.snapshot import Snapshot
 from google.cloud.datastore.transaction import Transaction
 
 __all__ = [
@@ -69,8 +72,11 @@ __all__ = [
     "Batch",
     "Client",
     "Entity",
+    "GqlQuery",
     "Key",
     "Query",
     "ExplainOptions",
+    "QueryProfiler",
+    "Snapshot",
     "Transaction",
 ]
@@ -0,0 +1,997 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process stand-in for the Datastore API, keeping entities in memory.
+
+Meant to measure the client-side overhead of realistic paging and batching
+without a network, e.g.::
+
+    from google.auth.credentials import AnonymousCredentials
+    from google.cloud.datastore._in_memory import InMemoryDatastoreAPI
+
+    client = datastore.Client(
+        project="my-project",
+        credentials=AnonymousCredentials(),
+        _datastore_api=InMemoryDatastoreAPI(),
+    )
+"""
+
+import collections
+import itertools
+import threading
+
+from google.api_core import exceptions
+from google.protobuf import timestamp_pb2
+
+from google.cloud.datastore_v1.types import datastore as datastore_pb2
+from google.cloud.datastore_v1.types import entity as entity_pb2
+from google.cloud.datastore_v1.types import query as query_pb2
+
+
+_MAX_LOOKUP_KEYS = 1000
+"""Most keys the backend accepts in one ``lookup`` request."""
+_MAX_MUTATIONS = 500
+"""Most mutations the backend accepts in one ``commit`` request."""
+_MAX_SKIPPED_RESULTS = 1000
+"""Most results the backend skips for an offset in one ``runQuery`` call."""
+_MAX_BATCH_SIZE = 300
+"""Default of the most results returned by one ``runQuery`` call."""
+_QUERY_CACHE_SIZE = 32
+"""Most query results kept for the following pages of the same queries."""
+
+_CURSOR_PREFIX = b"in-memory:"
+
+_MoreResults = query_pb2.QueryResultBatch.MoreResultsType
+_Operator = query_pb2.PropertyFilter.Operator
+_ResultType = query_pb2.EntityResult.ResultType
+
+
+class _Record(object):
+    """A stored entity, with its metadata."""
+
+    __slots__ = ("entity_pb", "version", "create_time", "update_time")
+
+    def __init__(self, entity_pb, version, create_time, update_time):
+        self.entity_pb = entity_pb
+        self.version = version
+        self.create_time = create_time
+        self.update_time = update_time
+
+
+class _Transaction(object):
+    """State of an open transaction: the versions of the entities it read.
+
+    Read-only transactions never conflict, so they keep no versions.
+    """
+
+    __slots__ = ("read_only", "read_versions")
+
+    def __init__(self, read_only):
+        self.read_only = read_only
+        self.read_versions = {}
+
+    def record_read(self, store_key, version):
+        """Remember the version of an entity when first read."""
+        if not self.read_only:
+            self.read_versions.setdefault(store_key, version)
+
+
+def _make_request_pb(request, request_type):
+    """Convert a request dict to a raw request protobuf."""
+    if not isinstance(request, request_type):
+        request = request_type(**request)
+    return request._pb
+
+
+def _now():
+    timestamp_pb = timestamp_pb2.Timestamp()
+    timestamp_pb.GetCurrentTime()
+    return timestamp_pb
+
+
+def _is_complete(key_pb):
+    if not key_pb.path:
+        return False
+    return key_pb.path[-1].WhichOneof("id_type") is not None
+
+
+def _path(key_pb):
+    """Get a key's path as a tuple, ordered like the backend orders keys."""
+    path = []
+    for element in key_pb.path:
+        if element.WhichOneof("id_type") == "name":
+            path.append((element.kind, 1, element.name))
+        else:
+            path.append((element.kind, 0, element.id))
+    return tuple(path)
+
+
+def _partition(key_pb, request_pb):
+    partition_id = key_pb.partition_id
+    return (
+        partition_id.project_id or request_pb.project_id,
+        partition_id.database_id or request_pb.database_id,
+        partition_id.namespace_id,
+    )
+
+
+def _request_partition(request_pb):
+    """Get the partition a query request runs in."""
+    partition_id = request_pb.partition_id
+    return (
+        partition_id.project_id or request_pb.project_id,
+        partition_id.database_id or request_pb.database_id,
+        partition_id.namespace_id,
+    )
+
+
+def _null_value():
+    value_pb = entity_pb2.Value()._pb
+    value_pb.null_value = 0
+    return value_pb
+
+
+def _value_key(value_pb):
+    """Get a sortable, hashable key of an indexable value.
+
+    Values of different types order like in the backend: null, numbers
+    and timestamps, booleans, blobs, strings, doubles, geo points, keys.
+
+    :rtype: tuple
+    :returns: The key, or None for entity and array values.
+    """
+    value_type = value_pb.WhichOneof("value_type")
+    if value_type == "null_value":
+        return (0,)
+    if value_type == "integer_value":
+        return (1, value_pb.integer_value)
+    if value_type == "timestamp_value":
+        timestamp = value_pb.timestamp_value
+        return (1, timestamp.seconds * 1000000 + timestamp.nanos // 1000)
+    if value_type == "boolean_value":
+        return (2, value_pb.boolean_value)
+    if value_type == "blob_value":
+        return (3, value_pb.blob_value)
+    if value_type == "string_value":
+        return (4, value_pb.string_value.encode("utf-8"))
+    if value_type == "double_value":
+        return (5, value_pb.double_value)
+    if value_type == "geo_point_value":
+        geo_point = value_pb.geo_point_value
+        return (6, geo_point.latitude, geo_point.longitude)
+    if value_type == "key_value":
+        return (7, _path(value_pb.key_value))
+    return None
+
+
+def _value_identity(value_pb):
+    """Get a hashable identity of any value, used to compare array elements."""
+    key = _value_key(value_pb)
+    if key is None:
+        return (8, value_pb.SerializeToString(deterministic=True))
+    return key
+
+
+def _elements(value_pb):
+    if value_pb.WhichOneof("value_type") == "array_value":
+        return value_pb.array_value.values
+    return (value_pb,)
+
+
+def _index_keys(entity_pb, name):
+    """Get the keys of the indexed values of a property.
+
+    :type name: str
+    :param name: The property name, ``__key__``, or a dotted path into
+                 embedded entities.
+
+    :rtype: list
+    :returns: The keys of the values, one per element of array values.
+    """
+    if name == "__key__":
+        return [(7, _path(entity_pb.key))]
+    properties = entity_pb.properties
+    if name in properties:
+        head, rest = name, ""
+    else:
+        head, _, rest = name.partition(".")
+        if head not in properties:
+            return []
+    keys = []
+    for element in _elements(properties[head]):
+        if element.exclude_from_indexes:
+            continue
+        if rest:
+            if element.WhichOneof("value_type") == "entity_value":
+                keys.extend(_index_keys(element.entity_value, rest))
+        else:
+            key = _value_key(element)
+            if key is not None:
+                keys.append(key)
+    return keys
+
+
+def _has_ancestor(key_pb, ancestor_pb):
+    ancestor_path = _path(ancestor_pb)
+    return _path(key_pb)[: len(ancestor_path)] == ancestor_path
+
+
+def _compare(op, key, target):
+    if op == _Operator.EQUAL:
+        return key == target
+    if op == _Operator.NOT_EQUAL:
+        return key != target
+    # Inequalities only match values of the same type.
+    if key[0] != target[0]:
+        return False
+    if op == _Operator.LESS_THAN:
+        return key < target
+    if op == _Operator.LESS_THAN_OR_EQUAL:
+        return key <= target
+    if op == _Operator.GREATER_THAN:
+        return key > target
+    if op == _Operator.GREATER_THAN_OR_EQUAL:
+        return key >= target
+    raise exceptions.InvalidArgument("Unsupported filter operator: %d" % (op,))
+
+
+def _matches(filter_pb, entity_pb):
+    """Check whether an entity matches a query filter."""
+    filter_type = filter_pb.WhichOneof("filter_type")
+    if filter_type is None:
+        return True
+    if filter_type == "composite_filter":
+        composite = filter_pb.composite_filter
+        results = (_matches(sub_filter, entity_pb) for sub_filter in composite.filters)
+        if composite.op == query_pb2.CompositeFilter.Operator.OR:
+            return any(results)
+        return all(results)
+
+    property_filter = filter_pb.property_filter
+    op = property_filter.op
+    if op == _Operator.HAS_ANCESTOR:
+        return _has_ancestor(entity_pb.key, property_filter.value.key_value)
+    keys = _index_keys(entity_pb, property_filter.property.name)
+    if op in (_Operator.IN, _Operator.NOT_IN):
+        targets = {
+            _value_key(value_pb)
+            for value_pb in property_filter.value.array_value.values
+        }
+        if op == _Operator.IN:
+            return any(key in targets for key in keys)
+        return any(key not in targets for key in keys)
+    target = _value_key(property_filter.value)
+    return any(_compare(op, key, target) for key in keys)
+
+
+def _project(entity_pb, names):
+    """Split an entity into projection results, one per array element."""
+    choices = []
+    for name in names:
+        if name not in entity_pb.properties:
+            return []
+        choices.append(
+            [
+                element
+                for element in _elements(entity_pb.properties[name])
+                if not element.exclude_from_indexes
+            ]
+        )
+    results = []
+    for values in itertools.product(*choices):
+        result_pb = entity_pb2.Entity()._pb
+        result_pb.key.CopyFrom(entity_pb.key)
+        for name, value_pb in zip(names, values):
+            result_pb.properties[name].CopyFrom(value_pb)
+        results.append(result_pb)
+    return results
+
+
+def _mask(entity_pb, paths):
+    """Copy an entity, keeping the top-level properties named in ``paths``."""
+    names = {path.partition(".")[0] for path in paths}
+    masked_pb = entity_pb2.Entity()._pb
+    masked_pb.key.CopyFrom(entity_pb.key)
+    for name, value_pb in entity_pb.properties.items():
+        if name in names:
+            masked_pb.properties[name].CopyFrom(value_pb)
+    return masked_pb
+
+
+def _make_cursor(position):
+    return _CURSOR_PREFIX + str(position).encode("ascii")
+
+
+def _parse_cursor(cursor, default):
+    if not cursor:
+        return default
+    if not cursor.startswith(_CURSOR_PREFIX):
+        raise exceptions.InvalidArgument("Invalid query cursor.")
+    try:
+        return int(cursor[len(_CURSOR_PREFIX) :])
+    except ValueError:
+        raise exceptions.InvalidArgument("Invalid query cursor.")
+
+
+def _count_index_entries(entity_pb):
+    if entity_pb is None:
+        return 0
+    return sum(len(_index_keys(entity_pb, name)) for name in entity_pb.properties) + 1
+
+
+def _numeric(value_pb):
+    value_type = value_pb.WhichOneof("value_type")
+    if value_type == "integer_value":
+        return value_pb.integer_value
+    if value_type == "double_value":
+        return value_pb.double_value
+    return None
+
+
+def _numeric_value(number):
+    value_pb = entity_pb2.Value()._pb
+    if isinstance(number, int):
+        value_pb.integer_value = number
+    else:
+        value_pb.double_value = number
+    return value_pb
+
+
+def _apply_transform(entity_pb, transform_pb, commit_time):
+    """Apply a property transform to an entity.
+
+    :rtype: :class:`.entity_pb2.Value`
+    :returns: The transform result returned in the mutation result.
+    """
+    name = transform_pb.property
+    properties = entity_pb.properties
+    current = properties[name] if name in properties else None
+    transform_type = transform_pb.WhichOneof("transform_type")
+
+    if transform_type == "set_to_server_value":
+        properties[name].timestamp_value.CopyFrom(commit_time)
+        return properties[name]
+
+    if transform_type in ("increment", "maximum", "minimum"):
+        operand = _numeric(getattr(transform_pb, transform_type))
+        value = None if current is None else _numeric(current)
+        if value is None:
+            result = operand
+        elif transform_type == "increment":
+            result = value + operand
+        elif transform_type == "maximum":
+            result = max(value, operand)
+        else:
+            result = min(value, operand)
+        properties[name].CopyFrom(_numeric_value(result))
+        return properties[name]
+
+    elements = []
+    if current is not None and current.WhichOneof("value_type") == "array_value":
+        elements = list(current.array_value.values)
+    operands = getattr(transform_pb, transform_type).values
+    if transform_type == "append_missing_elements":
+        present = {_value_identity(element) for element in elements}
+        for operand in operands:
+            identity = _value_identity(operand)
+            if identity not in present:
+                present.add(identity)
+                elements.append(operand)
+    else:
+        removed = {_value_identity(operand) for operand in operands}
+        elements = [
+            element for element in elements if _value_identity(element) not in removed
+        ]
+    array_value = entity_pb2.Value()._pb
+    array_value.array_value.SetInParent()
+    array_value.array_value.values.extend(elements)
+    properties[name].CopyFrom(array_value)
+    return _null_value()
+
+
+def _aggregate(aggregation_pb, entity_pbs):
+    """Compute one aggregation over the entities matching a query."""
+    operator = aggregation_pb.WhichOneof("operator")
+    if operator == "count":
+        count = len(entity_pbs)
+        if aggregation_pb.count.HasField("up_to"):
+            count = min(count, aggregation_pb.count.up_to.value)
+        return _numeric_value(count)
+
+    name = getattr(aggregation_pb, operator).property.name
+    numbers = []
+    for entity_pb in entity_pbs:
+        if name in entity_pb.properties:
+            number = _numeric(entity_pb.properties[name])
+            if number is not None:
+                numbers.append(number)
+    if operator == "sum":
+        return _numeric_value(sum(numbers))
+    if not numbers:
+        return _null_value()
+    return _numeric_value(float(sum(numbers)) / len(numbers))
+
+
+class InMemoryDatastoreAPI(object):
+    """An API object keeping entities in memory, without any network I/O.
+
+    Intended to provide the same methods as the GAPIC ``DatastoreClient``,
+    with the backend's paging and batching behavior: large lookups return
+    some of their keys as deferred, queries return their results in
+    batches, with cursors, and skip at most 1000 results per call for an
+    offset, and commits are limited in size.
+
+    Transactions are optimistic: committing a read-write one whose entities
+    were changed since it read them raises
+    :class:`~google.api_core.exceptions.Aborted`, as the backend does
+    under contention.
+
+    Cursors are positions in the query results, so they shift when
+    entities matching the query are added or removed. GQL queries and
+    reads at a ``read_time`` are rejected with
+    :class:`~google.api_core.exceptions.InvalidArgument`.
+
+    :type max_lookup_results: int
+    :param max_lookup_results: (Optional) Most keys answered by one
+                               ``lookup`` call; the others are returned as
+                               deferred. Defaults to answering all of them.
+
+    :type max_batch_size: int
+    :param max_batch_size: (Optional) Most results returned by one
+                           ``runQuery`` call. Defaults to 300.
+
+    :type max_mutations: int
+    :param max_mutations: (Optional) Most mutations accepted by one
+                          ``commit`` call. Defaults to 500.
+    """
+
+    def __init__(
+        self,
+        max_lookup_results=None,
+        max_batch_size=_MAX_BATCH_SIZE,
+        max_mutations=_MAX_MUTATIONS,
+    ):
+        self._max_lookup_results = max_lookup_results
+        self._max_batch_size = max_batch_size
+        self._max_mutations = max_mutations
+        self._lock = threading.Lock()
+        self._entities = {}
+        self._version = 0
+        self._last_id = 0
+        self._transaction_ids = itertools.count(1)
+        self._transactions = {}
+        self._query_cache = collections.OrderedDict()
+
+    def _begin(self, options_pb):
+        transaction_id = b"transaction-%d" % (next(self._transaction_ids),)
+        read_only = options_pb.WhichOneof("mode") == "read_only"
+        self._transactions[transaction_id] = _Transaction(read_only)
+        return transaction_id
+
+    def _get_transaction(self, transaction_id):
+        transaction = self._transactions.get(transaction_id)
+        if transaction is None:
+            raise exceptions.InvalidArgument(
+                "Invalid transaction: %r." % (transaction_id,)
+            )
+        return transaction
+
+    def _read_transaction(self, read_options_pb, response_pb):
+        """Get the transaction a read belongs to, starting it if requested."""
+        consistency_type = read_options_pb.WhichOneof("consistency_type")
+        if consistency_type == "read_time":
+            raise exceptions.InvalidArgument("read_time is not supported.")
+        if consistency_type == "transaction":
+            return self._get_transaction(read_options_pb.transaction)
+        if consistency_type == "new_transaction":
+            response_pb.transaction = self._begin(read_options_pb.new_transaction)
+            return self._transactions[response_pb.transaction]
+        return None
+
+    def _next_id(self):
+        self._last_id += 1
+        return self._last_id
+
+    def _matching_records(self, partition, query_pb):
+        """Get the records matching a query, in the query's order.
+
+        Cursors, offset and limit are left to the caller. The results of
+        the most recently run queries are cached until the next commit.
+
+        :rtype: list
+        :returns: Pairs of (result entity, record) protobufs.
+        """
+        template_pb = query_pb2.Query()._pb
+        template_pb.CopyFrom(query_pb)
+        for field in ("start_cursor", "end_cursor", "offset", "limit"):
+            template_pb.ClearField(field)
+        cache_key = (partition, template_pb.SerializeToString(deterministic=True))
+        results = self._query_cache.get(cache_key)
+        if results is not None:
+            self._query_cache.move_to_end(cache_key)
+            return results
+
+        if len(query_pb.kind) > 1:
+            raise exceptions.InvalidArgument("A query may only have one kind.")
+        kind = query_pb.kind[0].name if query_pb.kind else None
+        records = [
+            record
+            for (record_partition, path), record in self._entities.items()
+            if record_partition == partition
+            and (kind is None or path[-1][0] == kind)
+            and _matches(query_pb.filter, record.entity_pb)
+        ]
+
+        records.sort(key=lambda record: _path(record.entity_pb.key))
+        for order_pb in reversed(query_pb.order):
+            name = order_pb.property.name
+            descending = (
+                order_pb.direction == query_pb2.PropertyOrder.Direction.DESCENDING
+            )
+            pick = max if descending else min
+            keyed = []
+            for record in records:
+                keys = _index_keys(record.entity_pb, name)
+                if keys:
+                    keyed.append((pick(keys), record))
+            keyed.sort(key=lambda pair: pair[0], reverse=descending)
+            records = [record for _, record in keyed]
+
+        names = [projection_pb.property.name for projection_pb in query_pb.projection]
+        if not names or names == ["__key__"]:
+            results = [(record.entity_pb, record) for record in records]
+        else:
+            results = [
+                (result_pb, record)
+                for record in records
+                for result_pb in _project(record.entity_pb, names)
+            ]
+
+        distinct_on = [property_pb.name for property_pb in query_pb.distinct_on]
+        if distinct_on:
+            seen = set()
+            distinct = []
+            for result_pb, record in results:
+                values = tuple(
+                    tuple(_index_keys(result_pb, name)) for name in distinct_on
+                )
+                if values not in seen:
+                    seen.add(values)
+                    distinct.append((result_pb, record))
+            results = distinct
+
+        self._query_cache[cache_key] = results
+        if len(self._query_cache) > _QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return results
+
+    def lookup(self, request, **kwargs):
+        """Perform a ``lookup`` request.
+
+        :type request: :class:`.datastore_pb2.LookupRequest` or dict
+        :param request: Parameter bundle for API request.
+
+        :rtype: :class:`.datastore_pb2.LookupResponse`
+        :returns: The found and missing entities, and the deferred keys.
+        """
+        request_pb = _make_request_pb(request, datastore_pb2.LookupRequest)
+        if len(request_pb.keys) > _MAX_LOOKUP_KEYS:
+            raise exceptions.InvalidArgument(
+                "A lookup may have at most %d keys." % (_MAX_LOOKUP_KEYS,)
+            )
+        response = datastore_pb2.LookupResponse()
+        response_pb = response._pb
+
+        with self._lock:
+            transaction = self._read_transaction(request_pb.read_options, response_pb)
+            response_pb.read_time.CopyFrom(_now())
+            for index, key_pb in enumerate(request_pb.keys):
+                if not _is_complete(key_pb):
+                    raise exceptions.InvalidArgument("A lookup key must be complete.")
+                if (
+                    self._max_lookup_results is not None
+                    and index >= self._max_lookup_results
+                ):
+                    response_pb.deferred.add().CopyFrom(key_pb)
+                    continue
+
+                store_key = (_partition(key_pb, request_pb), _path(key_pb))
+                record = self._entities.get(store_key)
+                if transaction is not None:
+                    transaction.record_read(
+                        store_key, 0 if record is None else record.version
+                    )
+                if record is None:
+                    result_pb = response_pb.missing.add()
+                    result_pb.entity.key.CopyFrom(key_pb)
+                    result_pb.version = self._version
+                    continue
+
+                result_pb = response_pb.found.add()
+                if request_pb.HasField("property_mask"):
+                    result_pb.entity.CopyFrom(
+                        _mask(record.entity_pb, request_pb.property_mask.paths)
+                    )
+                else:
+                    result_pb.entity.CopyFrom(record.entity_pb)
+                result_pb.version = record.version
+                result_pb.create_time.CopyFrom(record.create_time)
+                result_pb.update_time.CopyFrom(record.update_time)
+        return response
+
+    def run_query(self, request, **kwargs):
+        """Perform a ``runQuery`` request.
+
+        :type request: :class:`.datastore_pb2.RunQueryRequest` or dict
+        :param request: Parameter bundle for API request.
+
+        :rtype: :class:`.datastore_pb2.RunQueryResponse`
+        :returns: The next batch of query results.
+        """
+        request_pb = _make_request_pb(request, datastore_pb2.RunQueryRequest)
+        if request_pb.WhichOneof("query_type") != "query":
+            raise exceptions.InvalidArgument("GQL queries are not supported.")
+        partition = _request_partition(request_pb)
+        query_pb = request_pb.query
+        response = datastore_pb2.RunQueryResponse()
+        response_pb = response._pb
+        batch_pb = response_pb.batch
+
+        names = [projection_pb.property.name for projection_pb in query_pb.projection]
+        if names == ["__key__"]:
+            batch_pb.entity_result_type = _ResultType.KEY_ONLY
+        elif names:
+            batch_pb.entity_result_type = _ResultType.PROJECTION
+        else:
+            batch_pb.entity_result_type = _ResultType.FULL
+
+        with self._lock:
+            transaction = self._read_transaction(request_pb.read_options, response_pb)
+            results = self._matching_records(partition, query_pb)
+            batch_pb.read_time.CopyFrom(_now())
+
+            position = _parse_cursor(query_pb.start_cursor, 0)
+            end = min(_parse_cursor(query_pb.end_cursor, len(results)), len(results))
+            position = min(position, end)
+
+            skipped = min(query_pb.offset, _MAX_SKIPPED_RESULTS, end - position)
+            position += skipped
+            batch_pb.skipped_results = skipped
+            if skipped:
+                batch_pb.skipped_cursor = _make_cursor(position)
+
+            if skipped < query_pb.offset and position < end:
+                batch_pb.more_results = _MoreResults.NOT_FINISHED
+                batch_pb.end_cursor = _make_cursor(position)
+                return response
+
+            available = end - position
+            limited = query_pb.HasField("limit") and query_pb.limit.value <= available
+            wanted = query_pb.limit.value if limited else available
+            count = min(wanted, self._max_batch_size)
+            for result_pb, record in results[position : position + count]:
+                position += 1
+                entity_result_pb = batch_pb.entity_results.add()
+                if batch_pb.entity_result_type == _ResultType.KEY_ONLY:
+                    entity_result_pb.entity.key.CopyFrom(result_pb.key)
+                elif request_pb.HasField("property_mask"):
+                    entity_result_pb.entity.CopyFrom(
+                        _mask(result_pb, request_pb.property_mask.paths)
+                    )
+                else:
+                    entity_result_pb.entity.CopyFrom(result_pb)
+                entity_result_pb.version = record.version
+                entity_result_pb.create_time.CopyFrom(record.create_time)
+                entity_result_pb.update_time.CopyFrom(record.update_time)
+                entity_result_pb.cursor = _make_cursor(position)
+                if transaction is not None:
+                    store_key = (partition, _path(record.entity_pb.key))
+                    transaction.record_read(store_key, record.version)
+
+        batch_pb.end_cursor = _make_cursor(position)
+        if count < wanted:
+            batch_pb.more_results = _MoreResults.NOT_FINISHED
+        elif limited and position < end:
+            batch_pb.more_results = _MoreResults.MORE_RESULTS_AFTER_LIMIT
+        elif end < len(results):
+            batch_pb.more_results = _MoreResults.MORE_RESULTS_AFTER_CURSOR
+        else:
+            batch_pb.more_results = _MoreResults.NO_MORE_RESULTS
+        return response
+
+    def run_aggregation_query(self, request, **kwargs):
+        """Perform a ``runAggregationQuery`` request.
+
+        :type request: :class:`.datastore_pb2.RunAggregationQueryRequest` or dict
+        :param request: Parameter bundle for API request.
+
+        :rtype: :class:`.datastore_pb2.RunAggregationQueryResponse`
+        :returns: The aggregation results.
+        """
+        request_pb = _make_request_pb(request, datastore_pb2.RunAggregationQueryRequest)
+        if request_pb.WhichOneof("query_type") != "aggregation_query":
+            raise exceptions.InvalidArgument("GQL queries are not supported.")
+        partition = _request_partition(request_pb)
+        aggregation_query_pb = request_pb.aggregation_query
+        query_pb = aggregation_query_pb.nested_query
+        response = datastore_pb2.RunAggregationQueryResponse()
+        response_pb = response._pb
+
+        with self._lock:
+            self._read_transaction(request_pb.read_options, response_pb)
+            results = self._matching_records(partition, query_pb)
+            start = _parse_cursor(query_pb.start_cursor, 0)
+            end = _parse_cursor(query_pb.end_cursor, len(results))
+            results = results[start:end][query_pb.offset :]
+            if query_pb.HasField("limit"):
+                results = results[: query_pb.limit.value]
+            entity_pbs = [result_pb for result_pb, _ in results]
+            response_pb.batch.read_time.CopyFrom(_now())
+
+        result_pb = response_pb.batch.aggregation_results.add()
+        for aggregation_pb in aggregation_query_pb.aggregations:
+            result_pb.aggregate_properties[aggregation_pb.alias].CopyFrom(
+                _aggregate(aggregation_pb, entity_pbs)
+            )
+        response_pb.batch.more_results = _MoreResults.NO_MORE_RESULTS
+        return response
+
+    def begin_transaction(self, request, **kwargs):
+        """Perform a ``beginTransaction`` request.
+
+        :type request: :class:`.datastore_pb2.BeginTransactionRequest` or dict
+        :param request: Parameter bundle for API request.
+
+        :rtype: :class:`.datastore_pb2.BeginTransactionResponse`
+        :returns: The ID of the new transaction.
+        """
+        request_pb = _make_request_pb(request, datastore_pb2.BeginTransactionRequest)
+        response = datastore_pb2.BeginTransactionResponse()
+        with self._lock:
+            response._pb.transaction = self._begin(request_pb.transaction_options)
+        return response
+
+    def rollback(self, request, **kwargs):
+        """Perform a ``rollback`` request.
+
+        :type request: :class:`.datastore_pb2.RollbackRequest` or dict
+        :param request: Parameter bundle for API request.
+
+        :rtype: :class:`.datastore_pb2.RollbackResponse`
+        :returns: An empty response.
+        """
+        request_pb = _make_request_pb(request, datastore_pb2.RollbackRequest)
+        with self._lock:
+            self._get_transaction(request_pb.transaction)
+            del self._transactions[request_pb.transaction]
+        return datastore_pb2.RollbackResponse()
+
+    def commit(self, request, **kwargs):
+        """Perform a ``commit`` request.
+
+        :type request: :class:`.datastore_pb2.CommitRequest` or dict
+        :param request: Parameter bundle for API request.
+
+        :rtype: :class:`.datastore_pb2.CommitResponse`
+        :returns: The result of each mutation.
+        :raises: :class:`~google.api_core.exceptions.Aborted` if entities
+                 read by the transaction changed since, and
+                 :class:`~google.api_core.exceptions.InvalidArgument` if
+                 the request has too many mutations.
+        """
+        request_pb = _make_request_pb(request, datastore_pb2.CommitRequest)
+        if len(request_pb.mutations) > self._max_mutations:
+            raise exceptions.InvalidArgument(
+                "A commit may have at most %d mutations." % (self._max_mutations,)
+            )
+        response = datastore_pb2.CommitResponse()
+        response_pb = response._pb
+
+        with self._lock:
+            transaction = None
+            if request_pb.mode == datastore_pb2.CommitRequest.Mode.TRANSACTIONAL:
+                selector = request_pb.WhichOneof("transaction_selector")
+                if selector == "transaction":
+                    transaction = self._get_transaction(request_pb.transaction)
+                    del self._transactions[request_pb.transaction]
+                elif selector == "single_use_transaction":
+                    read_only = (
+                        request_pb.single_use_transaction.WhichOneof("mode")
+                        == "read_only"
+                    )
+                    transaction = _Transaction(read_only)
+                else:
+                    raise exceptions.InvalidArgument(
+                        "A transactional commit needs a transaction."
+                    )
+
+            if transaction is not None:
+                if transaction.read_only and request_pb.mutations:
+                    raise exceptions.InvalidArgument(
+                        "Cannot modify entities in a read-only transaction."
+                    )
+                for store_key, version in transaction.read_versions.items():
+                    record = self._entities.get(store_key)
+                    if (0 if record is None else record.version) != version:
+                        raise exceptions.Aborted(
+                            "Aborted due to cross-transaction contention."
+                        )
+
+            commit_time = _now()
+            version = self._version + 1
+            pending = {}
+            for mutation_pb in request_pb.mutations:
+                self._apply_mutation(
+                    request_pb,
+                    mutation_pb,
+                    transaction is None,
+                    pending,
+                    version,
+                    commit_time,
+                    response_pb,
+                )
+
+            self._version = version
+            for store_key, record in pending.items():
+                if record is None:
+                    self._entities.pop(store_key, None)
+                else:
+                    self._entities[store_key] = record
+            if pending:
+                self._query_cache.clear()
+            response_pb.commit_time.CopyFrom(commit_time)
+        return response
+
+    def _apply_mutation(
+        self,
+        request_pb,
+        mutation_pb,
+        non_transactional,
+        pending,
+        version,
+        commit_time,
+        response_pb,
+    ):
+        """Apply one mutation of a commit to the ``pending`` writes."""
+        operation = mutation_pb.WhichOneof("operation")
+        if operation == "delete":
+            key_pb = mutation_pb.delete
+            entity_pb = None
+        else:
+            entity_pb = getattr(mutation_pb, operation)
+            key_pb = entity_pb.key
+
+        result_pb = response_pb.mutation_results.add()
+        if not _is_complete(key_pb):
+            if operation not in ("insert", "upsert"):
+                raise exceptions.InvalidArgument(
+                    "A %s mutation needs a complete key." % (operation,)
+                )
+            completed_pb = entity_pb2.Entity()._pb
+            completed_pb.CopyFrom(entity_pb)
+            completed_pb.key.path[-1].id = self._next_id()
+            entity_pb = completed_pb
+            key_pb = entity_pb.key
+            result_pb.key.CopyFrom(key_pb)
+
+        store_key = (_partition(key_pb, request_pb), _path(key_pb))
+        if store_key in pending:
+            if non_transactional:
+                raise exceptions.InvalidArgument(
+                    "A non-transactional commit may not contain multiple "
+                    "mutations affecting the same entity."
+                )
+            record = pending[store_key]
+        else:
+            record = self._entities.get(store_key)
+
+        strategy = mutation_pb.WhichOneof("conflict_detection_strategy")
+        if strategy == "base_version":
+            conflict = (0 if record is None else record.version) != (
+                mutation_pb.base_version
+            )
+        elif strategy == "update_time":
+            conflict = record is None or record.update_time != mutation_pb.update_time
+        else:
+            conflict = False
+        if conflict:
+            result_pb.conflict_detected = True
+            result_pb.version = 0 if record is None else record.version
+            return
+
+        if operation == "insert" and record is not None:
+            raise exceptions.AlreadyExists("Entity already exists: %s" % (key_pb,))
+        if operation == "update" and record is None:
+            raise exceptions.NotFound("No entity to update: %s" % (key_pb,))
+
+        result_pb.version = version
+        result_pb.update_time.CopyFrom(commit_time)
+        old_pb = None if record is None else record.entity_pb
+        if entity_pb is None:
+            pending[store_key] = None
+            response_pb.index_updates += _count_index_entries(old_pb)
+            return
+
+        new_pb = entity_pb2.Entity()._pb
+        if mutation_pb.HasField("property_mask") and old_pb is not None:
+            new_pb.CopyFrom(old_pb)
+            names = {path.partition(".")[0] for path in mutation_pb.property_mask.paths}
+            for name in names:
+                if name in entity_pb.properties:
+                    new_pb.properties[name].CopyFrom(entity_pb.properties[name])
+                elif name in new_pb.properties:
+                    del new_pb.properties[name]
+        elif mutation_pb.HasField("property_mask"):
+            new_pb.key.CopyFrom(key_pb)
+            for path in mutation_pb.property_mask.paths:
+                name = path.partition(".")[0]
+                if name in entity_pb.properties:
+                    new_pb.properties[name].CopyFrom(entity_pb.properties[name])
+        else:
+            new_pb.CopyFrom(entity_pb)
+        partition = store_key[0]
+        new_pb.key.partition_id.project_id = partition[0]
+        new_pb.key.partition_id.database_id = partition[1]
+
+        for transform_pb in mutation_pb.property_transforms:
+            result_pb.transform_results.add().CopyFrom(
+                _apply_transform(new_pb, transform_pb, commit_time)
+            )
+
+        create_time = commit_time if record is None else record.create_time
+        result_pb.create_time.CopyFrom(create_time)
+        pending[store_key] = _Record(new_pb, version, create_time, commit_time)
+        response_pb.index_updates += _count_index_entries(
+            old_pb
+        ) + _count_index_entries(new_pb)
+
+    def allocate_ids(self, request, **kwargs):
+        """Perform an ``allocateIds`` request.
+
+        :type request: :class:`.datastore_pb2.AllocateIdsRequest` or dict
+        :param request: Parameter bundle for API request.
+
+        :rtype: :class:`.datastore_pb2.AllocateIdsResponse`
+        :returns: The keys, completed with new IDs.
+        """
+        request_pb = _make_request_pb(request, datastore_pb2.AllocateIdsRequest)
+        response = datastore_pb2.AllocateIdsResponse()
+        with self._lock:
+            for key_pb in request_pb.keys:
+                if _is_complete(key_pb):
+                    raise exceptions.InvalidArgument(
+                        "Cannot allocate an ID for a complete key."
+                    )
+                completed_pb = response._pb.keys.add()
+                completed_pb.CopyFrom(key_pb)
+                completed_pb.path[-1].id = self._next_id()
+        return response
+
+    def reserve_ids(self, request, **kwargs):
+        """Perform a ``reserveIds`` request.
+
+        :type request: :class:`.datastore_pb2.ReserveIdsRequest` or dict
+        :param request: Parameter bundle for API request.
+
+        :rtype: :class:`.datastore_pb2.ReserveIdsResponse`
+        :returns: An empty response.
+        """
+        request_pb = _make_request_pb(request, datastore_pb2.ReserveIdsRequest)
+        with self._lock:
+            for key_pb in request_pb.keys:
+                if not _is_complete(key_pb):
+                    raise exceptions.InvalidArgument("Cannot reserve a partial key.")
+                if key_pb.path[-1].WhichOneof("id_type") == "id":
+                    self._last_id = max(self._last_id, key_pb.path[-1].id)
+        return datastore_pb2.ReserveIdsResponse()
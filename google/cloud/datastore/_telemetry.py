@@ -0,0 +1,296 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""OpenTelemetry instrumentation of the Datastore API calls."""
+
+import time
+
+from google.cloud.datastore import hooks as _hooks
+from google.cloud.datastore.version import __version__
+from google.cloud.datastore_v1.types import datastore as _datastore_pb2
+
+try:
+    from opentelemetry import metrics
+    from opentelemetry import trace
+except ImportError:  # pragma: NO COVER
+    _HAVE_OPENTELEMETRY = False
+else:
+    _HAVE_OPENTELEMETRY = True
+
+
+_INSTRUMENTATION_NAME = "google.cloud.datastore"
+_RPC_SERVICE = "google.datastore.v1.Datastore"
+
+_RPC_METHODS = {
+    "lookup": ("Lookup", _datastore_pb2.LookupRequest),
+    "run_query": ("RunQuery", _datastore_pb2.RunQueryRequest),
+    "run_aggregation_query": (
+        "RunAggregationQuery",
+        _datastore_pb2.RunAggregationQueryRequest,
+    ),
+    "begin_transaction": (
+        "BeginTransaction",
+        _datastore_pb2.BeginTransactionRequest,
+    ),
+    "commit": ("Commit", _datastore_pb2.CommitRequest),
+    "rollback": ("Rollback", _datastore_pb2.RollbackRequest),
+    "allocate_ids": ("AllocateIds", _datastore_pb2.AllocateIdsRequest),
+    "reserve_ids": ("ReserveIds", _datastore_pb2.ReserveIdsRequest),
+}
+"""RPC name and request type of each instrumented API method."""
+
+
+class _NullSpan(object):
+    """Stand-in for a span when the API calls are not instrumented."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _lookup_attributes(request_pb, response_pb):
+    return {
+        "datastore.keys": len(request_pb.keys),
+        "datastore.found": len(response_pb.found),
+        "datastore.missing": len(response_pb.missing),
+        "datastore.deferred": len(response_pb.deferred),
+    }
+
+
+def _run_query_attributes(request_pb, response_pb):
+    return {
+        "datastore.results": len(response_pb.batch.entity_results),
+        "datastore.skipped_results": response_pb.batch.skipped_results,
+    }
+
+
+def _run_aggregation_query_attributes(request_pb, response_pb):
+    return {"datastore.results": len(response_pb.batch.aggregation_results)}
+
+
+def _commit_attributes(request_pb, response_pb):
+    return {
+        "datastore.mutations": len(request_pb.mutations),
+        "datastore.index_updates": response_pb.index_updates,
+    }
+
+
+def _keys_attributes(request_pb, response_pb):
+    return {"datastore.keys": len(request_pb.keys)}
+
+
+_RESPONSE_ATTRIBUTES = {
+    "lookup": _lookup_attributes,
+    "run_query": _run_query_attributes,
+    "run_aggregation_query": _run_aggregation_query_attributes,
+    "commit": _commit_attributes,
+    "allocate_ids": _keys_attributes,
+    "reserve_ids": _keys_attributes,
+}
+"""Entity counts reported for the API methods which have some."""
+
+
+class _InstrumentedDatastoreAPI(object):
+    """Wrap a Datastore API object, tracing, timing or counting its calls.
+
+    With a tracer, each call gets a span named after the RPC, holding the
+    project, database, request / response sizes and entity counts. With a
+    meter, its duration is recorded in the ``datastore.client.rpc.duration``
+    histogram. With a stats recorder, it is added to the client's
+    :meth:`~google.cloud.datastore.client.Client.stats`.
+
+    :type datastore_api:
+        :class:`google.cloud.datastore._http.HTTPDatastoreAPI`
+        or :class:`google.cloud.datastore_v1.gapic.DatastoreClient`
+    :param datastore_api: The API object to wrap.
+
+    :type tracer: :class:`opentelemetry.trace.Tracer`
+    :param tracer: (Optional) The tracer used for the spans.
+
+    :type meter: :class:`opentelemetry.metrics.Meter`
+    :param meter: (Optional) The meter used for the metrics.
+
+    :type stats: :class:`~google.cloud.datastore.rpc_stats._RPCStatsRecorder`
+    :param stats: (Optional) The recorder of the client's statistics.
+
+    :type hooks: sequence of :class:`~google.cloud.datastore.hooks.ClientHook`
+    :param hooks: (Optional) The client's hooks, called around each call.
+    """
+
+    def __init__(self, datastore_api, tracer=None, meter=None, stats=None, hooks=()):
+        self._datastore_api = datastore_api
+        self._tracer = tracer
+        self._duration = None
+        if meter is not None:
+            self._duration = meter.create_histogram(
+                "datastore.client.rpc.duration",
+                unit="s",
+                description="Duration of Datastore API calls.",
+            )
+        self._stats = stats
+        self._hooks = hooks
+
+    def span(self, name, attributes=None):
+        """Start a span for an operation spanning several API calls.
+
+        :type name: str
+        :param name: The name of the span.
+
+        :type attributes: dict
+        :param attributes: (Optional) The initial attributes of the span.
+
+        :rtype: context manager
+        :returns: The span, current until the context exits, or a stand-in
+                  ignoring its attributes if calls are not traced.
+        """
+        if self._tracer is None:
+            return _NULL_SPAN
+        return self._tracer.start_as_current_span(name, attributes=attributes)
+
+    def _call(self, method_name, request, kwargs):
+        rpc_name, request_type = _RPC_METHODS[method_name]
+        if not isinstance(request, request_type):
+            request = request_type(**request)
+        if self._tracer is None:
+            return self._invoke(method_name, request, kwargs, _NULL_SPAN)
+
+        request_pb = request._pb
+        attributes = {
+            "rpc.service": _RPC_SERVICE,
+            "rpc.method": rpc_name,
+            "gcp.datastore.project_id": request_pb.project_id,
+            "gcp.datastore.database_id": request_pb.database_id,
+        }
+        with self._tracer.start_as_current_span(
+            "datastore." + rpc_name, attributes=attributes
+        ) as span:
+            return self._invoke(method_name, request, kwargs, span)
+
+    def _invoke(self, method_name, request, kwargs, span):
+        request_pb = request._pb
+        request_bytes = request_pb.ByteSize()
+        started = time.monotonic()
+        try:
+            with _hooks._stage(self._hooks, _hooks.RPC, method_name):
+                response = getattr(self._datastore_api, method_name)(
+                    request=request, **kwargs
+                )
+        except Exception as exc:
+            self._record(method_name, started, request_bytes, 0, type(exc).__name__)
+            raise
+
+        response_pb = response._pb
+        response_bytes = response_pb.ByteSize()
+        self._record(method_name, started, request_bytes, response_bytes, "OK")
+        span.set_attribute("datastore.request_bytes", request_bytes)
+        span.set_attribute("datastore.response_bytes", response_bytes)
+        if span is not _NULL_SPAN:
+            get_attributes = _RESPONSE_ATTRIBUTES.get(method_name)
+            if get_attributes is not None:
+                for key, value in get_attributes(request_pb, response_pb).items():
+                    span.set_attribute(key, value)
+        return response
+
+    def _record(self, method_name, started, request_bytes, response_bytes, status):
+        duration = time.monotonic() - started
+        if self._duration is not None:
+            self._duration.record(
+                duration,
+                {"rpc.method": _RPC_METHODS[method_name][0], "status": status},
+            )
+        if self._stats is not None:
+            self._stats.record(
+                method_name, duration, request_bytes, response_bytes, status != "OK"
+            )
+
+    def lookup(self, request, **kwargs):
+        return self._call("lookup", request, kwargs)
+
+    def run_query(self, request, **kwargs):
+        return self._call("run_query", request, kwargs)
+
+    def run_aggregation_query(self, request, **kwargs):
+        return self._call("run_aggregation_query", request, kwargs)
+
+    def begin_transaction(self, request, **kwargs):
+        return self._call("begin_transaction", request, kwargs)
+
+    def commit(self, request, **kwargs):
+        return self._call("commit", request, kwargs)
+
+    def rollback(self, request, **kwargs):
+        return self._call("rollback", request, kwargs)
+
+    def allocate_ids(self, request, **kwargs):
+        return self._call("allocate_ids", request, kwargs)
+
+    def reserve_ids(self, request, **kwargs):
+        return self._call("reserve_ids", request, kwargs)
+
+
+def span(datastore_api, name, attributes=None):
+    """Start a span for an operation, if the API calls are instrumented.
+
+    :type datastore_api: object
+    :param datastore_api: The client's Datastore API object.
+
+    :type name: str
+    :param name: The name of the span.
+
+    :type attributes: dict
+    :param attributes: (Optional) The initial attributes of the span.
+
+    :rtype: context manager
+    :returns: The span, or a stand-in ignoring its attributes if
+              ``datastore_api`` is not instrumented.
+    """
+    if isinstance(datastore_api, _InstrumentedDatastoreAPI):
+        return datastore_api.span(name, attributes)
+    return _NULL_SPAN
+
+
+def instrument(datastore_api, enable_telemetry, stats, hooks=()):
+    """Wrap a client's Datastore API object, if anything is to be recorded.
+
+    :type datastore_api: object
+    :param datastore_api: The API object to wrap.
+
+    :type enable_telemetry: bool
+    :param enable_telemetry: Whether to trace the calls and record their
+                             durations with OpenTelemetry.
+
+    :type stats: :class:`~google.cloud.datastore.rpc_stats._RPCStatsRecorder`
+    :param stats: The recorder of the client's statistics, or None.
+
+    :type hooks: sequence of :class:`~google.cloud.datastore.hooks.ClientHook`
+    :param hooks: (Optional) The client's hooks.
+
+    :rtype: object
+    :returns: The wrapped API object, or ``datastore_api`` itself.
+    """
+    if not enable_telemetry and stats is None and not hooks:
+        return datastore_api
+    tracer = meter = None
+    if enable_telemetry:
+        tracer = trace.get_tracer(_INSTRUMENTATION_NAME, __version__)
+        meter = metrics.get_meter(_INSTRUMENTATION_NAME, __version__)
+    return _InstrumentedDatastoreAPI(datastore_api, tracer, meter, stats, hooks)
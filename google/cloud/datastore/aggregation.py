@@ -14,6 +14,7 @@
 #
 # """Create / interact with Google Cloud Datastore aggregation queries."""
 import abc
+import concurrent.futures
 from abc import ABC
 
 from google.api_core import page_iterator
@@ -22,6 +23,10 @@ from google.cloud.datastore_v1.types import entity as entity_pb2
 from google.cloud.datastore_v1.types import query as query_pb2
 from google.cloud.datastore import helpers
 from google.cloud.datastore.query import _pb_from_query
+from google.cloud.datastore.query import KEY_PROPERTY_NAME
+from google.cloud.datastore.query import PropertyFilter
+from google.cloud.datastore.query import Query
+from google.cloud.datastore.query import _value_sort_key
 
 from google.cloud.datastore.query_profile import ExplainMetrics
 from google.cloud.datastore.query_profile import QueryExplainError
@@ -30,6 +35,14 @@ from google.cloud.datastore.query import _NOT_FINISHED
 from google.cloud.datastore.query import _FINISHED
 
 
+_SCATTER_PROPERTY_NAME = "__scatter__"
+"""Reserved property whose ordering samples keys evenly across a kind."""
+_SCATTER_OVERSAMPLING = 32
+"""Number of scatter keys sampled per split point."""
+_DEFAULT_PARTITION_WORKERS = 8
+"""Default number of threads used to run partitioned aggregations."""
+
+
 class BaseAggregation(ABC):
     """
     Base class representing an Aggregation operation in Datastore
@@ -262,6 +275,9 @@ class AggregationQuery(object):
         retry=None,
         timeout=None,
         read_time=None,
+        partitions=None,
+        max_workers=None,
+        transaction=None,
     ):
         """Execute the Aggregation Query; return an iterator for the aggregation results.
 
@@ -323,12 +339,57 @@ class AggregationQuery(object):
             (Optional) use read_time read consistency, cannot be used inside a
             transaction or with eventual consistency, or will raise ValueError.
 
+        :type partitions: int
+        :param partitions:
+            (Optional) If greater than one, split the nested query into up to
+            this many ``__key__`` ranges, run the aggregations over each range
+            concurrently and combine the results client-side. ``count`` and
+            ``sum`` combine exactly; ``avg`` is computed as the combined sum
+            divided by the combined count of the nested query, so it matches
+            the backend's ``avg`` only when every matching entity has a
+            numeric value for the property. Requires the nested query to have
+            a kind, and cannot be combined with ``limit`` or
+            ``explain_options``.
+
+        :type max_workers: int
+        :param max_workers:
+            (Optional) Maximum number of threads used when ``partitions`` is
+            set.
+
+        :type transaction:
+            :class:`~google.cloud.datastore.transaction.Transaction`
+        :param transaction:
+            (Optional) Transaction to use for read consistency. If not passed,
+            uses the current transaction, if set. Passing it explicitly lets
+            other threads read within the same transaction concurrently.
+
         :rtype: :class:`AggregationIterator`
         :returns: The iterator for the aggregation query.
+        :raises: :class:`ValueError` if ``partitions`` is combined with
+                 unsupported options.
         """
         if client is None:
             client = self._client
 
+        if partitions is not None and partitions > 1:
+            if limit is not None:
+                raise ValueError("partitions cannot be used with limit")
+            if self._explain_options is not None:
+                raise ValueError("partitions cannot be used with explain_options")
+            if not self._nested_query.kind:
+                raise ValueError("partitions requires a query with a kind")
+            return _PartitionedAggregationResultIterator(
+                self,
+                client,
+                partitions,
+                eventual=eventual,
+                retry=retry,
+                timeout=timeout,
+                read_time=read_time,
+                max_workers=max_workers,
+                transaction=transaction,
+            )
+
         return AggregationResultIterator(
             self,
             client,
@@ -337,6 +398,7 @@ class AggregationQuery(object):
             retry=retry,
             timeout=timeout,
             read_time=read_time,
+            transaction=transaction,
         )
 
 
@@ -372,6 +434,10 @@ class AggregationResultIterator(page_iterator.Iterator):
     :param read_time: (Optional) Runs the query with read time consistency.
                       Cannot be used with eventual consistency or inside a
                       transaction, otherwise will raise ValueError. This feature is in private preview.
+
+    :type transaction: :class:`~google.cloud.datastore.transaction.Transaction`
+    :param transaction: (Optional) Transaction to read in. If not passed, uses
+                        the client's current transaction, if set.
     """
 
     def __init__(
@@ -383,6 +449,7 @@ class AggregationResultIterator(page_iterator.Iterator):
         retry=None,
         timeout=None,
         read_time=None,
+        transaction=None,
     ):
         super(AggregationResultIterator, self).__init__(
             client=client,
@@ -394,10 +461,13 @@ class AggregationResultIterator(page_iterator.Iterator):
         self._retry = retry
         self._timeout = timeout
         self._read_time = read_time
+        self._transaction = transaction
         self._limit = limit
         # The attributes below will change over the life of the iterator.
         self._explain_metrics = None
         self._more_results = True
+        self._explain_options = None
+        self._explain_options_known = False
 
     def _build_protobuf(self):
         """Build a query protobuf.
@@ -414,6 +484,24 @@ class AggregationResultIterator(page_iterator.Iterator):
             pb.nested_query.limit = self._limit
         return pb
 
+    def _get_explain_options(self):
+        """Get the explain options of this execution of the query.
+
+        On the first call, the execution is offered to the client's
+        :class:`~google.cloud.datastore.query_profile.QueryProfiler`, if
+        any, which may sample it.
+
+        :rtype: :class:`~google.cloud.datastore.query_profile.ExplainOptions`
+        :returns: The explain options, or None.
+        """
+        if not self._explain_options_known:
+            self._explain_options = self._aggregation_query._explain_options
+            profiler = self.client.query_profiler
+            if profiler is not None:
+                self._explain_options = profiler._explain_options(self._explain_options)
+            self._explain_options_known = True
+        return self._explain_options
+
     def _process_query_results(self, response_pb):
         """Process the response from a datastore query.
 
@@ -447,9 +535,35 @@ class AggregationResultIterator(page_iterator.Iterator):
         if not self._more_results:
             return None
 
+        transaction = self._transaction
+        if transaction is None:
+            transaction = self.client.current_transaction
         transaction_id, new_transaction_options = helpers.get_transaction_options(
-            self.client.current_transaction
+            transaction
         )
+        try:
+            response_pb = self._run_aggregation_query(
+                transaction, transaction_id, new_transaction_options
+            )
+        except:  # noqa: E722 do not use bare except, specify exception instead
+            helpers.begin_transaction_from_read(
+                transaction, None, new_transaction_options
+            )
+            raise
+
+        item_pbs = self._process_query_results(response_pb)
+        return page_iterator.Page(self, item_pbs, self.item_to_value)
+
+    def _run_aggregation_query(
+        self, transaction, transaction_id, new_transaction_options
+    ):
+        """Send the ``runAggregationQuery`` request(s) for the next page.
+
+        Helper for :meth:`_next_page`.
+
+        :rtype: :class:`.datastore_pb2.RunAggregationQueryResponse`
+        :returns: The response holding the next page.
+        """
         read_options = helpers.get_read_options(
             self._eventual, transaction_id, self._read_time, new_transaction_options
         )
@@ -473,10 +587,9 @@ class AggregationResultIterator(page_iterator.Iterator):
             "read_options": read_options,
             "aggregation_query": self._build_protobuf(),
         }
-        if self._aggregation_query._explain_options:
-            request[
-                "explain_options"
-            ] = self._aggregation_query._explain_options._to_dict()
+        explain_options = self._get_explain_options()
+        if explain_options:
+            request["explain_options"] = explain_options._to_dict()
         helpers.set_database_id_to_request(request, self.client.database)
 
         response_pb = None
@@ -496,15 +609,25 @@ class AggregationResultIterator(page_iterator.Iterator):
             response_pb = self.client._datastore_api.run_aggregation_query(
                 request=request.copy(), **kwargs
             )
+            if new_transaction_options is not None:
+                # set new transaction id if we just started a transaction,
+                # and read within it from now on
+                helpers.begin_transaction_from_read(
+                    transaction, response_pb, new_transaction_options
+                )
+                new_transaction_options = None
+                request["read_options"] = helpers.get_read_options(
+                    self._eventual, transaction.id, self._read_time
+                )
             # capture explain metrics if present in response
             # should only be present in last response, and only if explain_options was set
             if response_pb.explain_metrics:
                 self._explain_metrics = ExplainMetrics._from_pb(
                     response_pb.explain_metrics
                 )
-
-        item_pbs = self._process_query_results(response_pb)
-        return page_iterator.Page(self, item_pbs, self.item_to_value)
+                if self.client.query_profiler is not None:
+                    self.client.query_profiler._record(request, self._explain_metrics)
+        return response_pb
 
     @property
     def explain_metrics(self) -> ExplainMetrics:
@@ -534,7 +657,211 @@ class AggregationResultIterator(page_iterator.Iterator):
         )
 
 
+class _PartitionedAggregationResultIterator(page_iterator.Iterator):
+    """Run an aggregation query over key ranges and combine the results.
+
+    Split points are sampled with a keys-only query ordered by the reserved
+    ``__scatter__`` property. Each key range runs ``count`` and ``sum``
+    aggregations (``avg`` is rewritten as ``sum`` plus ``count``), and the
+    per-range results are added together into a single result list with the
+    same shape as :class:`AggregationResultIterator` produces.
+
+    :type aggregation_query: :class:`AggregationQuery`
+    :param aggregation_query: The aggregation query to run.
+
+    :type client: :class:`~google.cloud.datastore.client.Client`
+    :param client: The client used to make requests.
+
+    :type partitions: int
+    :param partitions: Desired number of key ranges.
+
+    :type max_workers: int
+    :param max_workers: (Optional) Maximum number of threads used to run
+                        the key ranges.
+
+    See :class:`AggregationResultIterator` for ``eventual``, ``retry``,
+    ``timeout``, ``read_time`` and ``transaction``.
+    """
+
+    def __init__(
+        self,
+        aggregation_query,
+        client,
+        partitions,
+        eventual=False,
+        retry=None,
+        timeout=None,
+        read_time=None,
+        max_workers=None,
+        transaction=None,
+    ):
+        super(_PartitionedAggregationResultIterator, self).__init__(
+            client=client,
+            item_to_value=_item_to_combined_result,
+        )
+        self._aggregation_query = aggregation_query
+        self._partitions = partitions
+        self._eventual = eventual
+        self._retry = retry
+        self._timeout = timeout
+        self._read_time = read_time
+        self._max_workers = max_workers or _DEFAULT_PARTITION_WORKERS
+        self._transaction = transaction
+        self._more_results = True
+
+    def _fetch_kwargs(self):
+        return {
+            "client": self.client,
+            "eventual": self._eventual,
+            "retry": self._retry,
+            "timeout": self._timeout,
+            "read_time": self._read_time,
+            "transaction": self._transaction,
+        }
+
+    def _split_keys(self):
+        """Sample keys splitting the nested query's kind into ranges.
+
+        :rtype: list of :class:`~google.cloud.datastore.key.Key`
+        :returns: Sorted, distinct split keys (at most ``partitions - 1``).
+        """
+        nested = self._aggregation_query._nested_query
+        scatter_query = Query(
+            nested._client,
+            kind=nested.kind,
+            project=nested._project,
+            namespace=nested._namespace,
+            order=[_SCATTER_PROPERTY_NAME],
+        )
+        scatter_query.keys_only()
+        num_splits = self._partitions - 1
+        sample = [
+            entity.key
+            for entity in scatter_query.fetch(
+                limit=num_splits * _SCATTER_OVERSAMPLING, **self._fetch_kwargs()
+            )
+        ]
+        sample.sort(key=_value_sort_key)
+        if len(sample) <= num_splits:
+            split_keys = sample
+        else:
+            step = len(sample) / float(num_splits + 1)
+            split_keys = [
+                sample[int(round(step * index))] for index in range(1, num_splits + 1)
+            ]
+
+        distinct = []
+        for key in split_keys:
+            if not distinct or distinct[-1] != key:
+                distinct.append(key)
+        return distinct
+
+    def _partition_query(self, start_key, end_key):
+        """Build the aggregation query for keys in ``[start_key, end_key)``.
+
+        :rtype: :class:`AggregationQuery`
+        :returns: An aggregation query using ``count`` and ``sum`` only.
+        """
+        nested = self._aggregation_query._nested_query
+        filters = list(nested._filters)
+        if start_key is not None:
+            filters.append(PropertyFilter(KEY_PROPERTY_NAME, ">=", start_key))
+        if end_key is not None:
+            filters.append(PropertyFilter(KEY_PROPERTY_NAME, "<", end_key))
+        query = Query(
+            nested._client,
+            kind=nested.kind,
+            project=nested._project,
+            namespace=nested._namespace,
+            ancestor=nested.ancestor,
+            filters=filters,
+            projection=nested.projection,
+            distinct_on=nested.distinct_on,
+        )
+        partition_query = AggregationQuery(self._aggregation_query._client, query)
+        for index, aggregation in enumerate(self._aggregation_query._aggregations):
+            if isinstance(aggregation, CountAggregation):
+                partition_query.count(alias=_partition_alias(index, "count"))
+            elif isinstance(aggregation, SumAggregation):
+                partition_query.sum(
+                    aggregation.property_ref, alias=_partition_alias(index, "sum")
+                )
+            else:
+                partition_query.sum(
+                    aggregation.property_ref, alias=_partition_alias(index, "sum")
+                )
+                partition_query.count(alias=_partition_alias(index, "count"))
+        return partition_query
+
+    def _fetch_partition(self, partition_query):
+        """Run one key range and return its results keyed by alias."""
+        values = {}
+        for results in partition_query.fetch(**self._fetch_kwargs()):
+            for result in results:
+                values[result.alias] = result.value
+        return values
+
+    def _next_page(self):
+        """Run all key ranges and return the combined result as one page.
+
+        :rtype: :class:`~google.api_core.page_iterator.Page`
+        :returns: The combined page (or :data:`None` if already returned).
+        """
+        if not self._more_results:
+            return None
+        self._more_results = False
+
+        # The batch stack is local to this thread, so hand the transaction
+        # to the workers explicitly.
+        if self._transaction is None:
+            self._transaction = self.client.current_transaction
+
+        bounds = [None] + self._split_keys() + [None]
+        partition_queries = [
+            self._partition_query(start_key, end_key)
+            for start_key, end_key in zip(bounds[:-1], bounds[1:])
+        ]
+
+        num_workers = min(self._max_workers, len(partition_queries))
+        with concurrent.futures.ThreadPoolExecutor(num_workers) as executor:
+            partials = list(executor.map(self._fetch_partition, partition_queries))
+
+        results = []
+        unnamed = 0
+        for index, aggregation in enumerate(self._aggregation_query._aggregations):
+            alias = aggregation.alias
+            if alias is None:
+                unnamed += 1
+                alias = "property_%d" % (unnamed,)
+            if isinstance(aggregation, CountAggregation):
+                value = _combine(partials, _partition_alias(index, "count"))
+            elif isinstance(aggregation, SumAggregation):
+                value = _combine(partials, _partition_alias(index, "sum"))
+            else:
+                total = _combine(partials, _partition_alias(index, "sum"))
+                count = _combine(partials, _partition_alias(index, "count"))
+                value = total / count if count else None
+            results.append(AggregationResult(alias=alias, value=value))
+
+        return page_iterator.Page(self, [results], self.item_to_value)
+
+
+def _partition_alias(index, operation):
+    """Alias used for an aggregation within a partition query."""
+    return "partition_%d_%s" % (index, operation)
+
+
+def _combine(partials, alias):
+    """Add up the per-partition values for ``alias``."""
+    return sum(partial.get(alias, 0) for partial in partials)
+
+
 # pylint: disable=unused-argument
+def _item_to_combined_result(iterator, results):
+    """Return an already-combined list of aggregation results unchanged."""
+    return results
+
+
 def _item_to_aggregation_result(iterator, pb):
     """Convert a raw protobuf aggregation result to the native object.
 
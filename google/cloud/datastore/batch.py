@@ -21,7 +21,10 @@ See
 https://cloud.google.com/datastore/docs/concepts/entities#batch_operations
 """
 
+import weakref
+
 from google.cloud.datastore import helpers
+from google.cloud.datastore import hooks as _hooks
 from google.cloud.datastore_v1.types import datastore as _datastore_pb2
 
 
@@ -90,6 +93,7 @@ class Batch(object):
     """
 
     _id = None  # "protected" attribute, always None for non-transactions
+    _single_use_options = None  # set by transactions committed without begin
 
     _INITIAL = 0
     """Enum value for _INITIAL status of batch/transaction."""
@@ -106,6 +110,12 @@ class Batch(object):
     def __init__(self, client):
         self._client = client
         self._mutations = []
+        self._mutation_indexes = {}
+        self._elided_mutations = 0
+        self._conflicts = []
+        self._saved_entities = {}
+        self._transforms = []
+        self._transform_results = []
         self._partial_key_entities = []
         self._status = self._INITIAL
 
@@ -140,30 +150,29 @@ class Batch(object):
         """
         return self._client.namespace
 
-    def _add_partial_key_entity_pb(self):
-        """Adds a new mutation for an entity with a partial key.
+    def _add_entity(self, operation, entity, if_version=None, if_update_time=None):
+        """Adds a pending mutation saving an entity.
 
-        :rtype: :class:`.entity_pb2.Entity`
-        :returns: The newly created entity protobuf that will be
-                  updated and sent with a commit.
-        """
-        new_mutation = _datastore_pb2.Mutation()
-        self._mutations.append(new_mutation)
-        return new_mutation.insert
+        The entity is only encoded when the mutations are needed, see
+        :meth:`_encode_pending`.
+
+        :type operation: str
+        :param operation: The mutation operation, ``insert`` for entities
+                          with a partial key or ``upsert`` otherwise.
 
-    def _add_complete_key_entity_pb(self):
-        """Adds a new mutation for an entity with a completed key.
+        :type entity: :class:`google.cloud.datastore.entity.Entity`
+        :param entity: The entity to be saved.
+
+        :type if_version: int
+        :param if_version: (Optional) Required current version of the entity.
 
-        :rtype: :class:`.entity_pb2.Entity`
-        :returns: The newly created entity protobuf that will be
-                  updated and sent with a commit.
+        :type if_update_time: datetime
+        :param if_update_time: (Optional) Required last update time of the
+                               entity.
         """
-        # We use ``upsert`` for entities with completed keys, rather than
-        # ``insert`` or ``update``, in order not to create race conditions
-        # based on prior existence / removal of the entity.
-        new_mutation = _datastore_pb2.Mutation()
-        self._mutations.append(new_mutation)
-        return new_mutation.upsert
+        self._mutations.append(
+            _PendingPut(operation, entity, if_version, if_update_time)
+        )
 
     def _add_delete_key_pb(self):
         """Adds a new mutation for a key to be deleted.
@@ -190,8 +199,101 @@ class Batch(object):
         :returns: The list of :class:`.datastore_pb2.Mutation`
                   protobufs to be sent in the commit request.
         """
+        self._encode_pending()
         return self._mutations
 
+    def _encode_pending(self):
+        """Encode the entities saved since the mutations were last needed.
+
+        All pending entities are converted in a single pass, and the batch
+        only keeps a weak reference to each one once it is encoded, to
+        report its new version after the commit.
+        """
+        mutations = self._mutations
+        for index, mutation in enumerate(mutations):
+            if isinstance(mutation, _PendingPut):
+                mutations[index] = mutation.encode()
+                self._saved_entities[index] = weakref.ref(mutation.entity)
+
+    @property
+    def elided_mutations(self):
+        """Number of mutations dropped because a later one replaced them.
+
+        Calling :meth:`put` or :meth:`delete` on a complete key which already
+        has a pending mutation in this batch replaces that mutation (last
+        write wins), rather than sending both.
+
+        :rtype: int
+        :returns: The number of mutations collapsed so far.
+        """
+        return self._elided_mutations
+
+    @property
+    def conflicts(self):
+        """Keys of the mutations skipped because of a failed precondition.
+
+        Set by :meth:`commit` for the mutations passed ``if_version`` or
+        ``if_update_time`` whose entity had changed in the meantime.
+
+        :rtype: list of :class:`google.cloud.datastore.key.Key`
+        :returns: The conflicting keys, in mutation order.
+        """
+        return self._conflicts
+
+    @property
+    def transform_results(self):
+        """Values of the properties changed by transforms, after commit.
+
+        Set by :meth:`commit`, with one value per call of :meth:`increment`,
+        :meth:`maximum`, :meth:`minimum`, :meth:`array_union` or
+        :meth:`array_remove`, in call order. The value is the property's
+        new value for numeric transforms, and ``None`` for array transforms
+        and for transforms which were not applied (because of a conflict,
+        or because a later :meth:`put` / :meth:`delete` replaced them).
+
+        :rtype: list
+        :returns: The transform results.
+        """
+        return self._transform_results
+
+    def _collapse_mutation(self, key):
+        """Make the mutation just added the only pending one for ``key``.
+
+        If an earlier mutation targets the same complete key, the new
+        mutation takes its place in :attr:`mutations` (keeping the order
+        of mutations on other keys unchanged). Mutations with a
+        precondition neither replace nor are replaced, but are still
+        tracked as the last mutation for ``key``.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The complete key of the last mutation added.
+        """
+        index = self._mutation_indexes.get(key)
+        if (
+            index is None
+            or _has_precondition(self._mutations[-1])
+            or _has_precondition(self._mutations[index])
+        ):
+            # The earlier mutations must still be applied if a
+            # precondition fails, and later ones must not move before it.
+            self._mutation_indexes[key] = len(self._mutations) - 1
+        else:
+            self._mutations[index] = self._mutations.pop()
+            self._saved_entities.pop(index, None)
+            self._discard_transforms(index)
+            self._elided_mutations += 1
+
+    def _discard_transforms(self, index):
+        """Forget the transforms of a mutation which was replaced.
+
+        :type index: int
+        :param index: The index of the replaced mutation.
+        """
+        self._transforms = [
+            None if position is not None and position[0] == index else position
+            for position in self._transforms
+        ]
+
     def _allow_mutations(self) -> bool:
         """
         This method is called to see if the batch is in a proper state to allow
@@ -205,7 +307,7 @@ class Batch(object):
         """
         return self._status == self._IN_PROGRESS
 
-    def put(self, entity):
+    def put(self, entity, if_version=None, if_update_time=None):
         """Remember an entity's state to be saved during :meth:`commit`.
 
         .. note::
@@ -219,17 +321,39 @@ class Batch(object):
            Python3) map to 'string_value' in the datastore;  values which are
            "bytes" ('str' in Python2, 'bytes' in Python3) map to 'blob_value'.
 
+        .. note::
+           The entity is encoded lazily, when the batch is committed (or
+           :attr:`mutations` is read), so changes made to it in between are
+           saved too.
+
         When an entity has a partial key, calling :meth:`commit` sends it as
         an ``insert`` mutation and the key is completed. On return,
         the key for the ``entity`` passed in is updated to match the key ID
         assigned by the server.
 
+        If the entity's key is complete and already has a pending put or
+        delete in this batch, that mutation is replaced by this one (unless
+        either has a precondition).
+
+        With ``if_version`` or ``if_update_time``, the entity is only saved
+        if it is unchanged since it was read; otherwise the mutation is
+        skipped and its key is reported in :attr:`conflicts`.
+
         :type entity: :class:`google.cloud.datastore.entity.Entity`
         :param entity: the entity to be saved.
 
+        :type if_version: int
+        :param if_version: (Optional) Version the stored entity must have.
+                           Pass 0 to require that it does not exist.
+
+        :type if_update_time: datetime
+        :param if_update_time: (Optional) Time at which the stored entity
+                               must have been last updated.
+
         :raises: :class:`~exceptions.ValueError` if the batch is not in
-                 progress, if entity has no key assigned, or if the key's
-                 ``project`` does not match ours.
+                 progress, if entity has no key assigned, if the key's
+                 ``project`` does not match ours, or if both preconditions
+                 are passed.
         """
         if not self._allow_mutations():
             raise ValueError("Batch must be in progress to put()")
@@ -243,23 +367,39 @@ class Batch(object):
         if self.database != entity.key.database:
             raise ValueError("Key must be from same database as batch")
 
+        _check_precondition(if_version, if_update_time)
+
         if entity.key.is_partial:
-            entity_pb = self._add_partial_key_entity_pb()
+            self._add_entity("insert", entity, if_version, if_update_time)
             self._partial_key_entities.append(entity)
         else:
-            entity_pb = self._add_complete_key_entity_pb()
+            # We use ``upsert`` for entities with completed keys, rather than
+            # ``insert`` or ``update``, in order not to create race conditions
+            # based on prior existence / removal of the entity.
+            self._add_entity("upsert", entity, if_version, if_update_time)
+            self._collapse_mutation(entity.key)
 
-        _assign_entity_to_pb(entity_pb, entity)
-
-    def delete(self, key):
+    def delete(self, key, if_version=None, if_update_time=None):
         """Remember a key to be deleted during :meth:`commit`.
 
+        If the key already has a pending put or delete in this batch, that
+        mutation is replaced by this one (unless either has a precondition).
+
         :type key: :class:`google.cloud.datastore.key.Key`
         :param key: the key to be deleted.
 
+        :type if_version: int
+        :param if_version: (Optional) Version the stored entity must have.
+                           See :meth:`put`.
+
+        :type if_update_time: datetime
+        :param if_update_time: (Optional) Time at which the stored entity
+                               must have been last updated. See :meth:`put`.
+
         :raises: :class:`~exceptions.ValueError` if the batch is not in
-                 progress, if key is not complete, or if the key's
-                 ``project`` does not match ours.
+                 progress, if key is not complete, if the key's
+                 ``project`` does not match ours, or if both preconditions
+                 are passed.
         """
         if not self._allow_mutations():
             raise ValueError("Batch must be in progress to delete()")
@@ -273,8 +413,176 @@ class Batch(object):
         if self.database != key.database:
             raise ValueError("Key must be from same database as batch")
 
+        _check_precondition(if_version, if_update_time)
+
         key_pb = key.to_protobuf()
         self._add_delete_key_pb()._pb.CopyFrom(key_pb._pb)
+        _set_precondition(self._mutations[-1], if_version, if_update_time)
+        self._collapse_mutation(key)
+
+    def increment(self, key, name, value=1):
+        """Add ``value`` to a numeric property during :meth:`commit`.
+
+        The property is updated by the backend, without reading the entity
+        first. If the property is missing or not a number, it is set to
+        ``value``; if the entity does not exist, it is created.
+
+        Transforms on a key which has a pending :meth:`put` (or another
+        transform) are applied after it, in the same mutation, so they are
+        skipped if the put's precondition fails. A pending :meth:`delete`
+        of the key is turned into an upsert of an entity holding only the
+        transformed properties. The new value is available in
+        :attr:`transform_results` after the commit.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity to update.
+
+        :type name: str
+        :param name: The name of the property. Use dots for properties of
+                     embedded entities.
+
+        :type value: int or float
+        :param value: (Optional) The amount to add. Defaults to 1.
+
+        :raises: :class:`~exceptions.ValueError` if the batch is not in
+                 progress, if key is not complete, if the key's
+                 ``project`` does not match ours, or if the key has a
+                 pending :meth:`delete` with a precondition.
+        """
+        self._add_transform(key, name, "increment", value)
+
+    def maximum(self, key, name, value):
+        """Raise a numeric property to at least ``value`` during :meth:`commit`.
+
+        See :meth:`increment`.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity to update.
+
+        :type name: str
+        :param name: The name of the property.
+
+        :type value: int or float
+        :param value: The lower bound of the property.
+        """
+        self._add_transform(key, name, "maximum", value)
+
+    def minimum(self, key, name, value):
+        """Lower a numeric property to at most ``value`` during :meth:`commit`.
+
+        See :meth:`increment`.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity to update.
+
+        :type name: str
+        :param name: The name of the property.
+
+        :type value: int or float
+        :param value: The upper bound of the property.
+        """
+        self._add_transform(key, name, "minimum", value)
+
+    def array_union(self, key, name, values):
+        """Append the missing ``values`` to an array property during :meth:`commit`.
+
+        If the property is missing or not an array, it is first set to an
+        empty array. See :meth:`increment`.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity to update.
+
+        :type name: str
+        :param name: The name of the property.
+
+        :type values: list
+        :param values: The values to append, unless already present.
+        """
+        self._add_transform(key, name, "append_missing_elements", values)
+
+    def array_remove(self, key, name, values):
+        """Remove all of ``values`` from an array property during :meth:`commit`.
+
+        If the property is missing or not an array, it is set to an empty
+        array. See :meth:`increment`.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity to update.
+
+        :type name: str
+        :param name: The name of the property.
+
+        :type values: list
+        :param values: The values to remove.
+        """
+        self._add_transform(key, name, "remove_all_from_array", values)
+
+    def _add_transform(self, key, name, transform_type, value):
+        """Add a property transform to the mutation for ``key``.
+
+        If ``key`` has no pending mutation, a new ``upsert`` mutation which
+        writes no properties (an empty property mask) is added. A pending
+        ``delete`` is replaced by an ``upsert`` of an empty entity, unless
+        it has a precondition.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity to update.
+
+        :type name: str
+        :param name: The name of the property.
+
+        :type transform_type: str
+        :param transform_type: The ``PropertyTransform`` field to set.
+
+        :type value: object
+        :param value: The transform's operand.
+        """
+        if not self._allow_mutations():
+            raise ValueError("Batch must be in progress to transform properties")
+
+        if key.is_partial:
+            raise ValueError("Key must be complete")
+
+        if self.project != key.project:
+            raise ValueError("Key must be from same project as batch")
+
+        if self.database != key.database:
+            raise ValueError("Key must be from same database as batch")
+
+        transform_pb = _datastore_pb2.PropertyTransform(property=name)._pb
+        if transform_type in ("append_missing_elements", "remove_all_from_array"):
+            array_pb = getattr(transform_pb, transform_type)
+            array_pb.SetInParent()
+            for item in value:
+                helpers._set_protobuf_value(array_pb.values.add(), item)
+        else:
+            helpers._set_protobuf_value(getattr(transform_pb, transform_type), value)
+
+        index = self._mutation_indexes.get(key)
+        if index is None:
+            mutation = _datastore_pb2.Mutation()
+            mutation._pb.upsert.key.CopyFrom(key.to_protobuf()._pb)
+            mutation._pb.property_mask.SetInParent()
+            self._mutations.append(mutation)
+            index = self._mutation_indexes[key] = len(self._mutations) - 1
+        else:
+            mutation = self._mutations[index]
+
+        if isinstance(mutation, _PendingPut):
+            transforms = mutation.transforms
+        else:
+            if mutation._pb.HasField("delete"):
+                if _has_precondition(mutation):
+                    raise ValueError(
+                        "Cannot transform properties of an entity with a "
+                        "pending conditional delete"
+                    )
+                mutation = _datastore_pb2.Mutation()
+                mutation._pb.upsert.key.CopyFrom(key.to_protobuf()._pb)
+                self._mutations[index] = mutation
+            transforms = mutation._pb.property_transforms
+        self._transforms.append((index, len(transforms)))
+        transforms.append(transform_pb)
 
     def begin(self):
         """Begins a batch.
@@ -298,7 +606,7 @@ class Batch(object):
 
         This is called by :meth:`commit`.
         """
-        if self._id is None:
+        if self._id is None and self._single_use_options is None:
             mode = _datastore_pb2.CommitRequest.Mode.NON_TRANSACTIONAL
         else:
             mode = _datastore_pb2.CommitRequest.Mode.TRANSACTIONAL
@@ -311,12 +619,23 @@ class Batch(object):
         if timeout is not None:
             kwargs["timeout"] = timeout
 
+        with _hooks._stage(
+            getattr(self._client, "_hooks", ()),
+            _hooks.ENCODE,
+            "commit",
+            len(self._mutations),
+        ):
+            mutations = self.mutations
+
         request = {
             "project_id": self.project,
             "mode": mode,
             "transaction": self._id,
-            "mutations": self._mutations,
+            "mutations": mutations,
         }
+        if self._single_use_options is not None:
+            del request["transaction"]
+            request["single_use_transaction"] = self._single_use_options
 
         helpers.set_database_id_to_request(request, self._client.database)
 
@@ -325,7 +644,20 @@ class Batch(object):
             **kwargs,
         )
 
-        _, updated_keys = _parse_commit_response(commit_response_pb)
+        _, updated_keys, conflict_indexes = _parse_commit_response(commit_response_pb)
+        mutations = request["mutations"]
+        self._conflicts = [
+            _mutation_key(mutations[index]) for index in conflict_indexes
+        ]
+        for index, mut_result in enumerate(commit_response_pb._pb.mutation_results):
+            entity_ref = self._saved_entities.get(index)
+            entity = entity_ref() if entity_ref is not None else None
+            if entity is not None and not mut_result.conflict_detected:
+                helpers.set_entity_metadata(entity, mut_result)
+        self._transform_results = [
+            _transform_result(commit_response_pb, position)
+            for position in self._transforms
+        ]
         # If the back-end returns without error, we are guaranteed that
         # ``commit`` will return keys that match (length and
         # order) directly ``_partial_key_entities``.
@@ -399,10 +731,98 @@ class Batch(object):
             self._client._pop_batch()
 
 
+class _PendingPut(object):
+    """An entity saved in a batch, waiting to be encoded.
+
+    :type operation: str
+    :param operation: The mutation operation, ``insert`` or ``upsert``.
+
+    :type entity: :class:`google.cloud.datastore.entity.Entity`
+    :param entity: The entity to be saved.
+    """
+
+    __slots__ = ("operation", "entity", "if_version", "if_update_time", "transforms")
+
+    def __init__(self, operation, entity, if_version=None, if_update_time=None):
+        self.operation = operation
+        self.entity = entity
+        self.if_version = if_version
+        self.if_update_time = if_update_time
+        self.transforms = []
+
+    def encode(self):
+        """Build the mutation saving the entity in its current state.
+
+        :rtype: :class:`.datastore_pb2.Mutation`
+        :returns: The encoded mutation.
+        """
+        mutation = _datastore_pb2.Mutation()
+        _assign_entity_to_pb(getattr(mutation, self.operation), self.entity)
+        _set_precondition(mutation, self.if_version, self.if_update_time)
+        mutation._pb.property_transforms.extend(self.transforms)
+        return mutation
+
+
+def _check_precondition(if_version, if_update_time):
+    """Validate the precondition arguments of ``put`` / ``delete``.
+
+    :raises: :class:`ValueError` if both are passed.
+    """
+    if if_version is not None and if_update_time is not None:
+        raise ValueError("Pass at most one of if_version and if_update_time")
+
+
+def _set_precondition(mutation, if_version, if_update_time):
+    """Set the conflict detection strategy of a mutation, if any.
+
+    :type mutation: :class:`.datastore_pb2.Mutation`
+    :param mutation: The mutation to update.
+
+    :type if_version: int
+    :param if_version: Required current version, or None.
+
+    :type if_update_time: datetime
+    :param if_update_time: Required last update time, or None.
+    """
+    if if_version is not None:
+        mutation.base_version = if_version
+    elif if_update_time is not None:
+        mutation.update_time = if_update_time
+
+
+def _has_precondition(mutation):
+    """Tell whether a (possibly pending) mutation has a precondition.
+
+    :rtype: bool
+    :returns: True if the mutation has ``base_version`` or ``update_time``.
+    """
+    if isinstance(mutation, _PendingPut):
+        return mutation.if_version is not None or mutation.if_update_time is not None
+    return mutation._pb.WhichOneof("conflict_detection_strategy") is not None
+
+
+def _mutation_key(mutation):
+    """Get the key targeted by a mutation.
+
+    :type mutation: :class:`.datastore_pb2.Mutation`
+    :param mutation: An encoded mutation.
+
+    :rtype: :class:`google.cloud.datastore.key.Key`
+    :returns: The mutation's key.
+    """
+    mutation_pb = mutation._pb
+    operation = mutation_pb.WhichOneof("operation")
+    if operation == "delete":
+        key_pb = mutation_pb.delete
+    else:
+        key_pb = getattr(mutation_pb, operation).key
+    return helpers.key_from_protobuf(key_pb)
+
+
 def _assign_entity_to_pb(entity_pb, entity):
     """Copy ``entity`` into ``entity_pb``.
 
-    Helper method for ``Batch.put``.
+    Helper method for ``_PendingPut.encode``.
 
     :type entity_pb: :class:`.entity_pb2.Entity`
     :param entity_pb: The entity owned by a mutation.
@@ -415,6 +835,35 @@ def _assign_entity_to_pb(entity_pb, entity):
     entity_pb._pb.CopyFrom(bare_entity_pb._pb)
 
 
+def _transform_result(commit_response, position):
+    """Get the result of one property transform from a commit response.
+
+    :type commit_response: :class:`.datastore_pb2.CommitResponse`
+    :param commit_response: The response from a commit request.
+
+    :type position: tuple
+    :param position: The index of the mutation and of the transform within
+                     it, or None if the transform was discarded.
+
+    :rtype: object
+    :returns: The property's new value, or None if not available.
+    """
+    if position is None:
+        return None
+    mutation_index, transform_index = position
+    mut_results = commit_response._pb.mutation_results
+    if mutation_index >= len(mut_results):
+        return None
+    mut_result = mut_results[mutation_index]
+    if mut_result.conflict_detected:
+        return None
+    if transform_index >= len(mut_result.transform_results):
+        return None
+    return helpers._get_value_from_value_pb(
+        mut_result.transform_results[transform_index]
+    )
+
+
 def _parse_commit_response(commit_response):
     """Extract response data from a commit response.
 
@@ -422,9 +871,10 @@ def _parse_commit_response(commit_response):
     :param commit_response_pb: The protobuf response from a commit request.
 
     :rtype: tuple
-    :returns: The pair of the number of index updates and a list of
+    :returns: The number of index updates, a list of
               :class:`.entity_pb2.Key` for each incomplete key
-              that was completed in the commit.
+              that was completed in the commit, and the indexes of the
+              mutations not applied because of a precondition conflict.
     """
     commit_response_pb = commit_response._pb
     mut_results = commit_response_pb.mutation_results
@@ -432,4 +882,9 @@ def _parse_commit_response(commit_response):
     completed_keys = [
         mut_result.key for mut_result in mut_results if mut_result.HasField("key")
     ]  # Message field (Key)
-    return index_updates, completed_keys
+    conflicts = [
+        index
+        for index, mut_result in enumerate(mut_results)
+        if mut_result.conflict_detected
+    ]
+    return index_updates, completed_keys, conflicts
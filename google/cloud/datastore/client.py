@@ -13,22 +13,32 @@
 # limitations under the License.
 """Convenience wrapper for invoking APIs/factories w/ a project."""
 
+import asyncio
+import concurrent.futures
+import contextvars
 import os
+import random
+import time
 import warnings
 
 import google.api_core.client_options
+from google.api_core import exceptions as core_exceptions
 from google.auth.credentials import AnonymousCredentials  # type: ignore
-from google.cloud._helpers import _LocalStack
 from google.cloud._helpers import _determine_default_project as _base_default_project
 from google.cloud.client import ClientWithProject
 from google.cloud.datastore.version import __version__
+from google.cloud.datastore import _telemetry
 from google.cloud.datastore import helpers
+from google.cloud.datastore import hooks as _hooks
 from google.cloud.datastore._http import HTTPDatastoreAPI
 from google.cloud.datastore.batch import Batch
 from google.cloud.datastore.entity import Entity
+from google.cloud.datastore.gql import GqlQuery
 from google.cloud.datastore.key import Key
 from google.cloud.datastore.query import Query
+from google.cloud.datastore.rpc_stats import _RPCStatsRecorder
 from google.cloud.datastore.aggregation import AggregationQuery
+from google.cloud.datastore.snapshot import Snapshot
 
 from google.cloud.datastore.transaction import Transaction
 
@@ -53,6 +63,14 @@ else:
 
 _MAX_LOOPS = 128
 """Maximum number of iterations to wait for deferred keys."""
+_DEFAULT_AGGREGATION_WORKERS = 8
+"""Default number of threads used by :meth:`Client.run_aggregations`."""
+_DEFAULT_TRANSACTION_ATTEMPTS = 5
+"""Default number of attempts made by :meth:`Client.run_in_transaction`."""
+_DEFAULT_INITIAL_BACKOFF = 0.1
+"""Default upper bound, in seconds, of the first delay between attempts."""
+_DEFAULT_MAX_BACKOFF = 10.0
+"""Default cap, in seconds, of the delays between transaction attempts."""
 _DATASTORE_BASE_URL = "https://datastore.googleapis.com"
 """Datastore API request URL base."""
 
@@ -70,6 +88,66 @@ Client.reserve_ids_multi or Client.reserve_ids_sequential"""
 
 _USE_GRPC = _HAVE_GRPC and not os.getenv(DISABLE_GRPC, False)
 
+_BATCH_STACKS = contextvars.ContextVar("datastore_batch_stacks", default=None)
+"""Batch stacks of the current context, keyed by :class:`_ContextLocalStack`."""
+
+
+class _ContextLocalStack(object):
+    """LIFO stack of batches local to the current thread or asyncio task.
+
+    Same interface as :class:`google.cloud._helpers._LocalStack`, but kept
+    in a :mod:`contextvars` variable, so that asyncio tasks sharing a thread
+    (and a client) each see only the batches / transactions they entered.
+    New threads start with an empty stack.
+    """
+
+    def _get(self):
+        stacks = _BATCH_STACKS.get()
+        if stacks is None:
+            return ()
+        return stacks.get(self, ())
+
+    def _set(self, stack):
+        # Copy on write: the mapping may be shared with other contexts.
+        stacks = dict(_BATCH_STACKS.get() or {})
+        if stack:
+            stacks[self] = stack
+        else:
+            stacks.pop(self, None)
+        _BATCH_STACKS.set(stacks)
+
+    def __iter__(self):
+        """Iterate the stack in LIFO order."""
+        return iter(reversed(self._get()))
+
+    def push(self, resource):
+        """Push a resource onto our stack."""
+        self._set(self._get() + (resource,))
+
+    def pop(self):
+        """Pop a resource from our stack.
+
+        :rtype: object
+        :returns: the top-most resource, after removing it.
+        :raises IndexError: if the stack is empty.
+        """
+        stack = self._get()
+        if not stack:
+            raise IndexError("pop from empty stack")
+        self._set(stack[:-1])
+        return stack[-1]
+
+    @property
+    def top(self):
+        """Get the top-most resource
+
+        :rtype: object
+        :returns: the top-most item, or None if the stack is empty.
+        """
+        stack = self._get()
+        if stack:
+            return stack[-1]
+
 
 def _get_gcd_project():
     """Gets the GCD application ID if it can be inferred."""
@@ -115,6 +193,55 @@ def _make_retry_timeout_kwargs(retry, timeout):
     return kwargs
 
 
+def _check_aggregation_aliases(aggregation_queries):
+    """Ensure every aggregation has an alias unique across the queries.
+
+    Helper for :meth:`Client.run_aggregations`.
+
+    :raises: :class:`ValueError` if an alias is missing or repeated.
+    """
+    seen = set()
+    for aggregation_query in aggregation_queries:
+        for aggregation in aggregation_query._aggregations:
+            if aggregation.alias is None:
+                raise ValueError("Every aggregation must have an alias")
+            if aggregation.alias in seen:
+                raise ValueError("Duplicate aggregation alias: %s" % aggregation.alias)
+            seen.add(aggregation.alias)
+
+
+def _is_contention_error(exc):
+    """Tell whether a transaction failed because of contention.
+
+    Over gRPC contention surfaces as ``ABORTED``; over HTTP it surfaces as
+    a bare ``409 Conflict``.  ``AlreadyExists`` is also a ``Conflict``, but
+    is not worth retrying.
+
+    :type exc: :class:`~google.api_core.exceptions.Conflict`
+    :param exc: The error raised by the transaction.
+
+    :rtype: bool
+    :returns: True if the transaction should be retried.
+    """
+    return isinstance(exc, core_exceptions.Aborted) or (
+        type(exc) is core_exceptions.Conflict
+    )
+
+
+def _remaining(deadline):
+    """Seconds left before ``deadline`` (a ``time.monotonic`` value)."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def _deadline_exceeded(num_pending):
+    """Build the error raised when batched aggregations run out of time."""
+    return core_exceptions.DeadlineExceeded(
+        "%d aggregation queries did not complete before the deadline" % (num_pending,)
+    )
+
+
 def _extended_lookup(
     datastore_api,
     project,
@@ -127,6 +254,7 @@ def _extended_lookup(
     timeout=None,
     read_time=None,
     database=None,
+    properties=None,
 ):
     """Repeat lookup until all keys found (unless stop requested).
 
@@ -184,8 +312,12 @@ def _extended_lookup(
     :param database:
         (Optional) Database from which to fetch data. Defaults to the (default) database.
 
-    :rtype: list of :class:`.entity_pb2.Entity`
-    :returns: The requested entities.
+    :type properties: sequence of str
+    :param properties: (Optional) Only return these properties of the
+                       entities.
+
+    :rtype: list of :class:`.query_pb2.EntityResult`
+    :returns: The results holding the requested entities.
     :raises: :class:`ValueError` if missing / deferred are not null or
              empty list.
     """
@@ -199,47 +331,57 @@ def _extended_lookup(
 
     results = []
 
-    transaction_id = None
-    transaction_id, new_transaction_options = helpers.get_transaction_options(
-        transaction
-    )
-    read_options = helpers.get_read_options(
-        eventual, transaction_id, read_time, new_transaction_options
-    )
-    loop_num = 0
-    while loop_num < _MAX_LOOPS:  # loop against possible deferred.
-        loop_num += 1
-        request = {
-            "project_id": project,
-            "keys": key_pbs,
-            "read_options": read_options,
-        }
-        helpers.set_database_id_to_request(request, database)
-        lookup_response = datastore_api.lookup(
-            request=request,
-            **kwargs,
-        )
+    with _telemetry.span(
+        datastore_api, "datastore.get_multi", {"datastore.keys": len(key_pbs)}
+    ) as span:
+        loop_num = 0
+        while loop_num < _MAX_LOOPS:  # loop against possible deferred.
+            loop_num += 1
+            # Re-read each time: the first lookup may have begun the transaction.
+            transaction_id, new_transaction_options = helpers.get_transaction_options(
+                transaction
+            )
+            lookup_response = None
+            try:
+                read_options = helpers.get_read_options(
+                    eventual, transaction_id, read_time, new_transaction_options
+                )
+                request = {
+                    "project_id": project,
+                    "keys": key_pbs,
+                    "read_options": read_options,
+                }
+                helpers.set_database_id_to_request(request, database)
+                helpers.set_property_mask_to_request(request, properties)
+                lookup_response = datastore_api.lookup(
+                    request=request,
+                    **kwargs,
+                )
+            finally:
+                # set new transaction id if we just started a transaction
+                helpers.begin_transaction_from_read(
+                    transaction, lookup_response, new_transaction_options
+                )
 
-        # set new transaction id if we just started a transaction
-        if transaction and lookup_response.transaction:
-            transaction._begin_with_id(lookup_response.transaction)
+            # Accumulate the new results.
+            results.extend(lookup_response.found)
 
-        # Accumulate the new results.
-        results.extend(result.entity for result in lookup_response.found)
+            if missing is not None:
+                missing.extend(result.entity for result in lookup_response.missing)
 
-        if missing is not None:
-            missing.extend(result.entity for result in lookup_response.missing)
+            if deferred is not None:
+                deferred.extend(lookup_response.deferred)
+                break
 
-        if deferred is not None:
-            deferred.extend(lookup_response.deferred)
-            break
+            if len(lookup_response.deferred) == 0:
+                break
 
-        if len(lookup_response.deferred) == 0:
-            break
+            # We have deferred keys, and the user didn't ask to know about
+            # them, so retry (but only with the deferred ones).
+            key_pbs = lookup_response.deferred
 
-        # We have deferred keys, and the user didn't ask to know about
-        # them, so retry (but only with the deferred ones).
-        key_pbs = lookup_response.deferred
+        span.set_attribute("datastore.lookup_loops", loop_num)
+        span.set_attribute("datastore.found", len(results))
 
     return results
 
@@ -294,8 +436,43 @@ class Client(ClientWithProject):
                       This parameter should be considered private, and could
                       change in the future.
 
+    :type _datastore_api: object
+    :param _datastore_api: (Optional) API object answering the client's
+                           requests instead of the gRPC or HTTP one, e.g. a
+                           :class:`~google.cloud.datastore._in_memory.InMemoryDatastoreAPI`.
+                           This parameter should be considered private, and
+                           could change in the future.
+
     :type database: str
     :param database: (Optional) database to pass to proxied API methods.
+
+    :type query_profiler: :class:`~google.cloud.datastore.query_profile.QueryProfiler`
+    :param query_profiler: (Optional) Profiler sampling the execution
+                           statistics of the client's queries.
+
+    :type enable_telemetry: bool
+    :param enable_telemetry: (Optional) If True, trace each API call with
+                             OpenTelemetry, and record its duration in the
+                             ``datastore.client.rpc.duration`` histogram,
+                             using the global tracer and meter providers.
+                             Requires the ``opentelemetry-api`` package.
+                             Defaults to False.
+
+    :type enable_stats: bool
+    :param enable_stats: (Optional) If True, keep the statistics returned by
+                         :meth:`stats`. Defaults to False.
+
+    :type hooks: sequence of :class:`~google.cloud.datastore.hooks.ClientHook`
+    :param hooks: (Optional) Hooks called around the encoding, API call and
+                  decoding stages of the client's requests.
+
+    :type begin_transactions_lazily: bool
+    :param begin_transactions_lazily: (Optional) Default of ``begin_later``
+                                      for the transactions made by
+                                      :meth:`transaction`. Pass False to
+                                      have them call ``BeginTransaction``
+                                      when entered, as they used to.
+                                      Defaults to True.
     """
 
     SCOPE = ("https://www.googleapis.com/auth/datastore",)
@@ -309,9 +486,18 @@ class Client(ClientWithProject):
         client_info=_CLIENT_INFO,
         client_options=None,
         database=None,
+        query_profiler=None,
+        enable_telemetry=False,
+        enable_stats=False,
+        hooks=None,
+        begin_transactions_lazily=True,
         _http=None,
         _use_grpc=None,
+        _datastore_api=None,
     ):
+        if enable_telemetry and not _telemetry._HAVE_OPENTELEMETRY:
+            raise ValueError("enable_telemetry requires the opentelemetry-api package")
+
         emulator_host = os.getenv(DATASTORE_EMULATOR_HOST)
 
         if emulator_host is not None:
@@ -330,9 +516,15 @@ class Client(ClientWithProject):
         self.namespace = namespace
         self._client_info = client_info
         self._client_options = client_options
-        self._batch_stack = _LocalStack()
+        self._batch_stack = _ContextLocalStack()
         self._datastore_api_internal = None
+        self._datastore_api_backend = _datastore_api
         self._database = database
+        self.query_profiler = query_profiler
+        self._enable_telemetry = enable_telemetry
+        self._rpc_stats = _RPCStatsRecorder() if enable_stats else None
+        self._hooks = tuple(hooks or ())
+        self._begin_transactions_lazily = begin_transactions_lazily
 
         if _use_grpc is None:
             self._use_grpc = _USE_GRPC
@@ -376,12 +568,37 @@ class Client(ClientWithProject):
     def _datastore_api(self):
         """Getter for a wrapped API object."""
         if self._datastore_api_internal is None:
-            if self._use_grpc:
+            if self._datastore_api_backend is not None:
+                self._datastore_api_internal = self._datastore_api_backend
+            elif self._use_grpc:
                 self._datastore_api_internal = make_datastore_api(self)
             else:
                 self._datastore_api_internal = HTTPDatastoreAPI(self)
+            self._datastore_api_internal = _telemetry.instrument(
+                self._datastore_api_internal,
+                self._enable_telemetry,
+                self._rpc_stats,
+                self._hooks,
+            )
         return self._datastore_api_internal
 
+    def stats(self):
+        """Get statistics of the client's Datastore API calls.
+
+        Calls are counted per API method (``lookup``, ``run_query``,
+        ``run_aggregation_query``, ``commit``, ``begin_transaction``,
+        ``rollback``, ``allocate_ids`` and ``reserve_ids``) since the
+        client was created.
+
+        :rtype: dict[str, :class:`~google.cloud.datastore.rpc_stats.RPCStats`]
+        :returns: The statistics of each API method called.
+        :raises: :class:`ValueError` if the client was created without
+                 ``enable_stats``.
+        """
+        if self._rpc_stats is None:
+            raise ValueError("Client was created without enable_stats")
+        return self._rpc_stats.snapshot()
+
     def _push_batch(self, batch):
         """Push a batch/transaction onto our stack.
 
@@ -439,6 +656,7 @@ class Client(ClientWithProject):
         retry=None,
         timeout=None,
         read_time=None,
+        properties=None,
     ):
         """Retrieve an entity from a single key (if it exists).
 
@@ -487,6 +705,10 @@ class Client(ClientWithProject):
                           Cannot be used with eventual consistency or inside a
                           transaction, or will raise ValueError. This feature is in private preview.
 
+        :type properties: sequence of str
+        :param properties: (Optional) Only return these properties of the
+                           entity. See :meth:`get_multi`.
+
         :rtype: :class:`google.cloud.datastore.entity.Entity` or ``NoneType``
         :returns: The requested entity if it exists.
 
@@ -502,6 +724,7 @@ class Client(ClientWithProject):
             retry=retry,
             timeout=timeout,
             read_time=read_time,
+            properties=properties,
         )
         if entities:
             return entities[0]
@@ -516,6 +739,7 @@ class Client(ClientWithProject):
         retry=None,
         timeout=None,
         read_time=None,
+        properties=None,
     ):
         """Retrieve entities, along with their attributes.
 
@@ -556,12 +780,19 @@ class Client(ClientWithProject):
         :type read_time: datetime
         :param read_time: (Optional) Read time to use for read consistency. This feature is in private preview.
 
+        :type properties: sequence of str
+        :param properties:
+            (Optional) Only return these properties of the entities, using
+            dots for properties of embedded entities (``"address.city"``).
+            The returned entities are partial: saving one overwrites the
+            stored entity with just these properties.
+
         :rtype: list of :class:`google.cloud.datastore.entity.Entity`
         :returns: The requested entities.
         :raises: :class:`ValueError` if one or more of ``keys`` has a project
-                 which does not match our project; or if more than one of
+                 which does not match our project; if more than one of
                  ``eventual==True``, ``transaction``, and ``read_time`` is
-                 specified.
+                 specified; or if ``properties`` is empty.
         """
         if not keys:
             return []
@@ -574,7 +805,7 @@ class Client(ClientWithProject):
         if transaction is None:
             transaction = self.current_transaction
 
-        entity_pbs = _extended_lookup(
+        entity_results = _extended_lookup(
             datastore_api=self._datastore_api,
             project=self.project,
             key_pbs=[key.to_protobuf() for key in keys],
@@ -586,6 +817,7 @@ class Client(ClientWithProject):
             timeout=timeout,
             read_time=read_time,
             database=self.database,
+            properties=properties,
         )
 
         if missing is not None:
@@ -598,7 +830,8 @@ class Client(ClientWithProject):
                 helpers.key_from_protobuf(deferred_pb) for deferred_pb in deferred
             ]
 
-        return [helpers.entity_from_protobuf(entity_pb._pb) for entity_pb in entity_pbs]
+        with _hooks._stage(self._hooks, _hooks.DECODE, "lookup", len(entity_results)):
+            return [helpers.entity_from_result(result) for result in entity_results]
 
     def put(self, entity, retry=None, timeout=None):
         """Save an entity in the Cloud Datastore.
@@ -734,6 +967,107 @@ class Client(ClientWithProject):
         if not in_batch:
             current.commit(retry=retry, timeout=timeout)
 
+    def increment(self, key, name, value=1, retry=None, timeout=None):
+        """Atomically add ``value`` to a numeric property of an entity.
+
+        The backend updates the property without a read or a transaction,
+        which suits frequently updated counters. See
+        :meth:`google.cloud.datastore.batch.Batch.increment`.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity to update.
+
+        :type name: str
+        :param name: The name of the property.
+
+        :type value: int or float
+        :param value: (Optional) The amount to add. Defaults to 1.
+
+        :type retry: :class:`google.api_core.retry.Retry`
+        :param retry:
+            A retry object used to retry requests. If ``None`` is specified,
+            requests will be retried using a default configuration.
+            Only meaningful outside of another batch / transaction.
+
+        :type timeout: float
+        :param timeout:
+            Time, in seconds, to wait for the request to complete.
+            Note that if ``retry`` is specified, the timeout applies
+            to each individual attempt.  Only meaningful outside of another
+            batch / transaction.
+
+        :rtype: int, float or ``NoneType``
+        :returns: The new value of the property, or None when called inside
+                  a batch / transaction (see its ``transform_results``).
+        """
+        return self._transform("increment", key, name, value, retry, timeout)
+
+    def maximum(self, key, name, value, retry=None, timeout=None):
+        """Atomically raise a numeric property to at least ``value``.
+
+        See :meth:`increment` for the other parameters.
+
+        :type value: int or float
+        :param value: The lower bound of the property.
+
+        :rtype: int, float or ``NoneType``
+        :returns: The new value of the property, or None inside a batch.
+        """
+        return self._transform("maximum", key, name, value, retry, timeout)
+
+    def minimum(self, key, name, value, retry=None, timeout=None):
+        """Atomically lower a numeric property to at most ``value``.
+
+        See :meth:`increment` for the other parameters.
+
+        :type value: int or float
+        :param value: The upper bound of the property.
+
+        :rtype: int, float or ``NoneType``
+        :returns: The new value of the property, or None inside a batch.
+        """
+        return self._transform("minimum", key, name, value, retry, timeout)
+
+    def array_union(self, key, name, values, retry=None, timeout=None):
+        """Atomically append the missing ``values`` to an array property.
+
+        See :meth:`increment` for the other parameters.
+
+        :type values: list
+        :param values: The values to append, unless already present.
+        """
+        self._transform("array_union", key, name, values, retry, timeout)
+
+    def array_remove(self, key, name, values, retry=None, timeout=None):
+        """Atomically remove all of ``values`` from an array property.
+
+        See :meth:`increment` for the other parameters.
+
+        :type values: list
+        :param values: The values to remove.
+        """
+        self._transform("array_remove", key, name, values, retry, timeout)
+
+    def _transform(self, method_name, key, name, value, retry, timeout):
+        """Apply one property transform, in the current batch if any.
+
+        :type method_name: str
+        :param method_name: The :class:`~.batch.Batch` method to call.
+
+        :rtype: object
+        :returns: The transform result if committed here, else None.
+        """
+        current = self.current_batch
+        if current is not None:
+            getattr(current, method_name)(key, name, value)
+            return None
+
+        batch = self.batch()
+        batch.begin()
+        getattr(batch, method_name)(key, name, value)
+        batch.commit(retry=retry, timeout=timeout)
+        return batch.transform_results[0]
+
     def allocate_ids(self, incomplete_key, num_ids, retry=None, timeout=None):
         """Allocate a list of IDs from a partial key.
 
@@ -810,10 +1144,130 @@ class Client(ClientWithProject):
     def transaction(self, **kwargs):
         """Proxy to :class:`google.cloud.datastore.transaction.Transaction`.
 
+        The transaction is begun lazily by default: the first read starts
+        it inline, and a transaction which only writes is begun and
+        committed by a single ``Commit`` call, saving the
+        ``BeginTransaction`` round-trip. Its ``id`` is None until then.
+        Pass ``begin_later=False`` (or create the client with
+        ``begin_transactions_lazily=False``) to begin it when entered.
+
         :param kwargs: Keyword arguments to be passed in.
         """
+        kwargs.setdefault("begin_later", self._begin_transactions_lazily)
         return Transaction(self, **kwargs)
 
+    def snapshot(self, read_time=None):
+        """Proxy to :class:`google.cloud.datastore.snapshot.Snapshot`.
+
+        :type read_time: datetime
+        :param read_time: (Optional) Time at which the snapshot reads.
+                          Defaults to a few seconds before now.
+        """
+        return Snapshot(self, read_time=read_time)
+
+    def run_in_transaction(
+        self,
+        fn,
+        max_attempts=_DEFAULT_TRANSACTION_ATTEMPTS,
+        initial_backoff=_DEFAULT_INITIAL_BACKOFF,
+        max_backoff=_DEFAULT_MAX_BACKOFF,
+        **kwargs
+    ):
+        """Run a callable inside a transaction, retrying on contention.
+
+        ``fn`` is called with a fresh
+        :class:`~google.cloud.datastore.transaction.Transaction`, which is
+        committed once ``fn`` returns.  If the transaction is aborted
+        because of contention, ``fn`` is run again in a new transaction
+        after an exponentially growing, fully jittered delay.  Each retry
+        passes the ID of the aborted transaction as
+        ``previous_transaction``, so the backend keeps the priority of
+        the earlier attempt rather than letting it starve.
+
+        ``fn`` may be called more than once and should not have side
+        effects outside of the transaction.  The transaction's
+        :attr:`~google.cloud.datastore.transaction.Transaction.attempt`
+        property holds the 1-based attempt number.
+
+        .. testsetup:: run-in-transaction
+
+            import uuid
+
+            from google.cloud import datastore
+
+            unique = str(uuid.uuid4())[0:8]
+            client = datastore.Client(namespace='ns{}'.format(unique))
+
+            key1 = client.key('Account', 'alice')
+            key2 = client.key('Account', 'bob')
+            accounts = [datastore.Entity(key1), datastore.Entity(key2)]
+            for account in accounts:
+                account['balance'] = 100
+            client.put_multi(accounts)
+
+        .. doctest:: run-in-transaction
+
+            >>> def transfer(transaction):
+            ...     source, target = client.get_multi([key1, key2])
+            ...     source['balance'] -= 10
+            ...     target['balance'] += 10
+            ...     transaction.put_multi([source, target])
+            >>> client.run_in_transaction(transfer)
+
+        .. testcleanup:: run-in-transaction
+
+            client.delete_multi([key1, key2])
+
+        :type fn: callable
+        :param fn: Called with the active transaction as its only argument.
+
+        :type max_attempts: int
+        :param max_attempts: (Optional) Maximum number of times ``fn`` is
+                             run before the last error is re-raised.
+
+        :type initial_backoff: float
+        :param initial_backoff: (Optional) Upper bound, in seconds, of the
+                                delay before the first retry.  The bound
+                                doubles after each attempt.
+
+        :type max_backoff: float
+        :param max_backoff: (Optional) Largest delay, in seconds, between
+                            two attempts.
+
+        :param kwargs: Keyword arguments passed to :meth:`transaction`.
+
+        :rtype: object
+        :returns: The value returned by ``fn`` in the attempt that committed.
+
+        :raises: :class:`ValueError` if ``max_attempts`` is less than 1, or
+                 the last :class:`~google.api_core.exceptions.Aborted` error
+                 once all attempts are exhausted.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+
+        previous_transaction = None
+        for attempt in range(1, max_attempts + 1):
+            if previous_transaction is not None:
+                kwargs["previous_transaction"] = previous_transaction
+            transaction = self.transaction(**kwargs)
+            transaction._attempt = attempt
+            try:
+                with transaction:
+                    try:
+                        result = fn(transaction)
+                    finally:
+                        # Read the ID before commit / rollback clear it.
+                        if transaction.id is not None:
+                            previous_transaction = transaction.id
+            except core_exceptions.Conflict as exc:
+                if not _is_contention_error(exc) or attempt == max_attempts:
+                    raise
+                delay = min(max_backoff, initial_backoff * 2 ** (attempt - 1))
+                time.sleep(random.uniform(0, delay))
+            else:
+                return result
+
     def query(self, **kwargs):
         """Proxy to :class:`google.cloud.datastore.query.Query`.
 
@@ -876,6 +1330,46 @@ class Client(ClientWithProject):
             kwargs["namespace"] = self.namespace
         return Query(self, **kwargs)
 
+    def gql(self, query_string, *args, **kwargs):
+        """Run a GQL query.
+
+        Passes our ``project`` and ``namespace``.
+
+        .. doctest:: query
+
+            >>> query_iter = client.gql(
+            ...     "SELECT * FROM MyKind WHERE property = @value", value="val")
+            >>> for entity in query_iter:
+            ...     do_something_with(entity)
+
+        Each call builds a new :class:`~google.cloud.datastore.gql.GqlQuery`,
+        so the backend parses ``query_string`` every time. To run the same
+        query again without having it parsed again, keep a
+        :class:`~google.cloud.datastore.gql.GqlQuery` and call its
+        :meth:`~google.cloud.datastore.gql.GqlQuery.fetch` method.
+
+        :type query_string: str
+        :param query_string: The GQL query.
+
+        :param args: Values bound to the ``@1``, ``@2``... binding sites.
+
+        :param kwargs: Values bound to the ``@name`` binding sites.
+
+        :rtype: :class:`~google.cloud.datastore.gql.GqlIterator`
+        :returns: The iterator for the query.
+        :raises: :class:`ValueError` if the bindings do not match the binding
+                 sites of ``query_string``.
+        """
+        query = GqlQuery(
+            self,
+            query_string,
+            positional_bindings=args,
+            named_bindings=kwargs,
+            project=self.project,
+            namespace=self.namespace,
+        )
+        return query.fetch()
+
     def aggregation_query(self, query, **kwargs):
         """Proxy to :class:`google.cloud.datastore.aggregation.AggregationQuery`.
 
@@ -956,6 +1450,198 @@ class Client(ClientWithProject):
         """
         return AggregationQuery(self, query, **kwargs)
 
+    def _run_aggregation(
+        self,
+        aggregation_query,
+        eventual,
+        retry,
+        deadline,
+        read_time,
+        transaction=None,
+    ):
+        """Run one aggregation query to completion.
+
+        Helper for :meth:`run_aggregations`.
+
+        :rtype: dict
+        :returns: The aggregation values keyed by alias.
+        """
+        values = {}
+        iterator = aggregation_query.fetch(
+            client=self,
+            eventual=eventual,
+            retry=retry,
+            timeout=_remaining(deadline),
+            read_time=read_time,
+            transaction=transaction,
+        )
+        for results in iterator:
+            for result in results:
+                values[result.alias] = result.value
+        return values
+
+    def run_aggregations(
+        self,
+        aggregation_queries,
+        eventual=False,
+        retry=None,
+        timeout=None,
+        read_time=None,
+        max_workers=None,
+    ):
+        """Run many aggregation queries concurrently.
+
+        .. testsetup:: run_aggregations
+
+            import uuid
+
+            from google.cloud import datastore
+
+            unique = str(uuid.uuid4())[0:8]
+            client = datastore.Client(namespace='ns{}'.format(unique))
+
+        .. doctest:: run_aggregations
+
+            >>> active = client.aggregation_query(
+            ...     client.query(kind='Task', filters=[('done', '=', False)])
+            ... ).count(alias='active')
+            >>> done = client.aggregation_query(
+            ...     client.query(kind='Task', filters=[('done', '=', True)])
+            ... ).count(alias='done')
+            >>> client.run_aggregations([active, done])
+            {'active': 0, 'done': 0}
+
+        :type aggregation_queries: list of
+            :class:`~google.cloud.datastore.aggregation.AggregationQuery`
+        :param aggregation_queries: The queries to run. Every aggregation
+                                    must have an alias, unique across all
+                                    of the queries.
+
+        :type eventual: bool
+        :param eventual: (Optional) Defaults to strongly consistent (False).
+                         Setting True will use eventual consistency, but cannot
+                         be used inside a transaction or with read_time, or will
+                         raise ValueError.
+
+        :type retry: :class:`google.api_core.retry.Retry`
+        :param retry:
+            A retry object used to retry requests. If ``None`` is specified,
+            requests will be retried using a default configuration.
+
+        :type timeout: float
+        :param timeout:
+            (Optional) Deadline, in seconds, shared by all of the queries.
+            Each request is sent with the time remaining before it.
+
+        :type read_time: datetime
+        :param read_time: (Optional) Read time to use for read consistency.
+
+        :type max_workers: int
+        :param max_workers: (Optional) Maximum number of threads used to run
+                            the queries.
+
+        :rtype: dict
+        :returns: The aggregation values of all queries, keyed by alias.
+        :raises: :class:`ValueError` if an alias is missing or repeated;
+                 :class:`google.api_core.exceptions.DeadlineExceeded` if the
+                 queries do not complete within ``timeout``.
+        """
+        _check_aggregation_aliases(aggregation_queries)
+        if not aggregation_queries:
+            return {}
+
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        # The batch stack is local to this thread, so hand the transaction
+        # to the workers explicitly.
+        transaction = self.current_transaction
+
+        def run(aggregation_query):
+            return self._run_aggregation(
+                aggregation_query, eventual, retry, deadline, read_time, transaction
+            )
+
+        values = {}
+        num_workers = min(
+            max_workers or _DEFAULT_AGGREGATION_WORKERS, len(aggregation_queries)
+        )
+        executor = concurrent.futures.ThreadPoolExecutor(num_workers)
+        try:
+            futures = [executor.submit(run, query) for query in aggregation_queries]
+            _, not_done = concurrent.futures.wait(futures, timeout=_remaining(deadline))
+            if not_done:
+                for future in not_done:
+                    future.cancel()
+                raise _deadline_exceeded(len(not_done))
+            for future in futures:
+                values.update(future.result())
+        finally:
+            executor.shutdown(wait=False)
+        return values
+
+    async def run_aggregations_async(
+        self,
+        aggregation_queries,
+        eventual=False,
+        retry=None,
+        timeout=None,
+        read_time=None,
+        max_workers=None,
+    ):
+        """Run many aggregation queries concurrently from a coroutine.
+
+        Same as :meth:`run_aggregations`, except that the requests are run
+        on a thread pool without blocking the event loop. Cannot be used
+        inside a transaction.
+
+        :rtype: dict
+        :returns: The aggregation values of all queries, keyed by alias.
+        :raises: :class:`ValueError` if an alias is missing or repeated, or if
+                 called inside a transaction;
+                 :class:`google.api_core.exceptions.DeadlineExceeded` if the
+                 queries do not complete within ``timeout``.
+        """
+        _check_aggregation_aliases(aggregation_queries)
+        if self.current_transaction is not None:
+            raise ValueError("run_aggregations_async cannot be used in a transaction")
+        if not aggregation_queries:
+            return {}
+
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        loop = asyncio.get_running_loop()
+        num_workers = min(
+            max_workers or _DEFAULT_AGGREGATION_WORKERS, len(aggregation_queries)
+        )
+        executor = concurrent.futures.ThreadPoolExecutor(num_workers)
+        futures = [
+            loop.run_in_executor(
+                executor,
+                self._run_aggregation,
+                aggregation_query,
+                eventual,
+                retry,
+                deadline,
+                read_time,
+            )
+            for aggregation_query in aggregation_queries
+        ]
+        try:
+            results = await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        except asyncio.TimeoutError:
+            raise _deadline_exceeded(sum(1 for future in futures if future.cancelled()))
+        finally:
+            executor.shutdown(wait=False)
+
+        values = {}
+        for result in results:
+            values.update(result)
+        return values
+
     def reserve_ids_sequential(self, complete_key, num_ids, retry=None, timeout=None):
         """Reserve a list of IDs sequentially from a complete key.
 
@@ -125,6 +125,11 @@ class Entity(dict):
         Python3), will be saved using the 'blob_value' field, without
         any decoding / encoding step.
 
+    Entities returned by lookups and queries, and entities saved by a
+    commit, also carry the ``version``, ``create_time`` and
+    ``update_time`` reported by the backend. These are not compared by
+    ``==``.
+
     :type key: :class:`google.cloud.datastore.key.Key`
     :param key: Optional key to be set on entity.
 
@@ -140,6 +145,12 @@ class Entity(dict):
             _ensure_tuple_or_list("exclude_from_indexes", exclude_from_indexes)
         )
         """Names of fields which are *not* to be indexed for this entity."""
+        self.version = None
+        """Version of the entity when last read or written, if known."""
+        self.create_time = None
+        """Time at which the entity was created, if known."""
+        self.update_time = None
+        """Time at which the entity was last updated, if known."""
         # NOTE: This will be populated when parsing a protobuf in
         #       google.cloud.datastore.helpers.entity_from_protobuf.
         self._meanings = {}
@@ -0,0 +1,293 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Create / interact with Google Cloud Datastore GQL queries."""
+
+import base64
+import functools
+import re
+
+from google.cloud.datastore_v1.types import query as query_pb2
+from google.cloud.datastore import helpers
+from google.cloud.datastore.query import Iterator
+
+
+_BINDING_SITE_RE = re.compile(
+    r"""
+    '(?:[^'\\]|\\.|'')*'            # single-quoted string
+    | "(?:[^"\\]|\\.|"")*"          # double-quoted string
+    | `(?:[^`\\]|\\.|``)*`          # quoted identifier
+    | @(?P<name>[A-Za-z_$][A-Za-z_$0-9]*|[0-9]+)
+    """,
+    re.VERBOSE,
+)
+
+_MAX_CACHED_TEMPLATES = 256
+"""Number of query strings whose binding sites are remembered."""
+
+
+@functools.lru_cache(maxsize=_MAX_CACHED_TEMPLATES)
+def _binding_sites(query_string):
+    """Find the binding sites of a GQL query string.
+
+    Results are cached, so that running the same query string with
+    different parameters only scans it once.
+
+    :type query_string: str
+    :param query_string: The GQL query.
+
+    :rtype: tuple
+    :returns: The set of named binding sites, and the highest numbered one
+              (0 if there are none).
+    """
+    names = set()
+    max_position = 0
+    for match in _BINDING_SITE_RE.finditer(query_string):
+        name = match.group("name")
+        if name is None:
+            continue
+        if name.isdigit():
+            max_position = max(max_position, int(name))
+        else:
+            names.add(name)
+    return frozenset(names), max_position
+
+
+class GqlQuery(object):
+    """A query written in `GQL`_.
+
+    .. _GQL: https://cloud.google.com/datastore/docs/apis/gql/gql_reference
+
+    The backend parses the query string on the first :meth:`fetch`. The
+    parsed query is kept, and later fetches (and pages) send it rather than
+    the query string.
+
+    :type client: :class:`google.cloud.datastore.client.Client`
+    :param client: The client used to connect to Datastore.
+
+    :type query_string: str
+    :param query_string: The GQL query, with ``@name`` or ``@1`` binding
+                         sites for its parameters.
+
+    :type positional_bindings: sequence
+    :param positional_bindings: (Optional) Values bound to ``@1``, ``@2``...
+
+    :type named_bindings: dict
+    :param named_bindings: (Optional) Values bound to ``@name`` sites.
+
+    :type allow_literals: bool
+    :param allow_literals: (Optional) Whether the query string may contain
+                           literal values. Defaults to True.
+
+    :type project: str
+    :param project: (Optional) The project associated with the query. If
+                    not passed, uses the client's value.
+
+    :type namespace: str
+    :param namespace: (Optional) The namespace to which to restrict
+                      results. If not passed, uses the client's value.
+
+    :raises: :class:`ValueError` if the bindings do not match the binding
+             sites of ``query_string``.
+    """
+
+    def __init__(
+        self,
+        client,
+        query_string,
+        positional_bindings=(),
+        named_bindings=None,
+        allow_literals=True,
+        project=None,
+        namespace=None,
+    ):
+        named_bindings = named_bindings or {}
+        names, max_position = _binding_sites(query_string)
+        missing = sorted(names.difference(named_bindings))
+        if missing:
+            raise ValueError("Missing GQL bindings: %s" % (", ".join(missing),))
+        unused = sorted(set(named_bindings).difference(names))
+        if unused:
+            raise ValueError("Unused GQL bindings: %s" % (", ".join(unused),))
+        if len(positional_bindings) != max_position:
+            raise ValueError(
+                "Expected %d positional GQL bindings, got %d"
+                % (max_position, len(positional_bindings))
+            )
+
+        self._client = client
+        self._project = project
+        self._namespace = namespace
+        self._explain_options = None
+
+        gql_pb = query_pb2.GqlQuery(
+            query_string=query_string, allow_literals=allow_literals
+        )._pb
+        for value in positional_bindings:
+            helpers._set_protobuf_value(gql_pb.positional_bindings.add().value, value)
+        for name, value in named_bindings.items():
+            helpers._set_protobuf_value(gql_pb.named_bindings[name].value, value)
+        self._gql_pb = gql_pb
+
+        # Set from the backend's parsed form of the query.
+        self._pb_template = None
+        self._limit = None
+        self._offset = None
+        self._start_cursor = None
+        self._end_cursor = None
+
+    @property
+    def project(self):
+        """Get the project for this query.
+
+        :rtype: str
+        :returns: The project for the query.
+        """
+        return self._project or self._client.project
+
+    @property
+    def namespace(self):
+        """Get the namespace for this query.
+
+        :rtype: str or None
+        :returns: The namespace assigned to this query.
+        """
+        return self._namespace or self._client.namespace
+
+    @property
+    def query_string(self):
+        """Get the GQL query string.
+
+        :rtype: str
+        :returns: The query string.
+        """
+        return self._gql_pb.query_string
+
+    def _compiled_pb(self):
+        """Return the parsed query, without cursors, offset or limit.
+
+        :rtype: :class:`google.cloud.datastore_v1.types.query_pb2.Query._pb`
+        :returns: The raw, shared query protobuf, or None if the query has
+                  not been parsed yet.
+        """
+        return self._pb_template
+
+    def _set_parsed(self, query_pb):
+        """Remember the backend's parsed form of the query.
+
+        :type query_pb: :class:`.query_pb2.Query._pb`
+        :param query_pb: The *raw* parsed query.
+        """
+        if query_pb.HasField("limit"):
+            self._limit = query_pb.limit.value
+        if query_pb.offset:
+            self._offset = query_pb.offset
+        if query_pb.start_cursor:
+            self._start_cursor = base64.urlsafe_b64encode(query_pb.start_cursor)
+        if query_pb.end_cursor:
+            self._end_cursor = base64.urlsafe_b64encode(query_pb.end_cursor)
+
+        template = query_pb2.Query()._pb
+        template.CopyFrom(query_pb)
+        for field in ("limit", "offset", "start_cursor", "end_cursor"):
+            template.ClearField(field)
+        self._pb_template = template
+
+    def fetch(
+        self,
+        client=None,
+        eventual=False,
+        retry=None,
+        timeout=None,
+        read_time=None,
+        transaction=None,
+    ):
+        """Execute the query; return an iterator for the matching entities.
+
+        Limits, offsets and cursors are part of the GQL query string.
+
+        :type client: :class:`google.cloud.datastore.client.Client`
+        :param client: (Optional) client used to connect to datastore.
+                       If not supplied, uses the query's value.
+
+        See :meth:`google.cloud.datastore.query.Query.fetch` for the other
+        parameters.
+
+        :rtype: :class:`GqlIterator`
+        :returns: The iterator for the query.
+        """
+        if client is None:
+            client = self._client
+
+        return GqlIterator(
+            self,
+            client,
+            eventual=eventual,
+            retry=retry,
+            timeout=timeout,
+            read_time=read_time,
+            transaction=transaction,
+        )
+
+
+class GqlIterator(Iterator):
+    """Represent the state of a given execution of a :class:`GqlQuery`.
+
+    The first ``runQuery`` request of a query which has not been parsed
+    yet sends the GQL query; all others send the parsed query.
+
+    See :class:`~google.cloud.datastore.query.Iterator` for the parameters.
+    """
+
+    def __init__(self, query, client, **kwargs):
+        super(GqlIterator, self).__init__(query, client, **kwargs)
+        if query._compiled_pb() is not None:
+            self._apply_parsed()
+
+    def _apply_parsed(self):
+        """Take the limit, offset and cursors of the parsed query."""
+        query = self._query
+        self.max_results = query._limit
+        self._offset = query._offset
+        self.next_page_token = query._start_cursor
+        self._end_cursor = query._end_cursor
+
+    def _set_query_to_request(self, request):
+        """Add the query for the next page to a ``runQuery`` request.
+
+        :type request: dict
+        :param request: The request being built.
+        """
+        if self._query._compiled_pb() is None:
+            request["gql_query"] = query_pb2.GqlQuery.wrap(self._query._gql_pb)
+        else:
+            super(GqlIterator, self)._set_query_to_request(request)
+
+    def _query_from_response(self, request, response_pb):
+        """Switch to the parsed query after the GQL query is run.
+
+        :type request: dict
+        :param request: The request just sent.
+
+        :type response_pb: :class:`.datastore_pb2.RunQueryResponse`
+        :param response_pb: The response received.
+        """
+        if "gql_query" not in request:
+            return
+        del request["gql_query"]
+        parsed_pb = response_pb._pb.query
+        self._query._set_parsed(parsed_pb)
+        self._apply_parsed()
+        # Re-sent as is if the backend has more results to skip.
+        request["query"] = query_pb2.Query.wrap(parsed_pb)
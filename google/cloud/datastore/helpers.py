@@ -17,8 +17,10 @@
 The non-private functions are part of the API.
 """
 
+import array
 import datetime
 import itertools
+import sys
 
 from google.protobuf import struct_pb2
 from google.type import latlng_pb2
@@ -27,10 +29,24 @@ from proto.datetime_helpers import DatetimeWithNanoseconds
 from google.cloud._helpers import _datetime_to_pb_timestamp
 from google.cloud.datastore_v1.types import datastore as datastore_pb2
 from google.cloud.datastore_v1.types import entity as entity_pb2
+from google.cloud.datastore_v1.types import query as query_pb2
 from google.cloud.datastore.entity import Entity
 from google.cloud.datastore.key import Key
 from google.protobuf import timestamp_pb2
 
+_VECTOR_MEANING = 31
+"""Meaning of an ``array_value`` holding a :class:`Vector`."""
+
+_VECTOR_ITEM_SIZE = 11
+"""Encoded size of one vector component in an ``ArrayValue``.
+
+Each component is a ``values`` entry (tag ``0x0a``, length ``0x09``)
+holding a ``Value`` with only ``double_value`` set (tag ``0x19``,
+followed by the 8 bytes of the little-endian double).
+"""
+
+_VECTOR_ITEM_TAGS = (0x0A, 0x09, 0x19)
+
 
 def _get_meaning(value_pb, is_list=False):
     """Get the meaning from a protobuf value.
@@ -146,6 +162,47 @@ def entity_from_protobuf(pb):
     return entity
 
 
+def entity_from_result(result_pb):
+    """Create an entity from a lookup or query result.
+
+    Same as :func:`entity_from_protobuf`, but also records the entity's
+    version and timestamps, see :func:`set_entity_metadata`.
+
+    :type result_pb: :class:`.query_pb2.EntityResult`
+    :param result_pb: The result holding the entity.
+
+    :rtype: :class:`google.cloud.datastore.entity.Entity`
+    :returns: The entity derived from the result.
+    """
+    if isinstance(result_pb, query_pb2.EntityResult):
+        result_pb = result_pb._pb
+    entity = entity_from_protobuf(result_pb.entity)
+    set_entity_metadata(entity, result_pb)
+    return entity
+
+
+def set_entity_metadata(entity, result_pb):
+    """Copy the version and timestamps of a result onto an entity.
+
+    :type entity: :class:`google.cloud.datastore.entity.Entity`
+    :param entity: The entity to update.
+
+    :type result_pb: :class:`.query_pb2.EntityResult` or
+                     :class:`.datastore_pb2.MutationResult` (raw protobuf)
+    :param result_pb: The result reported for the entity.
+    """
+    if result_pb.version:
+        entity.version = result_pb.version
+    if result_pb.HasField("create_time"):
+        entity.create_time = DatetimeWithNanoseconds.from_timestamp_pb(
+            result_pb.create_time
+        )
+    if result_pb.HasField("update_time"):
+        entity.update_time = DatetimeWithNanoseconds.from_timestamp_pb(
+            result_pb.update_time
+        )
+
+
 def _set_pb_meaning_from_entity(entity, name, value, value_pb, is_list=False):
     """Add meaning information (from an entity) to a protobuf.
 
@@ -226,7 +283,11 @@ def entity_to_protobuf(entity):
         _set_protobuf_value(value_pb, value)
 
         # Add index information to protobuf.
-        if name in entity.exclude_from_indexes:
+        if isinstance(value, Vector):
+            # Vectors are searched with vector indexes only, wherever they
+            # are stored (embedded entities are encoded by this function).
+            value_pb.exclude_from_indexes = True
+        elif name in entity.exclude_from_indexes:
             if not value_is_list:
                 value_pb.exclude_from_indexes = True
 
@@ -296,6 +357,11 @@ def get_transaction_options(transaction):
 
     These are mutually-exclusive fields, so one or both will be None.
 
+    When new_transaction_options is returned, the caller is the one read
+    allowed to begin the transaction, and must report the outcome through
+    ``transaction._begin_with_id`` or ``transaction._release_begin``.
+    Concurrent reads wait until the transaction ID is known.
+
     :rtype: Tuple[Optional[bytes], Optional[google.cloud.datastore_v1.types.TransactionOptions]]
     :returns: The transaction_id and new_transaction_options fields from the transaction object.
     """
@@ -305,10 +371,35 @@ def get_transaction_options(transaction):
             transaction_id = transaction.id
         elif transaction._begin_later and transaction._status == transaction._INITIAL:
             # If the transaction has not yet been begun, we can use the new_transaction_options field.
-            new_transaction_options = transaction._options
+            new_transaction_options = transaction._claim_begin()
+            if new_transaction_options is None:
+                # Another read began the transaction while we waited.
+                transaction_id = transaction.id
     return transaction_id, new_transaction_options
 
 
+def begin_transaction_from_read(transaction, response_pb, new_transaction_options):
+    """Record the outcome of a read which was sent with ``new_transaction``.
+
+    :type transaction: :class:`google.cloud.datastore.transaction.Transaction`
+    :param transaction: The transaction the read was made in.
+
+    :type response_pb: protobuf message or None
+    :param response_pb: The read response, or None if the read failed.
+
+    :type new_transaction_options:
+        :class:`google.cloud.datastore_v1.types.TransactionOptions` or None
+    :param new_transaction_options: The options returned by
+                                    :func:`get_transaction_options`.
+    """
+    if new_transaction_options is None:
+        return
+    if response_pb is not None and response_pb.transaction:
+        transaction._begin_with_id(response_pb.transaction)
+    else:
+        transaction._release_begin()
+
+
 def key_from_protobuf(pb):
     """Factory method for creating a key based on a protobuf.
 
@@ -380,7 +471,8 @@ def _pb_attr_value(val):
         :class:`datetime.datetime`, :class:`google.cloud.datastore.key.Key`,
         bool, float, integer, bytes, str, unicode,
         :class:`google.cloud.datastore.entity.Entity`, dict, list,
-        :class:`google.cloud.datastore.helpers.GeoPoint`, NoneType
+        :class:`google.cloud.datastore.helpers.GeoPoint`,
+        :class:`google.cloud.datastore.helpers.Vector`, NoneType
     :param val: The value to be scrutinized.
 
     :rtype: tuple
@@ -408,7 +500,7 @@ def _pb_attr_value(val):
         entity_val = Entity(key=None)
         entity_val.update(val)
         name, value = "entity", entity_val
-    elif isinstance(val, list):
+    elif isinstance(val, (list, Vector)):
         name, value = "array", val
     elif isinstance(val, GeoPoint):
         name, value = "geo_point", val.to_protobuf()
@@ -465,9 +557,15 @@ def _get_value_from_value_pb(pb):
         result = entity_from_protobuf(pb.entity_value)
 
     elif value_type == "array_value":
-        result = [
-            _get_value_from_value_pb(item_value) for item_value in pb.array_value.values
-        ]
+        if pb.meaning == _VECTOR_MEANING:
+            result = _vector_from_array_pb(pb.array_value)
+        else:
+            result = None
+        if result is None:
+            result = [
+                _get_value_from_value_pb(item_value)
+                for item_value in pb.array_value.values
+            ]
 
     elif value_type == "geo_point_value":
         result = GeoPoint(
@@ -484,6 +582,65 @@ def _get_value_from_value_pb(pb):
     return result
 
 
+def _vector_from_array_pb(array_pb):
+    """Decode the components of a vector in bulk.
+
+    Rather than reading one ``Value`` message per component, the array is
+    serialized and the doubles are sliced out of the wire format.
+
+    :type array_pb: :class:`.entity_pb2.ArrayValue._pb`
+    :param array_pb: The *raw* array holding the components.
+
+    :rtype: :class:`Vector` or ``NoneType``
+    :returns: The vector, or None if the array holds anything but plain
+              doubles.
+    """
+    data = array_pb.SerializeToString()
+    count = len(data) // _VECTOR_ITEM_SIZE
+    if len(data) != count * _VECTOR_ITEM_SIZE or count != len(array_pb.values):
+        return None
+    for offset, tag in enumerate(_VECTOR_ITEM_TAGS):
+        if data[offset::_VECTOR_ITEM_SIZE] != bytes((tag,)) * count:
+            return None
+
+    raw = bytearray(8 * count)
+    start = len(_VECTOR_ITEM_TAGS)
+    for offset in range(8):
+        raw[offset::8] = data[start + offset :: _VECTOR_ITEM_SIZE]
+    values = array.array("d")
+    values.frombytes(raw)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return Vector._from_array(values)
+
+
+def _vector_to_array_pb(array_pb, vector):
+    """Encode the components of a vector in bulk.
+
+    Inverse of :func:`_vector_from_array_pb`.
+
+    :type array_pb: :class:`.entity_pb2.ArrayValue._pb`
+    :param array_pb: The *raw* (empty) array to fill.
+
+    :type vector: :class:`Vector`
+    :param vector: The vector to encode.
+    """
+    values = vector._values
+    if sys.byteorder == "big":
+        values = array.array("d", values)
+        values.byteswap()
+    raw = values.tobytes()
+    count = len(values)
+
+    data = bytearray(count * _VECTOR_ITEM_SIZE)
+    for offset, tag in enumerate(_VECTOR_ITEM_TAGS):
+        data[offset::_VECTOR_ITEM_SIZE] = bytes((tag,)) * count
+    start = len(_VECTOR_ITEM_TAGS)
+    for offset in range(8):
+        data[start + offset :: _VECTOR_ITEM_SIZE] = raw[offset::8]
+    array_pb.MergeFromString(bytes(data))
+
+
 def _set_protobuf_value(value_pb, val):
     """Assign 'val' to the correct subfield of 'value_pb'.
 
@@ -509,6 +666,10 @@ def _set_protobuf_value(value_pb, val):
     elif attr == "entity_value":
         entity_pb = entity_to_protobuf(val)
         value_pb.entity_value.CopyFrom(entity_pb._pb)
+    elif isinstance(val, Vector):
+        value_pb.array_value.SetInParent()
+        _vector_to_array_pb(value_pb.array_value, val)
+        value_pb.meaning = _VECTOR_MEANING
     elif attr == "array_value":
         if len(val) == 0:
             array_value = entity_pb2.ArrayValue(values=[])._pb
@@ -532,6 +693,28 @@ def set_database_id_to_request(request, database_id=None):
         request["database_id"] = database_id
 
 
+def set_property_mask_to_request(request, properties=None):
+    """Restrict a lookup / query request to some properties, if requested.
+
+    :type request: dict
+    :param request: The request to update.
+
+    :type properties: sequence of str
+    :param properties: (Optional) Property paths to return. Use dots for
+                       properties of embedded entities.
+
+    :raises: :class:`ValueError` if ``properties`` is a string or empty.
+    """
+    if properties is None:
+        return
+    if isinstance(properties, str):
+        raise ValueError("properties must be a sequence of property names")
+    paths = list(properties)
+    if not paths:
+        raise ValueError("properties must name at least one property")
+    request["property_mask"] = datastore_pb2.PropertyMask(paths=paths)
+
+
 class GeoPoint(object):
     """Simple container for a geo point value.
 
@@ -572,3 +755,96 @@ class GeoPoint(object):
         :returns: False if the points compare equal, else True.
         """
         return not self == other
+
+
+class Vector(object):
+    """An embedding vector, stored as an array of doubles.
+
+    Vectors can be saved as entity properties and used as the query vector
+    of :meth:`google.cloud.datastore.query.Query.find_nearest`. Their
+    components are kept in an :class:`array.array` and encoded / decoded
+    in bulk, and vector properties are always excluded from the built-in
+    indexes, including those of embedded entities. A vector stored in a
+    list property is excluded only if the property is listed in the
+    entity's ``exclude_from_indexes``, as the items of a list must all be
+    indexed or all be excluded.
+
+    :type values: iterable of float
+    :param values: The components of the vector. One-dimensional buffers
+                   of doubles (an ``array.array('d')``, or a NumPy
+                   ``float64`` array) are copied without conversion.
+    """
+
+    def __init__(self, values):
+        self._values = array.array("d")
+        if isinstance(values, Vector):
+            values = values._values
+        try:
+            view = memoryview(values)
+        except TypeError:
+            view = None
+        if (
+            view is not None
+            and view.format == "d"
+            and view.ndim == 1
+            and view.c_contiguous
+        ):
+            self._values.frombytes(view.cast("B"))
+        else:
+            self._values.extend(map(float, values))
+
+    @classmethod
+    def _from_array(cls, values):
+        """Wrap an array of doubles without copying it.
+
+        :type values: :class:`array.array`
+        :param values: The components, with typecode ``d``.
+
+        :rtype: :class:`Vector`
+        :returns: The new vector.
+        """
+        vector = cls.__new__(cls)
+        vector._values = values
+        return vector
+
+    def to_array(self):
+        """Copy the components into a new array.
+
+        The array supports the buffer protocol, so
+        ``numpy.asarray(vector.to_array())`` does not copy them again.
+
+        :rtype: :class:`array.array`
+        :returns: The components, with typecode ``d``.
+        """
+        return array.array("d", self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __eq__(self, other):
+        """Compare two vectors for equality.
+
+        :rtype: bool
+        :returns: True if the vectors have the same components, else False.
+        """
+        if not isinstance(other, Vector):
+            return NotImplemented
+
+        return self._values == other._values
+
+    def __ne__(self, other):
+        """Compare two vectors for inequality.
+
+        :rtype: bool
+        :returns: False if the vectors compare equal, else True.
+        """
+        return not self == other
+
+    def __repr__(self):
+        return "Vector(%r)" % (list(self._values),)
@@ -0,0 +1,154 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Hooks observing the stages of a client's requests."""
+
+import time
+
+
+ENCODE = "encode"
+"""Stage converting entities to protobufs, before a ``commit`` call."""
+RPC = "rpc"
+"""Stage of a Datastore API call."""
+DECODE = "decode"
+"""Stage converting protobufs to entities, after a ``lookup`` or
+``run_query`` call."""
+
+
+class HookEvent(object):
+    """A stage of a client request, passed to :class:`ClientHook` methods.
+
+    :type stage: str
+    :param stage: :data:`ENCODE`, :data:`RPC` or :data:`DECODE`.
+
+    :type method: str
+    :param method: The API method the stage belongs to, e.g. ``"commit"``.
+
+    :type count: int
+    :param count: (Optional) The number of mutations encoded or of entities
+                  decoded. None for :data:`RPC`.
+    """
+
+    __slots__ = ("stage", "method", "count", "start_time", "duration", "error")
+
+    def __init__(self, stage, method, count=None):
+        self.stage = stage
+        self.method = method
+        self.count = count
+        self.start_time = None
+        """:func:`time.monotonic` at the start of the stage."""
+        self.duration = None
+        """Duration of the stage, in seconds; set for the ``post_`` hooks."""
+        self.error = None
+        """The exception raised by the stage, if any."""
+
+    def __repr__(self):
+        return "<HookEvent %s %s count=%r duration=%r>" % (
+            self.stage,
+            self.method,
+            self.count,
+            self.duration,
+        )
+
+
+class ClientHook(object):
+    """Base class for hooks called around each stage of a client's requests.
+
+    Pass instances to the client's ``hooks`` argument, and override the
+    methods for the stages of interest. Each ``pre_`` method is called
+    right before the stage, and each ``post_`` method right after it, with
+    the same :class:`HookEvent`, whose ``duration`` is then set. The time
+    spent in the hooks is not part of the duration.
+
+    Hooks are called on the thread making the request, and must not raise.
+    """
+
+    def pre_encode(self, event):
+        """Called before the mutations of a commit are encoded."""
+
+    def post_encode(self, event):
+        """Called after the mutations of a commit are encoded."""
+
+    def pre_rpc(self, event):
+        """Called before a Datastore API call."""
+
+    def post_rpc(self, event):
+        """Called after a Datastore API call, even if it failed."""
+
+    def pre_decode(self, event):
+        """Called before the entities of a response are decoded."""
+
+    def post_decode(self, event):
+        """Called after the entities of a response are decoded."""
+
+
+class _Stage(object):
+    """Context manager calling the hooks around a stage."""
+
+    __slots__ = ("_hooks", "_event")
+
+    def __init__(self, hooks, event):
+        self._hooks = hooks
+        self._event = event
+
+    def __enter__(self):
+        event = self._event
+        for hook in self._hooks:
+            getattr(hook, "pre_" + event.stage)(event)
+        event.start_time = time.monotonic()
+        return event
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        event = self._event
+        event.duration = time.monotonic() - event.start_time
+        event.error = exc_val
+        for hook in self._hooks:
+            getattr(hook, "post_" + event.stage)(event)
+        return False
+
+
+class _NullStage(object):
+    """Stand-in for :class:`_Stage` when a client has no hooks."""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _stage(hooks, stage, method, count=None):
+    """Call hooks around a stage of a request.
+
+    :type hooks: sequence of :class:`ClientHook`
+    :param hooks: The client's hooks.
+
+    :type stage: str
+    :param stage: :data:`ENCODE`, :data:`RPC` or :data:`DECODE`.
+
+    :type method: str
+    :param method: The API method the stage belongs to.
+
+    :type count: int
+    :param count: (Optional) The number of items processed by the stage.
+
+    :rtype: context manager
+    :returns: A context manager calling the hooks on entry and exit.
+    """
+    if not hooks:
+        return _NULL_STAGE
+    return _Stage(hooks, HookEvent(stage, method, count))
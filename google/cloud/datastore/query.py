@@ -14,6 +14,12 @@
 
 """Create / interact with Google Cloud Datastore queries."""
 import base64
+import concurrent.futures
+import datetime
+import functools
+import heapq
+import itertools
+import time
 import warnings
 
 from google.api_core import page_iterator
@@ -21,7 +27,9 @@ from google.cloud._helpers import _ensure_tuple_or_list
 
 from google.cloud.datastore_v1.types import entity as entity_pb2
 from google.cloud.datastore_v1.types import query as query_pb2
+from google.cloud.datastore import _telemetry
 from google.cloud.datastore import helpers
+from google.cloud.datastore import hooks as _hooks
 from google.cloud.datastore.key import Key
 
 
@@ -34,6 +42,9 @@ from abc import ABC
 
 _NOT_FINISHED = query_pb2.QueryResultBatch.MoreResultsType.NOT_FINISHED
 _NO_MORE_RESULTS = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+_MORE_RESULTS_AFTER_LIMIT = (
+    query_pb2.QueryResultBatch.MoreResultsType.MORE_RESULTS_AFTER_LIMIT
+)
 
 _FINISHED = (
     _NO_MORE_RESULTS,
@@ -44,6 +55,28 @@ _FINISHED = (
 
 KEY_PROPERTY_NAME = "__key__"
 
+_ADAPTIVE_INITIAL_PAGE_SIZE = 100
+"""Page size used for the first request when adapting without a hint."""
+_ADAPTIVE_MIN_PAGE_SIZE = 10
+"""Smallest per-request limit chosen by adaptive paging."""
+_ADAPTIVE_MAX_PAGE_SIZE = 1000
+"""Largest per-request limit chosen by adaptive paging."""
+_ADAPTIVE_TARGET_PAGE_BYTES = 1024 * 1024
+"""Response payload size adaptive paging aims for, in bytes."""
+_ADAPTIVE_TARGET_PAGE_LATENCY = 0.5
+"""Response latency adaptive paging aims for, in seconds."""
+
+_MAX_FAN_OUT_QUERIES = 30
+"""Maximum number of sub-queries a fanned-out query may expand to."""
+_DEFAULT_FAN_OUT_WORKERS = 8
+"""Default number of threads used to run fanned-out sub-queries."""
+_DEFAULT_FAN_OUT_PAGE_SIZE = 500
+"""Default number of merged results per page of a fanned-out query."""
+_INEQUALITY_OPERATORS = frozenset(["<", "<=", ">", ">=", "!=", "NOT_IN"])
+"""Operators of the filters whose property the backend implicitly orders by."""
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
 
 class BaseFilter(ABC):
     """Base class for Filters"""
@@ -199,6 +232,13 @@ class Query(object):
     }
     """Mapping of operator strings and their protobuf equivalents."""
 
+    DISTANCE_MEASURES = {
+        "EUCLIDEAN": query_pb2.FindNearest.DistanceMeasure.EUCLIDEAN,
+        "COSINE": query_pb2.FindNearest.DistanceMeasure.COSINE,
+        "DOT_PRODUCT": query_pb2.FindNearest.DistanceMeasure.DOT_PRODUCT,
+    }
+    """Mapping of vector distance measures and their protobuf equivalents."""
+
     def __init__(
         self,
         client,
@@ -214,6 +254,9 @@ class Query(object):
     ):
         self._client = client
         self._kind = kind
+        # Compiled protobuf for the query's configuration; cleared by every
+        # setter that changes it.
+        self._pb_template = None
 
         if project:
             self._project = project
@@ -232,6 +275,7 @@ class Query(object):
         self._explain_options = explain_options
         self._ancestor = ancestor
         self._filters = []
+        self._find_nearest = None
 
         # Verify filters passed in.
         for filter in filters:
@@ -299,6 +343,7 @@ class Query(object):
         if not isinstance(value, str):
             raise TypeError("Kind must be a string")
         self._kind = value
+        self._pb_template = None
 
     @property
     def ancestor(self):
@@ -319,11 +364,13 @@ class Query(object):
         if not isinstance(value, Key):
             raise TypeError("Ancestor must be a Key")
         self._ancestor = value
+        self._pb_template = None
 
     @ancestor.deleter
     def ancestor(self):
         """Remove the ancestor for the query."""
         self._ancestor = None
+        self._pb_template = None
 
     @property
     def filters(self):
@@ -446,6 +493,78 @@ class Query(object):
         if isinstance(filter, BaseFilter):
             self._filters.append(filter)
 
+        self._pb_template = None
+        return self
+
+    def find_nearest(
+        self,
+        vector_property,
+        query_vector,
+        distance_measure,
+        limit,
+        distance_result_property=None,
+        distance_threshold=None,
+    ):
+        """Return the entities whose vectors are nearest to ``query_vector``.
+
+        The nearest neighbors are ordered by distance, which supersedes
+        :attr:`order`. Filters are applied before the search, and the
+        vector property must have a vector index.
+
+        :type vector_property: str
+        :param vector_property: The name of the property holding the
+                                entities' vectors.
+
+        :type query_vector: :class:`~google.cloud.datastore.helpers.Vector`
+                            or sequence of float
+        :param query_vector: The vector to search near.
+
+        :type distance_measure: str
+        :param distance_measure: One of ``EUCLIDEAN``, ``COSINE`` or
+                                 ``DOT_PRODUCT``.
+
+        :type limit: int
+        :param limit: The number of nearest neighbors to return, at most 100.
+
+        :type distance_result_property: str
+        :param distance_result_property: (Optional) Name of a property in
+                                         which to return the computed
+                                         distance of each entity.
+
+        :type distance_threshold: float
+        :param distance_threshold: (Optional) Only return entities at most
+                                   this far (at least this close for
+                                   ``DOT_PRODUCT``).
+
+        :rtype: :class:`Query`
+        :returns: A query object.
+
+        :raises: :class:`ValueError` if ``distance_measure`` is unknown, or
+                 ``limit`` is not between 1 and 100.
+        """
+        if distance_measure not in self.DISTANCE_MEASURES:
+            error_message = 'Invalid distance measure "%s"' % (distance_measure,)
+            choices_message = "Please use one of: %s." % (
+                ", ".join(self.DISTANCE_MEASURES),
+            )
+            raise ValueError(error_message, choices_message)
+        if not 1 <= limit <= 100:
+            raise ValueError("limit must be between 1 and 100")
+        if not isinstance(query_vector, helpers.Vector):
+            query_vector = helpers.Vector(query_vector)
+
+        find_nearest_pb = query_pb2.FindNearest()._pb
+        find_nearest_pb.vector_property.name = vector_property
+        helpers._set_protobuf_value(find_nearest_pb.query_vector, query_vector)
+        find_nearest_pb.distance_measure = self.DISTANCE_MEASURES[distance_measure]
+        find_nearest_pb.limit.value = limit
+        if distance_result_property is not None:
+            find_nearest_pb.distance_result_property = distance_result_property
+        if distance_threshold is not None:
+            find_nearest_pb.distance_threshold.value = distance_threshold
+
+        self._find_nearest = find_nearest_pb
+        self._pb_template = None
         return self
 
     @property
@@ -468,10 +587,12 @@ class Query(object):
         if isinstance(projection, str):
             projection = [projection]
         self._projection[:] = projection
+        self._pb_template = None
 
     def keys_only(self):
         """Set the projection to include only keys."""
         self._projection[:] = [KEY_PROPERTY_NAME]
+        self._pb_template = None
 
     def key_filter(self, key, operator="="):
         """Filter on a key.
@@ -509,6 +630,7 @@ class Query(object):
         if isinstance(value, str):
             value = [value]
         self._order[:] = value
+        self._pb_template = None
 
     @property
     def distinct_on(self):
@@ -530,6 +652,7 @@ class Query(object):
         if isinstance(value, str):
             value = [value]
         self._distinct_on[:] = value
+        self._pb_template = None
 
     def fetch(
         self,
@@ -542,6 +665,12 @@ class Query(object):
         retry=None,
         timeout=None,
         read_time=None,
+        page_size=None,
+        adaptive_page_size=False,
+        fan_out=False,
+        max_workers=None,
+        transaction=None,
+        properties=None,
     ):
         """Execute the Query; return an iterator for the matching entities.
 
@@ -616,12 +745,84 @@ class Query(object):
             (Optional) use read_time read consistency, cannot be used inside a
             transaction or with eventual consistency, or will raise ValueError.
 
+        :type page_size: int
+        :param page_size:
+            (Optional) maximum number of entities requested per ``runQuery``
+            call. If not passed, the batch size is chosen by the backend.
+
+        :type adaptive_page_size: bool
+        :param adaptive_page_size:
+            (Optional) If True, the per-request limit is adjusted after each
+            page based on the observed response latency and payload size,
+            starting from ``page_size`` (if passed). Defaults to False.
+
+        :type fan_out: bool
+        :param fan_out:
+            (Optional) If True, split ``Or`` filters and ``IN`` property
+            filters into independent sub-queries, run them concurrently and
+            merge the results client-side, de-duplicated by key (and by
+            projected values, for a projection query) and sorted according
+            to :attr:`order`, then by the properties of inequality filters
+            not in it, then by key. Sub-queries with inequality filters on
+            different properties must be ordered by all of them. The
+            sub-queries' first pages are fetched concurrently, and their
+            later pages as the merge reaches them, so memory use is bounded
+            by the page sizes rather than by the total number of results.
+            ``page_size`` applies to each sub-query and to the merged pages.
+            Cannot be combined with cursors, ``distinct_on`` or
+            ``explain_options``. Defaults to False.
+
+        :type max_workers: int
+        :param max_workers:
+            (Optional) Maximum number of threads used when ``fan_out`` is
+            True.
+
+        :type transaction:
+            :class:`~google.cloud.datastore.transaction.Transaction`
+        :param transaction:
+            (Optional) Transaction to use for read consistency. If not passed,
+            uses the current transaction, if set. Passing it explicitly lets
+            other threads read within the same transaction concurrently.
+
+        :type properties: sequence of str
+        :param properties:
+            (Optional) Only return these properties of the matching
+            entities, using dots for properties of embedded entities. Unlike
+            :attr:`projection`, the properties need not be indexed, and
+            array values are returned whole. With ``fan_out``, the mask must
+            include the properties in :attr:`order`.
+
         :rtype: :class:`Iterator`
         :returns: The iterator for the query.
+        :raises: :class:`ValueError` if ``fan_out`` is combined with
+                 unsupported options, if the query expands to more than
+                 30 sub-queries or to sub-queries sorted differently, or if
+                 ``properties`` is passed for a projection query.
         """
         if client is None:
             client = self._client
 
+        if properties is not None and self._projection:
+            raise ValueError("properties cannot be used with a projection query")
+
+        if fan_out:
+            return self._fetch_fan_out(
+                client,
+                limit=limit,
+                offset=offset,
+                start_cursor=start_cursor,
+                end_cursor=end_cursor,
+                eventual=eventual,
+                retry=retry,
+                timeout=timeout,
+                read_time=read_time,
+                page_size=page_size,
+                adaptive_page_size=adaptive_page_size,
+                max_workers=max_workers,
+                transaction=transaction,
+                properties=properties,
+            )
+
         return Iterator(
             self,
             client,
@@ -633,6 +834,127 @@ class Query(object):
             retry=retry,
             timeout=timeout,
             read_time=read_time,
+            page_size=page_size,
+            adaptive_page_size=adaptive_page_size,
+            transaction=transaction,
+            properties=properties,
+        )
+
+    def _compiled_pb(self):
+        """Return the compiled protobuf for this query's configuration.
+
+        The protobuf is built on first use and reused until a setter
+        changes the query. Callers must copy it before modifying it; see
+        :func:`_pb_from_query`.
+
+        .. note::
+
+           Filter objects are not copied, so changing a filter after it was
+           added is not picked up until another setter is called.
+
+        :rtype: :class:`google.cloud.datastore_v1.types.query_pb2.Query._pb`
+        :returns: The raw, shared query protobuf.
+        """
+        if self._pb_template is None:
+            self._pb_template = _compile_query_pb(self)._pb
+        return self._pb_template
+
+    def _fetch_fan_out(
+        self,
+        client,
+        limit,
+        offset,
+        start_cursor,
+        end_cursor,
+        eventual,
+        retry,
+        timeout,
+        read_time,
+        page_size,
+        adaptive_page_size,
+        max_workers,
+        transaction,
+        properties,
+    ):
+        """Build the iterator used by :meth:`fetch` when ``fan_out=True``."""
+        if start_cursor is not None or end_cursor is not None:
+            raise ValueError("fan_out cannot be used with cursors")
+        if self._distinct_on:
+            raise ValueError("fan_out cannot be used with distinct_on")
+        if self._explain_options is not None:
+            raise ValueError("fan_out cannot be used with explain_options")
+        if self._find_nearest is not None:
+            raise ValueError("fan_out cannot be used with find_nearest")
+
+        conjunctions = _split_disjunctions(self._filters)
+        if len(conjunctions) > _MAX_FAN_OUT_QUERIES:
+            raise ValueError(
+                "Query expands to %d sub-queries; at most %d are allowed."
+                % (len(conjunctions), _MAX_FAN_OUT_QUERIES)
+            )
+
+        # Merging needs every sub-query sorted the same way, so spell out
+        # the order the backend would use for each of them.
+        branch_orders = [
+            _branch_order(self._order, conjunction) for conjunction in conjunctions
+        ]
+        order = branch_orders[0]
+        if any(branch_order != order for branch_order in branch_orders):
+            raise ValueError(
+                "fan_out sub-queries would be sorted differently; set an order "
+                "starting with the properties of the inequality filters"
+            )
+
+        if properties is not None:
+            order_names = set(prop.lstrip("-") for prop in order)
+            order_names.discard(KEY_PROPERTY_NAME)
+            if not order_names.issubset(properties):
+                raise ValueError("fan_out properties must include the order properties")
+
+        if len(conjunctions) == 1:
+            # Nothing to fan out.
+            return Iterator(
+                self,
+                client,
+                limit=limit,
+                offset=offset,
+                eventual=eventual,
+                retry=retry,
+                timeout=timeout,
+                read_time=read_time,
+                page_size=page_size,
+                adaptive_page_size=adaptive_page_size,
+                transaction=transaction,
+                properties=properties,
+            )
+
+        sub_queries = [
+            Query(
+                self._client,
+                kind=self._kind,
+                project=self._project,
+                namespace=self._namespace,
+                ancestor=self._ancestor,
+                filters=conjunction,
+                projection=self._projection,
+                order=order,
+            )
+            for conjunction in conjunctions
+        ]
+        return _FanOutIterator(
+            sub_queries,
+            client,
+            limit=limit,
+            offset=offset,
+            eventual=eventual,
+            retry=retry,
+            timeout=timeout,
+            read_time=read_time,
+            page_size=page_size,
+            adaptive_page_size=adaptive_page_size,
+            max_workers=max_workers,
+            transaction=transaction,
+            properties=properties,
         )
 
 
@@ -682,6 +1004,24 @@ class Iterator(page_iterator.Iterator):
     :param read_time: (Optional) Runs the query with read time consistency.
                       Cannot be used with eventual consistency or inside a
                       transaction, otherwise will raise ValueError. This feature is in private preview.
+
+    :type page_size: int
+    :param page_size: (Optional) Maximum number of entities requested per
+                      ``runQuery`` call.
+
+    :type adaptive_page_size: bool
+    :param adaptive_page_size: (Optional) Adjust the per-request limit from
+                               observed response latency and payload size.
+
+    :type transaction: :class:`~google.cloud.datastore.transaction.Transaction`
+    :param transaction: (Optional) Transaction to read in. If not passed, uses
+                        the client's current transaction, if set.
+
+    :type properties: sequence of str
+    :param properties: (Optional) Only return these properties of the
+                       matching entities.
+
+    :raises: :class:`ValueError` if ``page_size`` is not a positive integer.
     """
 
     next_page_token = None
@@ -698,6 +1038,10 @@ class Iterator(page_iterator.Iterator):
         retry=None,
         timeout=None,
         read_time=None,
+        page_size=None,
+        adaptive_page_size=False,
+        transaction=None,
+        properties=None,
     ):
         super(Iterator, self).__init__(
             client=client,
@@ -712,10 +1056,33 @@ class Iterator(page_iterator.Iterator):
         self._retry = retry
         self._timeout = timeout
         self._read_time = read_time
+        self._transaction = transaction
+        self._properties = properties
+        if page_size is not None and page_size <= 0:
+            raise ValueError("page_size must be a positive integer")
+        if adaptive_page_size:
+            self._page_sizer = _AdaptivePageSize(page_size)
+        else:
+            self._page_sizer = None
+        self._page_size = page_size
         # The attributes below will change over the life of the iterator.
         self._explain_metrics = None
         self._more_results = True
         self._skipped_results = 0
+        self._explain_options = None
+        self._explain_options_known = False
+        self._limited_by_page_size = False
+
+    @property
+    def page_size(self):
+        """The per-request limit used for the next ``runQuery`` call.
+
+        :rtype: int or None
+        :returns: The current page size, or None if the backend chooses.
+        """
+        if self._page_sizer is not None:
+            return self._page_sizer.size
+        return self._page_size
 
     def _build_protobuf(self):
         """Build a query protobuf.
@@ -737,8 +1104,19 @@ class Iterator(page_iterator.Iterator):
         if end_cursor is not None:
             pb.end_cursor = base64.urlsafe_b64decode(end_cursor)
 
+        limit = None
         if self.max_results is not None:
-            pb.limit = self.max_results - self.num_results
+            limit = self.max_results - self.num_results
+
+        page_size = self.page_size
+        self._limited_by_page_size = page_size is not None and (
+            limit is None or page_size < limit
+        )
+        if self._limited_by_page_size:
+            limit = page_size
+
+        if limit is not None:
+            pb.limit = limit
 
         if start_cursor is None and self._offset is not None:
             # NOTE: We don't need to add an offset to the request protobuf
@@ -749,6 +1127,48 @@ class Iterator(page_iterator.Iterator):
 
         return pb
 
+    def _set_query_to_request(self, request):
+        """Add the query for the next page to a ``runQuery`` request.
+
+        Overridden by :class:`~google.cloud.datastore.gql.GqlIterator`.
+
+        :type request: dict
+        :param request: The request being built.
+        """
+        request["query"] = self._build_protobuf()
+
+    def _query_from_response(self, request, response_pb):
+        """Update the request from a ``runQuery`` response, if needed.
+
+        Called after each ``runQuery`` call of :meth:`_run_query`, before
+        the request is re-sent to skip more results. Overridden by
+        :class:`~google.cloud.datastore.gql.GqlIterator`.
+
+        :type request: dict
+        :param request: The request just sent.
+
+        :type response_pb: :class:`.datastore_pb2.RunQueryResponse`
+        :param response_pb: The response received.
+        """
+
+    def _get_explain_options(self):
+        """Get the explain options of this execution of the query.
+
+        On the first call, the execution is offered to the client's
+        :class:`~google.cloud.datastore.query_profile.QueryProfiler`, if
+        any, which may sample it.
+
+        :rtype: :class:`~google.cloud.datastore.query_profile.ExplainOptions`
+        :returns: The explain options, or None.
+        """
+        if not self._explain_options_known:
+            self._explain_options = self._query._explain_options
+            profiler = self.client.query_profiler
+            if profiler is not None:
+                self._explain_options = profiler._explain_options(self._explain_options)
+            self._explain_options_known = True
+        return self._explain_options
+
     def _process_query_results(self, response_pb):
         """Process the response from a datastore query.
 
@@ -770,12 +1190,19 @@ class Iterator(page_iterator.Iterator):
 
         if response_pb.batch.more_results == _NOT_FINISHED:
             self._more_results = True
+        elif (
+            response_pb.batch.more_results == _MORE_RESULTS_AFTER_LIMIT
+            and self._limited_by_page_size
+        ):
+            # The limit was our page size rather than the caller's limit,
+            # so keep paging from the returned cursor.
+            self._more_results = True
         elif response_pb.batch.more_results in _FINISHED:
             self._more_results = False
         else:
             raise ValueError("Unexpected value returned for `more_results`.")
 
-        return [result.entity for result in response_pb.batch.entity_results]
+        return response_pb.batch.entity_results
 
     def _next_page(self):
         """Get the next page in the iterator.
@@ -787,10 +1214,52 @@ class Iterator(page_iterator.Iterator):
         if not self._more_results:
             return None
 
-        new_transaction_options = None
+        transaction = self._transaction
+        if transaction is None:
+            transaction = self.client.current_transaction
         transaction_id, new_transaction_options = helpers.get_transaction_options(
-            self.client.current_transaction
+            transaction
         )
+        started = time.monotonic()
+        with _telemetry.span(
+            self.client._datastore_api,
+            "datastore.query.page",
+            {"datastore.page_number": self.page_number},
+        ) as span:
+            try:
+                response_pb = self._run_query(
+                    transaction, transaction_id, new_transaction_options
+                )
+            except:  # noqa: E722 do not use bare except, specify exception instead
+                helpers.begin_transaction_from_read(
+                    transaction, None, new_transaction_options
+                )
+                raise
+
+            entity_pbs = self._process_query_results(response_pb)
+            span.set_attribute("datastore.results", len(entity_pbs))
+        if self._page_sizer is not None:
+            self._page_sizer.observe(
+                len(entity_pbs),
+                response_pb._pb.ByteSize(),
+                time.monotonic() - started,
+            )
+        hooks = getattr(self.client, "_hooks", ())
+        if hooks:
+            # Decode the page now, so that the hooks can time it.
+            with _hooks._stage(hooks, _hooks.DECODE, "run_query", len(entity_pbs)):
+                entities = [self.item_to_value(self, pb) for pb in entity_pbs]
+            return page_iterator.Page(self, entities, _item_to_fetched_value)
+        return page_iterator.Page(self, entity_pbs, self.item_to_value)
+
+    def _run_query(self, transaction, transaction_id, new_transaction_options):
+        """Send the ``runQuery`` request(s) for the next page.
+
+        Helper for :meth:`_next_page`.
+
+        :rtype: :class:`.datastore_pb2.RunQueryResponse`
+        :returns: The response holding the next page.
+        """
         read_options = helpers.get_read_options(
             self._eventual, transaction_id, self._read_time, new_transaction_options
         )
@@ -813,12 +1282,14 @@ class Iterator(page_iterator.Iterator):
             "project_id": self._query.project,
             "partition_id": partition_id,
             "read_options": read_options,
-            "query": self._build_protobuf(),
         }
-        if self._query._explain_options:
-            request["explain_options"] = self._query._explain_options._to_dict()
+        self._set_query_to_request(request)
+        explain_options = self._get_explain_options()
+        if explain_options:
+            request["explain_options"] = explain_options._to_dict()
 
         helpers.set_database_id_to_request(request, self.client.database)
+        helpers.set_property_mask_to_request(request, self._properties)
 
         response_pb = None
 
@@ -840,15 +1311,26 @@ class Iterator(page_iterator.Iterator):
             response_pb = self.client._datastore_api.run_query(
                 request=request.copy(), **kwargs
             )
+            self._query_from_response(request, response_pb)
+            if new_transaction_options is not None:
+                # set new transaction id if we just started a transaction,
+                # and read within it from now on
+                helpers.begin_transaction_from_read(
+                    transaction, response_pb, new_transaction_options
+                )
+                new_transaction_options = None
+                request["read_options"] = helpers.get_read_options(
+                    self._eventual, transaction.id, self._read_time
+                )
             # capture explain metrics if present in response
             # should only be present in last response, and only if explain_options was set
             if response_pb and response_pb.explain_metrics:
                 self._explain_metrics = ExplainMetrics._from_pb(
                     response_pb.explain_metrics
                 )
-
-        entity_pbs = self._process_query_results(response_pb)
-        return page_iterator.Page(self, entity_pbs, self.item_to_value)
+                if self.client.query_profiler is not None:
+                    self.client.query_profiler._record(request, self._explain_metrics)
+        return response_pb
 
     @property
     def explain_metrics(self) -> ExplainMetrics:
@@ -878,9 +1360,408 @@ class Iterator(page_iterator.Iterator):
         )
 
 
+class _FanOutIterator(page_iterator.Iterator):
+    """Run several queries concurrently and merge their results.
+
+    Results are merged in the sort order of the sub-queries (which share
+    the same explicit ``order``, ending with the key) and de-duplicated by
+    key, or by key and projected values for a projection query. The first
+    page of every sub-query is fetched concurrently; later pages are
+    fetched as the merge reaches them.
+
+    :type queries: list of :class:`Query`
+    :param queries: The sub-queries, each a conjunction of filters.
+
+    :type client: :class:`~google.cloud.datastore.client.Client`
+    :param client: The client used to make requests.
+
+    :type limit: int
+    :param limit: (Optional) Limit the number of merged results returned.
+
+    :type offset: int
+    :param offset: (Optional) Number of merged results to skip.
+
+    :type page_size: int
+    :param page_size: (Optional) Maximum number of entities requested per
+                      ``runQuery`` call of each sub-query, and of merged
+                      results per page.
+
+    :type max_workers: int
+    :param max_workers: (Optional) Maximum number of threads used to run
+                        the sub-queries.
+
+    See :class:`Iterator` for ``eventual``, ``retry``, ``timeout``,
+    ``read_time``, ``adaptive_page_size``, ``transaction`` and
+    ``properties``.
+    """
+
+    next_page_token = None
+
+    def __init__(
+        self,
+        queries,
+        client,
+        limit=None,
+        offset=None,
+        eventual=False,
+        retry=None,
+        timeout=None,
+        read_time=None,
+        page_size=None,
+        adaptive_page_size=False,
+        max_workers=None,
+        transaction=None,
+        properties=None,
+    ):
+        super(_FanOutIterator, self).__init__(
+            client=client,
+            item_to_value=_item_to_fetched_value,
+        )
+        self._queries = queries
+        self._limit = limit
+        self._offset = offset or 0
+        self._eventual = eventual
+        self._retry = retry
+        self._timeout = timeout
+        self._read_time = read_time
+        self._page_size = page_size
+        self._adaptive_page_size = adaptive_page_size
+        self._max_workers = max_workers or _DEFAULT_FAN_OUT_WORKERS
+        self._transaction = transaction
+        self._properties = properties
+        # The merged results, once the sub-queries are started.
+        self._results = None
+
+    def _fetch_one(self, transaction, query):
+        """Start a single sub-query, fetching its first page.
+
+        :type transaction:
+            :class:`~google.cloud.datastore.transaction.Transaction`
+        :param transaction: The transaction to read in, if any.
+
+        :type query: :class:`Query`
+        :param query: The sub-query to run.
+
+        :rtype: iterator of :class:`~google.cloud.datastore.entity.Entity`
+        :returns: The sub-query's results, in its sort order. Its pages
+                  after the first are fetched as it is consumed.
+        """
+        limit = None
+        if self._limit is not None:
+            limit = self._offset + self._limit
+        pages = query.fetch(
+            limit=limit,
+            client=self.client,
+            eventual=self._eventual,
+            retry=self._retry,
+            timeout=self._timeout,
+            read_time=self._read_time,
+            page_size=self._page_size,
+            adaptive_page_size=self._adaptive_page_size,
+            transaction=transaction,
+            properties=self._properties,
+        ).pages
+        first_page = next(pages, ())
+        return itertools.chain(first_page, itertools.chain.from_iterable(pages))
+
+    def _start(self):
+        """Run all sub-queries and merge their results.
+
+        :rtype: iterator of :class:`~google.cloud.datastore.entity.Entity`
+        :returns: The merged results, after ``offset`` and up to ``limit``.
+        """
+        # The batch stack is local to this thread, so hand the transaction
+        # to the workers explicitly.
+        transaction = self._transaction
+        if transaction is None:
+            transaction = self.client.current_transaction
+        fetch_one = functools.partial(self._fetch_one, transaction)
+        num_workers = min(self._max_workers, len(self._queries))
+        with concurrent.futures.ThreadPoolExecutor(num_workers) as executor:
+            results = list(executor.map(fetch_one, self._queries))
+
+        merged = heapq.merge(*results, key=_entity_sort_key(self._queries[0].order))
+        unique = _unique_rows(merged, self._queries[0].projection)
+        stop = None
+        if self._limit is not None:
+            stop = self._offset + self._limit
+        return itertools.islice(unique, self._offset, stop)
+
+    def _next_page(self):
+        """Get the next page of merged results.
+
+        :rtype: :class:`~google.api_core.page_iterator.Page`
+        :returns: The next page (or :data:`None` if there are no more).
+        """
+        if self._results is None:
+            self._results = self._start()
+        page_size = self._page_size or _DEFAULT_FAN_OUT_PAGE_SIZE
+        entities = list(itertools.islice(self._results, page_size))
+        if not entities:
+            return None
+        return page_iterator.Page(self, entities, self.item_to_value)
+
+
+def _split_disjunctions(filters):
+    """Rewrite a list of (AND-ed) filters as a disjunction of conjunctions.
+
+    ``Or`` filters contribute one alternative per child and ``IN`` property
+    filters contribute one ``=`` alternative per value.
+
+    :type filters: list
+    :param filters: Filters as stored on a :class:`Query`.
+
+    :rtype: list of list of :class:`PropertyFilter`
+    :returns: One list of filters per sub-query.
+    """
+    conjunctions = [[]]
+    for filter in filters:
+        alternatives = _filter_alternatives(filter)
+        conjunctions = [
+            conjunction + alternative
+            for conjunction in conjunctions
+            for alternative in alternatives
+        ]
+    return conjunctions
+
+
+def _filter_alternatives(filter):
+    """Expand a single filter into alternative lists of property filters.
+
+    :rtype: list of list of :class:`PropertyFilter`
+    :returns: The alternatives, any one of which satisfies ``filter``.
+    """
+    if isinstance(filter, Or):
+        return [
+            alternative
+            for child in filter.filters
+            for alternative in _filter_alternatives(child)
+        ]
+    if isinstance(filter, BaseCompositeFilter):
+        return _split_disjunctions(filter.filters)
+    if not isinstance(filter, PropertyFilter):
+        filter = PropertyFilter(*filter)
+    if filter.operator == "IN":
+        return [
+            [PropertyFilter(filter.property_name, "=", value)] for value in filter.value
+        ]
+    return [[filter]]
+
+
+def _branch_order(order, conjunction):
+    """Get the order the backend sorts a fan-out sub-query's results in.
+
+    The properties of inequality filters missing from ``order`` follow it,
+    by name, then the key.
+
+    :type order: sequence of str
+    :param order: The query's order.
+
+    :type conjunction: list of :class:`PropertyFilter`
+    :param conjunction: The sub-query's filters.
+
+    :rtype: list of str
+    :returns: The explicit order of the sub-query.
+    """
+    order = list(order)
+    ordered = set(prop.lstrip("-") for prop in order)
+    if KEY_PROPERTY_NAME in ordered:
+        return order
+    inequalities = set(
+        filter.property_name
+        for filter in conjunction
+        if filter.operator in _INEQUALITY_OPERATORS
+    )
+    order.extend(sorted(inequalities - ordered - {KEY_PROPERTY_NAME}))
+    order.append(KEY_PROPERTY_NAME)
+    return order
+
+
+def _unique_rows(entities, projection=()):
+    """Yield entities, skipping any row which was already yielded.
+
+    Rows are identified by key. A projection query returns one row per
+    value of a multi-valued projected property, all with the same key, so
+    its rows are identified by key and projected values.
+
+    :type entities: iterable of :class:`~google.cloud.datastore.entity.Entity`
+    :param entities: The rows to de-duplicate.
+
+    :type projection: sequence of str
+    :param projection: (Optional) The projected properties, if any.
+    """
+    seen = set()
+    for entity in entities:
+        row = entity.key
+        if projection:
+            row = (row,) + tuple(
+                _hashable_value(entity.get(name)) for name in projection
+            )
+        if row in seen:
+            continue
+        seen.add(row)
+        yield entity
+
+
+def _hashable_value(value):
+    """Get a hashable stand-in for a projected property value."""
+    if isinstance(value, helpers.GeoPoint):
+        return (value.latitude, value.longitude)
+    return value
+
+
+def _entity_sort_key(order):
+    """Build a sort key matching the backend ordering for ``order``.
+
+    Entities are compared on each order property in turn (descending when
+    prefixed with ``-``), then on their key.
+
+    :type order: sequence of str
+    :param order: The query's order.
+
+    :rtype: callable
+    :returns: A function mapping an entity to a comparable value.
+    """
+    fields = []
+    for prop in order:
+        if prop.startswith("-"):
+            fields.append((prop[1:], True))
+        else:
+            fields.append((prop, False))
+
+    def sort_key(entity):
+        parts = []
+        for name, descending in fields:
+            if name == KEY_PROPERTY_NAME:
+                value = entity.key
+            else:
+                value = entity.get(name)
+            part = _value_sort_key(value, descending)
+            if descending:
+                part = _Descending(part)
+            parts.append(part)
+        parts.append(_value_sort_key(entity.key))
+        return tuple(parts)
+
+    return sort_key
+
+
+def _value_sort_key(value, descending=False):
+    """Map a property value to a tuple ordered like the backend orders it.
+
+    Values of different types sort by type: null, integers and timestamps,
+    booleans, byte strings, strings, doubles, geo points, then keys.
+    Multi-valued properties sort by their smallest value (or largest, when
+    ``descending``).
+    """
+    if isinstance(value, list):
+        if not value:
+            return (0,)
+        keys = [_value_sort_key(item) for item in value]
+        return max(keys) if descending else min(keys)
+    if value is None:
+        return (0,)
+    if isinstance(value, bool):
+        return (2, value)
+    if isinstance(value, int):
+        return (1, value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        delta = value - _EPOCH
+        return (1, (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+    if isinstance(value, bytes):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value.encode("utf-8"))
+    if isinstance(value, float):
+        return (5, value)
+    if isinstance(value, helpers.GeoPoint):
+        return (6, value.latitude, value.longitude)
+    if isinstance(value, Key):
+        path = []
+        for index in range(0, len(value.flat_path), 2):
+            kind = value.flat_path[index]
+            id_or_name = value.flat_path[index + 1 : index + 2]
+            if not id_or_name:
+                path.append((kind,))
+            elif isinstance(id_or_name[0], int):
+                path.append((kind, 0, id_or_name[0]))
+            else:
+                path.append((kind, 1, id_or_name[0]))
+        return (7, tuple(path))
+    return (8, repr(value))
+
+
+@functools.total_ordering
+class _Descending(object):
+    """Wrap a sort key so that it compares in reverse."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class _AdaptivePageSize(object):
+    """Choose per-request limits from observed page cost.
+
+    After each page, the next size is the one that would have hit both
+    ``_ADAPTIVE_TARGET_PAGE_BYTES`` and ``_ADAPTIVE_TARGET_PAGE_LATENCY``
+    given the observed per-entity cost, changing by at most a factor of two
+    between pages and staying within the adaptive bounds.
+
+    :type initial: int
+    :param initial: (Optional) Page size for the first request.
+    """
+
+    def __init__(self, initial=None):
+        if initial is None:
+            initial = _ADAPTIVE_INITIAL_PAGE_SIZE
+        self.size = initial
+
+    def observe(self, num_results, num_bytes, elapsed):
+        """Update :attr:`size` from the cost of a completed page.
+
+        :type num_results: int
+        :param num_results: Number of entities returned in the page.
+
+        :type num_bytes: int
+        :param num_bytes: Serialized size of the response.
+
+        :type elapsed: float
+        :param elapsed: Seconds spent waiting for the page.
+        """
+        if num_results <= 0:
+            return
+
+        candidates = []
+        if num_bytes > 0:
+            candidates.append(_ADAPTIVE_TARGET_PAGE_BYTES * num_results / num_bytes)
+        if elapsed > 0:
+            candidates.append(_ADAPTIVE_TARGET_PAGE_LATENCY * num_results / elapsed)
+        if not candidates:
+            return
+
+        target = min(candidates)
+        target = max(self.size / 2.0, min(self.size * 2.0, target))
+        self.size = int(
+            max(_ADAPTIVE_MIN_PAGE_SIZE, min(_ADAPTIVE_MAX_PAGE_SIZE, target))
+        )
+
+
 def _pb_from_query(query):
     """Convert a Query instance to the corresponding protobuf.
 
+    The query is compiled once (see :meth:`Query._compiled_pb`); each call
+    returns a copy that the caller is free to modify.
+
     :type query: :class:`Query`
     :param query: The source query.
 
@@ -890,6 +1771,22 @@ def _pb_from_query(query):
               executions (cursors, offset, limit).
     """
     pb = query_pb2.Query()
+    pb._pb.CopyFrom(query._compiled_pb())
+    return pb
+
+
+def _compile_query_pb(query):
+    """Build the protobuf for a query's configuration.
+
+    Helper for :meth:`Query._compiled_pb`.
+
+    :type query: :class:`Query`
+    :param query: The source query.
+
+    :rtype: :class:`.query_pb2.Query`
+    :returns: A new query protobuf without cursors, offset or limit.
+    """
+    pb = query_pb2.Query()
 
     for projection_name in query.projection:
         projection = query_pb2.Projection()
@@ -944,24 +1841,32 @@ def _pb_from_query(query):
         ref.name = distinct_on_name
         pb.distinct_on.append(ref)
 
+    if query._find_nearest is not None:
+        pb._pb.find_nearest.CopyFrom(query._find_nearest)
+
     return pb
 
 
 # pylint: disable=unused-argument
-def _item_to_entity(iterator, entity_pb):
-    """Convert a raw protobuf entity to the native object.
+def _item_to_entity(iterator, entity_result):
+    """Convert a raw protobuf entity result to the native object.
 
     :type iterator: :class:`~google.api_core.page_iterator.Iterator`
     :param iterator: The iterator that is currently in use.
 
-    :type entity_pb:
-        :class:`.entity_pb2.Entity`
-    :param entity_pb: An entity protobuf to convert to a native entity.
+    :type entity_result:
+        :class:`.query_pb2.EntityResult`
+    :param entity_result: An entity result to convert to a native entity.
 
     :rtype: :class:`~google.cloud.datastore.entity.Entity`
     :returns: The next entity in the page.
     """
-    return helpers.entity_from_protobuf(entity_pb)
+    return helpers.entity_from_result(entity_result)
+
+
+def _item_to_fetched_value(iterator, item):
+    """Return an already-converted item unchanged."""
+    return item
 
 
 # pylint: enable=unused-argument
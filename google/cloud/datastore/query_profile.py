@@ -16,8 +16,11 @@ from __future__ import annotations
 from typing import Any
 
 import datetime
+import random
+import threading
 
 from dataclasses import dataclass
+from google.protobuf import text_format
 from google.protobuf.json_format import MessageToDict
 
 
@@ -141,3 +144,153 @@ class QueryExplainError(Exception):
     """
 
     pass
+
+
+@dataclass(frozen=True)
+class QueryShapeStats:
+    """
+    Execution statistics of the sampled runs of one query shape.
+
+    :type shape: str
+    :param shape: The query, without its filter values, cursors, offset and
+        limit.
+    :type samples: int
+    :param samples: Number of sampled query executions. A query counts
+        once however many pages it returns, as its execution statistics
+        come with its last page.
+    :type results_returned: int
+    :param results_returned: Total number of results returned by the samples.
+    :type read_operations: int
+    :param read_operations: Total billable read operations of the samples.
+    :type execution_duration: datetime.timedelta
+    :param execution_duration: Total backend execution time of the samples.
+    """
+
+    shape: str
+    samples: int
+    results_returned: int
+    read_operations: int
+    execution_duration: datetime.timedelta
+
+
+class QueryProfiler(object):
+    """
+    Samples query executions of a client, and aggregates their execution
+    statistics per query shape.
+
+    Set on a client using its ``query_profiler`` argument. A sampled query
+    is run with ``ExplainOptions(analyze=True)``, which returns its results
+    as usual along with its execution statistics. Queries which already
+    set ``explain_options`` are recorded whenever their metrics include
+    execution statistics.
+
+    :type sample_rate: float
+    :param sample_rate: Fraction of queries to sample, between 0 and 1.
+        Defaults to 1, which samples every query.
+    :type callback: callable
+    :param callback: (Optional) Called with the shape and the
+        :class:`ExplainMetrics` of each sample, e.g. to export them.
+    """
+
+    def __init__(self, sample_rate=1.0, callback=None):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def _explain_options(self, explain_options):
+        """Get the explain options for a new query execution.
+
+        :type explain_options: :class:`ExplainOptions` or None
+        :param explain_options: The options set on the query.
+
+        :rtype: :class:`ExplainOptions` or None
+        :returns: ``explain_options`` if set, else the options used to
+            sample the execution, if it is sampled.
+        """
+        if explain_options is not None:
+            return explain_options
+        if self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+            return _SAMPLED_EXPLAIN_OPTIONS
+        return None
+
+    def _record(self, request, metrics):
+        """Record the metrics of a query response.
+
+        :type request: dict
+        :param request: The request the response answers.
+        :type metrics: :class:`ExplainMetrics`
+        :param metrics: The metrics of the response.
+        """
+        if not isinstance(metrics, _ExplainAnalyzeMetrics):
+            return
+        stats = metrics.execution_stats
+        shape = _query_shape(request)
+        with self._lock:
+            totals = self._totals.get(shape)
+            if totals is None:
+                totals = self._totals[shape] = [0, 0, 0, datetime.timedelta(0)]
+            totals[0] += 1
+            totals[1] += stats.results_returned
+            totals[2] += stats.read_operations
+            totals[3] += stats.execution_duration
+        if self.callback is not None:
+            self.callback(shape, metrics)
+
+    def stats(self):
+        """Get the statistics recorded so far.
+
+        :rtype: dict[str, QueryShapeStats]
+        :returns: The statistics of each sampled query shape.
+        """
+        with self._lock:
+            totals = {shape: tuple(values) for shape, values in self._totals.items()}
+        return {
+            shape: QueryShapeStats(shape, *values) for shape, values in totals.items()
+        }
+
+    def reset(self):
+        """Discard the statistics recorded so far."""
+        with self._lock:
+            self._totals = {}
+
+
+_SAMPLED_EXPLAIN_OPTIONS = ExplainOptions(analyze=True)
+
+
+def _clear_filter_values(filter_pb):
+    """Clear the values compared by a *raw* filter protobuf, in place."""
+    if filter_pb.HasField("composite_filter"):
+        for sub_filter_pb in filter_pb.composite_filter.filters:
+            _clear_filter_values(sub_filter_pb)
+    elif filter_pb.HasField("property_filter"):
+        filter_pb.property_filter.ClearField("value")
+
+
+def _query_shape(request):
+    """Describe the query of a ``runQuery`` or ``runAggregationQuery`` request.
+
+    Queries differing only by filter values, cursors, offset, limit or
+    nearest-neighbor query vector have the same shape.
+
+    :type request: dict
+    :param request: The request.
+
+    :rtype: str
+    :returns: The shape of the request's query.
+    """
+    if "aggregation_query" in request:
+        pb = request["aggregation_query"]._pb.__class__()
+        pb.CopyFrom(request["aggregation_query"]._pb)
+        query_pb = pb.nested_query
+    else:
+        pb = query_pb = request["query"]._pb.__class__()
+        pb.CopyFrom(request["query"]._pb)
+    for field in ("start_cursor", "end_cursor", "offset", "limit"):
+        query_pb.ClearField(field)
+    _clear_filter_values(query_pb.filter)
+    if query_pb.HasField("find_nearest"):
+        query_pb.find_nearest.ClearField("query_vector")
+    return text_format.MessageToString(pb, as_one_line=True)
@@ -0,0 +1,214 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process statistics of the Datastore API calls of a client."""
+
+import math
+import threading
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+_MIN_LATENCY = 1e-6
+"""Upper bound, in seconds, of the first latency bucket."""
+_BUCKETS_PER_DOUBLING = 8
+_NUM_BUCKETS = 28 * _BUCKETS_PER_DOUBLING
+"""Number of latency buckets, the last one ending after about 4 minutes."""
+
+
+@dataclass(frozen=True)
+class RPCStats:
+    """
+    Statistics of the calls to one Datastore API method.
+
+    Latency percentiles are estimated from a histogram whose buckets are
+    about 9% wide, and are None until the method is called.
+
+    :type method: str
+    :param method: The API method, e.g. ``"lookup"`` or ``"commit"``.
+    :type calls: int
+    :param calls: Number of calls.
+    :type errors: int
+    :param errors: Number of calls which raised an error.
+    :type bytes_sent: int
+    :param bytes_sent: Total size of the request messages.
+    :type bytes_received: int
+    :param bytes_received: Total size of the response messages.
+    :type latency_p50: float
+    :param latency_p50: Median call duration, in seconds.
+    :type latency_p95: float
+    :param latency_p95: 95th percentile of the call durations, in seconds.
+    :type latency_p99: float
+    :param latency_p99: 99th percentile of the call durations, in seconds.
+    """
+
+    method: str
+    calls: int
+    errors: int
+    bytes_sent: int
+    bytes_received: int
+    latency_p50: Optional[float]
+    latency_p95: Optional[float]
+    latency_p99: Optional[float]
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of the calls which raised an error."""
+        if not self.calls:
+            return 0.0
+        return self.errors / self.calls
+
+
+def _bucket_index(duration):
+    """Get the histogram bucket of a call duration, in seconds."""
+    if duration <= _MIN_LATENCY:
+        return 0
+    index = int(math.log2(duration / _MIN_LATENCY) * _BUCKETS_PER_DOUBLING)
+    return min(index, _NUM_BUCKETS - 1)
+
+
+def _bucket_upper_bound(index):
+    """Get the largest duration, in seconds, counted in a histogram bucket."""
+    return _MIN_LATENCY * 2 ** ((index + 1) / _BUCKETS_PER_DOUBLING)
+
+
+def _percentile(latencies, fraction):
+    """Estimate a percentile from histogram bucket counts."""
+    total = sum(latencies)
+    if not total:
+        return None
+    rank = fraction * total
+    seen = 0
+    for index, count in enumerate(latencies):
+        seen += count
+        if seen >= rank:
+            return _bucket_upper_bound(index)
+
+
+class _MethodCounters(object):
+    """Counters of one API method, updated by a single thread."""
+
+    __slots__ = ("calls", "errors", "bytes_sent", "bytes_received", "latencies")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latencies = [0] * _NUM_BUCKETS
+
+    def add(self, other):
+        self.calls += other.calls
+        self.errors += other.errors
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.latencies = [a + b for a, b in zip(self.latencies, other.latencies)]
+
+
+def _merge_shard(totals, shard):
+    for method, counters in list(shard.items()):
+        method_totals = totals.get(method)
+        if method_totals is None:
+            method_totals = totals[method] = _MethodCounters()
+        method_totals.add(counters)
+
+
+class _RPCStatsRecorder(object):
+    """Accumulate the statistics of a client's API calls.
+
+    Each thread updates counters of its own, so that recording a call
+    takes no lock. A thread's counters are folded into the shared totals
+    once the thread has exited.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = {}
+
+    def _thread_shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_shards(self):
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                _merge_shard(self._retired, shard)
+        self._shards = live
+
+    def record(self, method, duration, bytes_sent, bytes_received, error):
+        """Record one API call.
+
+        :type method: str
+        :param method: The API method called.
+
+        :type duration: float
+        :param duration: Duration of the call, in seconds.
+
+        :type bytes_sent: int
+        :param bytes_sent: Size of the request message.
+
+        :type bytes_received: int
+        :param bytes_received: Size of the response message.
+
+        :type error: bool
+        :param error: Whether the call raised an error.
+        """
+        shard = self._thread_shard()
+        counters = shard.get(method)
+        if counters is None:
+            counters = shard[method] = _MethodCounters()
+        counters.calls += 1
+        if error:
+            counters.errors += 1
+        counters.bytes_sent += bytes_sent
+        counters.bytes_received += bytes_received
+        counters.latencies[_bucket_index(duration)] += 1
+
+    def snapshot(self):
+        """Get the statistics recorded so far.
+
+        :rtype: dict[str, RPCStats]
+        :returns: The statistics of each API method called.
+        """
+        totals = {}
+        with self._lock:
+            self._retire_dead_shards()
+            _merge_shard(totals, self._retired)
+            for _, shard in self._shards:
+                _merge_shard(totals, shard)
+
+        return {
+            method: RPCStats(
+                method=method,
+                calls=counters.calls,
+                errors=counters.errors,
+                bytes_sent=counters.bytes_sent,
+                bytes_received=counters.bytes_received,
+                latency_p50=_percentile(counters.latencies, 0.50),
+                latency_p95=_percentile(counters.latencies, 0.95),
+                latency_p99=_percentile(counters.latencies, 0.99),
+            )
+            for method, counters in totals.items()
+        }
@@ -0,0 +1,205 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Consistent reads at a single point in time."""
+
+import datetime
+
+
+_READ_TIME_MARGIN = datetime.timedelta(seconds=5)
+"""How far before its creation a snapshot reads by default.
+
+Keeps the default ``read_time`` in the past for the backend even when the
+local clock runs somewhat ahead of it.
+"""
+
+
+class Snapshot(object):
+    """Reads pinned to one ``read_time``.
+
+    Unlike a read-only
+    :class:`~google.cloud.datastore.transaction.Transaction`, a snapshot
+    costs no ``BeginTransaction`` / ``Rollback`` calls: each read simply
+    carries the snapshot's ``read_time``. A snapshot holds no other state,
+    so its reads may run concurrently, from any number of threads.
+
+    .. testsetup:: snapshot
+
+        import time
+        import uuid
+
+        from google.cloud import datastore
+        from google.cloud.datastore.snapshot import _READ_TIME_MARGIN
+
+        unique = str(uuid.uuid4())[0:8]
+        client = datastore.Client(namespace='ns{}'.format(unique))
+
+        key = client.key('Report', 'daily')
+        entity = datastore.Entity(key)
+        entity['total'] = 42
+        client.put(entity)
+        # Let the write fall before the snapshot's default read time.
+        time.sleep(_READ_TIME_MARGIN.total_seconds() + 1)
+
+    .. doctest:: snapshot
+
+        >>> with client.snapshot() as snapshot:
+        ...     report = snapshot.get(key)
+        ...     people = list(snapshot.fetch(client.query(kind='Person')))
+        >>> report['total']
+        42
+
+    .. testcleanup:: snapshot
+
+        client.delete(key)
+
+    :type client: :class:`google.cloud.datastore.client.Client`
+    :param client: The client used to connect to datastore.
+
+    :type read_time: datetime
+    :param read_time: (Optional) Time at which all reads are made. Defaults
+                      to five seconds before the snapshot is created, by the
+                      local clock, so that a clock running slightly ahead of
+                      the backend's does not yield a time in the future.
+                      Writes made in those seconds are not visible. This
+                      feature is in private preview.
+    """
+
+    def __init__(self, client, read_time=None):
+        self._client = client
+        if read_time is None:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            read_time = now - _READ_TIME_MARGIN
+        self._read_time = read_time
+        self._closed = False
+
+    @property
+    def read_time(self):
+        """Time at which the snapshot reads entities.
+
+        :rtype: datetime
+        :returns: The snapshot's read time.
+        """
+        return self._read_time
+
+    def _check_open(self):
+        if self._closed:
+            raise ValueError("Snapshot is closed.")
+
+    def get(
+        self,
+        key,
+        missing=None,
+        deferred=None,
+        retry=None,
+        timeout=None,
+        properties=None,
+    ):
+        """Retrieve an entity as of the snapshot's read time.
+
+        See :meth:`google.cloud.datastore.client.Client.get` for the
+        parameters.
+
+        :rtype: :class:`google.cloud.datastore.entity.Entity` or ``NoneType``
+        :returns: The requested entity if it existed at ``read_time``.
+        :raises: :class:`ValueError` if the snapshot is closed, or if called
+                 inside a transaction.
+        """
+        self._check_open()
+        return self._client.get(
+            key,
+            missing=missing,
+            deferred=deferred,
+            retry=retry,
+            timeout=timeout,
+            read_time=self._read_time,
+            properties=properties,
+        )
+
+    def get_multi(
+        self,
+        keys,
+        missing=None,
+        deferred=None,
+        retry=None,
+        timeout=None,
+        properties=None,
+    ):
+        """Retrieve entities as of the snapshot's read time.
+
+        See :meth:`google.cloud.datastore.client.Client.get_multi` for the
+        parameters.
+
+        :rtype: list of :class:`google.cloud.datastore.entity.Entity`
+        :returns: The requested entities which existed at ``read_time``.
+        :raises: :class:`ValueError` if the snapshot is closed, or if called
+                 inside a transaction.
+        """
+        self._check_open()
+        return self._client.get_multi(
+            keys,
+            missing=missing,
+            deferred=deferred,
+            retry=retry,
+            timeout=timeout,
+            read_time=self._read_time,
+            properties=properties,
+        )
+
+    def fetch(self, query, **kwargs):
+        """Run a query as of the snapshot's read time.
+
+        :type query: :class:`~google.cloud.datastore.query.Query` or
+                     :class:`~google.cloud.datastore.aggregation.AggregationQuery`
+        :param query: The query to run.
+
+        :param kwargs: Other keyword arguments passed to the query's
+                       ``fetch`` method, except ``client``, ``eventual``
+                       and ``read_time``.
+
+        :rtype: :class:`~google.cloud.datastore.query.Iterator` or
+                :class:`~google.cloud.datastore.aggregation.AggregationResultIterator`
+        :returns: The iterator for the query.
+        :raises: :class:`ValueError` if the snapshot is closed.
+        """
+        self._check_open()
+        return query.fetch(client=self._client, read_time=self._read_time, **kwargs)
+
+    def run_aggregations(
+        self, aggregation_queries, retry=None, timeout=None, max_workers=None
+    ):
+        """Run many aggregation queries concurrently as of the read time.
+
+        See :meth:`google.cloud.datastore.client.Client.run_aggregations`
+        for the parameters.
+
+        :rtype: dict
+        :returns: The aggregation values of all queries, keyed by alias.
+        :raises: :class:`ValueError` if the snapshot is closed.
+        """
+        self._check_open()
+        return self._client.run_aggregations(
+            aggregation_queries,
+            retry=retry,
+            timeout=timeout,
+            read_time=self._read_time,
+            max_workers=max_workers,
+        )
+
+    def __enter__(self):
+        self._check_open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._closed = True
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 """Create / interact with Google Cloud Datastore transactions."""
+import threading
+
 from google.cloud.datastore.batch import Batch
 from google.cloud.datastore_v1.types import TransactionOptions
 from google.protobuf import timestamp_pb2
@@ -155,18 +157,39 @@ class Transaction(Batch):
                         is entered. `self.begin()` can also be called manually to begin
                         the transaction at any time. Default is False.
 
+    :type previous_transaction: bytes
+    :param previous_transaction: (Optional) ID of a read-write transaction
+                                 that was aborted and is being retried.
+                                 Passing it lets the backend keep the
+                                 locks' priority of the earlier attempt.
+
     :raises: :class:`ValueError` if read_time is specified when
-             ``read_only=False``.
+             ``read_only=False``, or if ``previous_transaction`` is
+             specified when ``read_only=True``.
     """
 
     _status = None
 
-    def __init__(self, client, read_only=False, read_time=None, begin_later=False):
+    def __init__(
+        self,
+        client,
+        read_only=False,
+        read_time=None,
+        begin_later=False,
+        previous_transaction=None,
+    ):
         super(Transaction, self).__init__(client)
         self._id = None
         self._begin_later = begin_later
+        self._begin_condition = threading.Condition()
+        self._begin_pending = False
+        self._attempt = 1
 
         if read_only:
+            if previous_transaction is not None:
+                raise ValueError(
+                    "previous_transaction is only allowed in read write transaction."
+                )
             if read_time is not None:
                 read_time_pb = timestamp_pb2.Timestamp()
                 read_time_pb.FromDatetime(read_time)
@@ -178,6 +201,12 @@ class Transaction(Batch):
         else:
             if read_time is not None:
                 raise ValueError("read_time is only allowed in read only transaction.")
+            elif previous_transaction is not None:
+                options = TransactionOptions(
+                    read_write=TransactionOptions.ReadWrite(
+                        previous_transaction=previous_transaction
+                    )
+                )
             else:
                 options = TransactionOptions()
 
@@ -192,6 +221,17 @@ class Transaction(Batch):
         """
         return self._id
 
+    @property
+    def attempt(self):
+        """Getter for the attempt number of the transaction.
+
+        :rtype: int
+        :returns: The 1-based number of the attempt when run by
+                  :meth:`~google.cloud.datastore.client.Client.run_in_transaction`,
+                  else 1.
+        """
+        return self._attempt
+
     def current(self):
         """Return the topmost transaction.
 
@@ -249,6 +289,40 @@ class Transaction(Batch):
             self._status = self._ABORTED
             raise
 
+    def _claim_begin(self):
+        """Reserve the right to begin this transaction from a read.
+
+        Reads running concurrently within a transaction which has not begun
+        yet must not all start a new transaction: the first one gets the
+        transaction options to send as ``new_transaction``, and the others
+        wait here until it reports the ID returned by the backend.
+
+        The read that was handed the options must then call either
+        :meth:`_begin_with_id` or :meth:`_release_begin`.
+
+        :rtype: :class:`google.cloud.datastore_v1.types.TransactionOptions`
+                or None
+        :returns: The options to begin the transaction with, or None if it
+                  has already begun (see :attr:`id`).
+        """
+        with self._begin_condition:
+            while self._begin_pending:
+                self._begin_condition.wait()
+            if self._begin_later and self._status == self._INITIAL:
+                self._begin_pending = True
+                return self._options
+            return None
+
+    def _release_begin(self):
+        """Give up a claim taken by :meth:`_claim_begin` without beginning.
+
+        Called when the read which was to begin the transaction failed, so
+        that the next waiting read can try instead.
+        """
+        with self._begin_condition:
+            self._begin_pending = False
+            self._begin_condition.notify()
+
     def _begin_with_id(self, transaction_id):
         """
         Attach newly created transaction to an existing transaction ID.
@@ -259,10 +333,13 @@ class Transaction(Batch):
         :type transaction_id: bytes
         :param transaction_id: ID of the transaction to attach to.
         """
-        if self._status is not self._INITIAL:
-            raise ValueError("Transaction already begun.")
-        self._id = transaction_id
-        self._status = self._IN_PROGRESS
+        with self._begin_condition:
+            if self._status is not self._INITIAL:
+                raise ValueError("Transaction already begun.")
+            self._id = transaction_id
+            self._status = self._IN_PROGRESS
+            self._begin_pending = False
+            self._begin_condition.notify_all()
 
     def rollback(self, retry=None, timeout=None):
         """Rolls back the current transaction.
@@ -301,8 +378,9 @@ class Transaction(Batch):
             self._client._datastore_api.rollback(request=request, **kwargs)
         finally:
             super(Transaction, self).rollback()
-            # Clear our own ID in case this gets accidentally reused.
+            # Clear our own state in case this gets accidentally reused.
             self._id = None
+            self._single_use_options = None
 
     def commit(self, retry=None, timeout=None):
         """Commits the transaction.
@@ -311,6 +389,10 @@ class Transaction(Batch):
         however it can be called explicitly if you don't want to use a
         context manager.
 
+        If the transaction was never begun (e.g. ``begin_later=True`` and
+        nothing was read), the mutations are committed in a single-use
+        transaction, without a separate ``BeginTransaction`` call.
+
         This method has necessary side-effects:
 
         - Sets the current transaction's ID to None.
@@ -326,24 +408,27 @@ class Transaction(Batch):
             Note that if ``retry`` is specified, the timeout applies
             to each individual attempt.
         """
-        # if transaction has not begun, either begin now, or abort if empty
+        # if transaction has not begun, either abort if empty, or begin it
+        # as part of the commit request itself
         if self._status == self._INITIAL:
             if not self._mutations:
                 self._status = self._ABORTED
                 self._id = None
                 return None
             else:
-                self.begin()
+                self._single_use_options = self._options
+                self._status = self._IN_PROGRESS
 
         kwargs = _make_retry_timeout_kwargs(retry, timeout)
 
         try:
             super(Transaction, self).commit(**kwargs)
         finally:
-            # Clear our own ID in case this gets accidentally reused.
+            # Clear our own state in case this gets accidentally reused.
             self._id = None
+            self._single_use_options = None
 
-    def put(self, entity):
+    def put(self, entity, if_version=None, if_update_time=None):
         """Adds an entity to be committed.
 
         Ensures the transaction is not marked readonly.
@@ -353,13 +438,36 @@ class Transaction(Batch):
         :type entity: :class:`~google.cloud.datastore.entity.Entity`
         :param entity: the entity to be saved.
 
+        :type if_version: int
+        :param if_version: (Optional) Version the stored entity must have.
+
+        :type if_update_time: datetime
+        :param if_update_time: (Optional) Time at which the stored entity
+                               must have been last updated.
+
         :raises: :class:`RuntimeError` if the transaction
                  is marked ReadOnly
         """
         if "read_only" in self._options:
             raise RuntimeError("Transaction is read only")
         else:
-            super(Transaction, self).put(entity)
+            super(Transaction, self).put(
+                entity, if_version=if_version, if_update_time=if_update_time
+            )
+
+    def _add_transform(self, key, name, transform_type, value):
+        """Add a property transform to the mutation for ``key``.
+
+        Ensures the transaction is not marked readonly.
+        Please see documentation at
+        :meth:`~google.cloud.datastore.batch.Batch.increment`
+
+        :raises: :class:`RuntimeError` if the transaction
+                 is marked ReadOnly
+        """
+        if "read_only" in self._options:
+            raise RuntimeError("Transaction is read only")
+        super(Transaction, self)._add_transform(key, name, transform_type, value)
 
     def __enter__(self):
         if not self._begin_later:
@@ -45,7 +45,10 @@ dependencies = [
     "grpcio >= 1.38.0, < 2.0.0",
     "grpcio >= 1.75.1, < 2.0.0; python_version >= '3.14'",
 ]
-extras = {"libcst": "libcst >= 0.2.5"}
+extras = {
+    "libcst": "libcst >= 0.2.5",
+    "opentelemetry": "opentelemetry-api >= 1.1.0",
+}
 
 
 # Setup boilerplate below this line.
@@ -0,0 +1,206 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fixtures of the benchmarks of the handwritten client layer.
+
+The benchmarks use the ``benchmark`` fixture of ``pytest-benchmark``, and
+error out without it; run them with ``nox -s benchmark``. Besides timings, each one records in its
+``extra_info`` the memory allocated by a single run of the benchmarked
+function, as traced by :mod:`tracemalloc`.
+"""
+
+import datetime
+import tracemalloc
+
+import mock
+import pytest
+
+from google.cloud.datastore.entity import Entity
+from google.cloud.datastore.helpers import GeoPoint
+from google.cloud.datastore.key import Key
+from google.cloud.datastore_v1.types import datastore as datastore_pb2
+from google.cloud.datastore_v1.types import query as query_pb2
+
+PROJECT = "bench-project"
+KIND = "Bench"
+
+_WIDE_PROPERTIES = 256
+_NESTED_DEPTH = 4
+_NESTED_FANOUT = 3
+_ARRAY_LENGTH = 1000
+
+
+def _scalar(index):
+    """Get a property value of a type cycling with ``index``."""
+    kind = index % 8
+    if kind == 0:
+        return index
+    if kind == 1:
+        return index / 7.0
+    if kind == 2:
+        return "value-%d" % (index,)
+    if kind == 3:
+        return b"blob-%d" % (index,)
+    if kind == 4:
+        return bool(index % 2)
+    if kind == 5:
+        return datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    if kind == 6:
+        return GeoPoint(index % 90, index % 180)
+    return None
+
+
+def make_wide_entity(id_=1):
+    """Make an entity with many scalar properties of mixed types."""
+    entity = Entity(key=Key(KIND, id_, project=PROJECT))
+    for index in range(_WIDE_PROPERTIES):
+        entity["prop_%03d" % (index,)] = _scalar(index)
+    return entity
+
+
+def _make_nested(depth):
+    entity = Entity()
+    entity.update({"depth": depth, "name": "level-%d" % (depth,), "score": 0.5})
+    if depth:
+        for index in range(_NESTED_FANOUT):
+            entity["child_%d" % (index,)] = _make_nested(depth - 1)
+    return entity
+
+
+def make_nested_entity(id_=1):
+    """Make an entity holding a tree of embedded entities."""
+    entity = _make_nested(_NESTED_DEPTH)
+    entity.key = Key(KIND, id_, project=PROJECT)
+    return entity
+
+
+def make_array_entity(id_=1):
+    """Make an entity with long array properties."""
+    entity = Entity(key=Key(KIND, id_, project=PROJECT))
+    entity["integers"] = list(range(_ARRAY_LENGTH))
+    entity["floats"] = [index / 3.0 for index in range(_ARRAY_LENGTH)]
+    entity["strings"] = ["item-%d" % (index,) for index in range(_ARRAY_LENGTH)]
+    entity["records"] = [
+        Entity(exclude_from_indexes=("payload",)) for _ in range(_ARRAY_LENGTH // 10)
+    ]
+    for index, record in enumerate(entity["records"]):
+        record.update({"index": index, "payload": b"x" * 32})
+    return entity
+
+
+ENTITY_SHAPES = {
+    "wide": make_wide_entity,
+    "nested": make_nested_entity,
+    "array": make_array_entity,
+}
+"""Factories of the synthetic entities, by shape."""
+
+
+class FakeDatastoreAPI(object):
+    """Datastore API object answering with canned responses, without I/O.
+
+    The responses are built once, so the benchmarks time the client layer
+    rather than the fake.
+    """
+
+    def __init__(self):
+        self.run_query_responses = {}
+        self.commit_response = datastore_pb2.CommitResponse()
+
+    def set_query_pages(self, entity_pbs, page_size):
+        """Serve ``entity_pbs`` as a query result, ``page_size`` at a time.
+
+        Each page's end cursor is the start cursor of the next one.
+        """
+        self.run_query_responses = {}
+        start_cursor = b""
+        for start in range(0, len(entity_pbs), page_size):
+            end = start + page_size
+            if end < len(entity_pbs):
+                end_cursor = b"page-%d" % (end,)
+                more_results = query_pb2.QueryResultBatch.MoreResultsType.NOT_FINISHED
+            else:
+                end_cursor = b"end"
+                more_results = (
+                    query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+                )
+            batch = query_pb2.QueryResultBatch(
+                entity_result_type=query_pb2.EntityResult.ResultType.FULL,
+                end_cursor=end_cursor,
+                more_results=more_results,
+                entity_results=[
+                    query_pb2.EntityResult(entity=entity_pb)
+                    for entity_pb in entity_pbs[start:end]
+                ],
+            )
+            self.run_query_responses[start_cursor] = datastore_pb2.RunQueryResponse(
+                batch=batch
+            )
+            start_cursor = end_cursor
+
+    def run_query(self, request, **kwargs):
+        return self.run_query_responses[request["query"].start_cursor]
+
+    def commit(self, request, **kwargs):
+        return self.commit_response
+
+
+@pytest.fixture
+def fake_api():
+    return FakeDatastoreAPI()
+
+
+@pytest.fixture
+def client(fake_api):
+    import google.auth.credentials
+    from google.cloud.datastore.client import Client
+
+    credentials = mock.Mock(spec=google.auth.credentials.Credentials)
+    client = Client(project=PROJECT, credentials=credentials, _use_grpc=False)
+    client._datastore_api_internal = fake_api
+    return client
+
+
+@pytest.fixture(params=sorted(ENTITY_SHAPES))
+def make_entity(request):
+    """Factory of one of the synthetic entity shapes."""
+    return ENTITY_SHAPES[request.param]
+
+
+def _trace_allocations(func, args):
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+@pytest.fixture
+def measure(benchmark):
+    """Benchmark a function, also recording the memory one call allocates.
+
+    ``retained_bytes`` is the memory still held when the call returns
+    (including its result), and ``peak_bytes`` the most held during it.
+    """
+
+    def run(func, *args):
+        retained, peak = _trace_allocations(func, args)
+        benchmark.extra_info["retained_bytes"] = retained
+        benchmark.extra_info["peak_bytes"] = peak
+        return benchmark(func, *args)
+
+    return run
@@ -0,0 +1,57 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+from .conftest import make_wide_entity
+
+_MUTATIONS = 500
+
+
+@pytest.fixture
+def entities():
+    return [make_wide_entity(id_) for id_ in range(1, _MUTATIONS + 1)]
+
+
+def test_batch_put_accumulate(measure, client, entities):
+    # ``put`` only records the entities: they are encoded by ``commit``,
+    # which ``test_batch_put_and_commit`` measures.
+    def put_all():
+        batch = client.batch()
+        batch.begin()
+        for entity in entities:
+            batch.put(entity)
+        return batch
+
+    batch = measure(put_all)
+
+    assert len(batch._mutations) == _MUTATIONS
+
+
+def test_batch_put_and_commit(measure, client, fake_api, entities):
+    fake_api.commit_response = datastore_pb2.CommitResponse(
+        mutation_results=[datastore_pb2.MutationResult(version=1)] * _MUTATIONS
+    )
+
+    def put_and_commit():
+        with client.batch() as batch:
+            for entity in entities:
+                batch.put(entity)
+        return batch
+
+    batch = measure(put_and_commit)
+
+    assert len(batch.mutations) == _MUTATIONS
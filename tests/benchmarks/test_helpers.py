@@ -0,0 +1,32 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.cloud.datastore import helpers
+
+
+def test_entity_to_protobuf(measure, make_entity):
+    entity = make_entity()
+
+    entity_pb = measure(helpers.entity_to_protobuf, entity)
+
+    assert entity_pb.key.path[0].id == entity.key.id
+
+
+def test_entity_from_protobuf(measure, make_entity):
+    entity = make_entity()
+    entity_pb = helpers.entity_to_protobuf(entity)
+
+    result = measure(helpers.entity_from_protobuf, entity_pb)
+
+    assert result == entity
@@ -0,0 +1,49 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.cloud.datastore import helpers
+from google.cloud.datastore.key import Key
+
+from .conftest import KIND
+from .conftest import PROJECT
+
+
+def _make_key():
+    return Key("Parent", "parent-name", KIND, 1234, project=PROJECT)
+
+
+def test_key_ctor(measure):
+    key = measure(_make_key)
+
+    assert key.id == 1234
+
+
+def test_key_hash(measure):
+    key = _make_key()
+
+    assert measure(hash, key) == hash(_make_key())
+
+
+def test_key_to_protobuf(measure):
+    key = _make_key()
+
+    key_pb = measure(key.to_protobuf)
+
+    assert key_pb.path[1].id == 1234
+
+
+def test_key_from_protobuf(measure):
+    key_pb = _make_key().to_protobuf()
+
+    assert measure(helpers.key_from_protobuf, key_pb) == _make_key()
@@ -0,0 +1,66 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.cloud.datastore import helpers
+from google.cloud.datastore.key import Key
+from google.cloud.datastore.query import _pb_from_query
+from google.cloud.datastore.query import And
+from google.cloud.datastore.query import Or
+from google.cloud.datastore.query import PropertyFilter
+
+from .conftest import KIND
+from .conftest import make_wide_entity
+from .conftest import PROJECT
+
+_RESULTS = 2000
+_PAGE_SIZE = 200
+
+
+def test_pb_from_query(measure, client):
+    query = client.query(
+        kind=KIND,
+        ancestor=Key("Parent", "parent-name", project=PROJECT),
+        projection=["a", "b", "c"],
+        distinct_on=["a"],
+        order=["a", "-b"],
+    )
+    query.add_filter(
+        filter=And(
+            [
+                PropertyFilter("a", ">=", 10),
+                Or([PropertyFilter("b", "=", "x"), PropertyFilter("b", "=", "y")]),
+                PropertyFilter("c", "IN", list(range(10))),
+            ]
+        )
+    )
+
+    query_pb = measure(_pb_from_query, query)
+
+    assert query_pb.kind[0].name == KIND
+
+
+def test_iterator_paging(measure, client, fake_api):
+    entity_pbs = [
+        helpers.entity_to_protobuf(make_wide_entity(id_))
+        for id_ in range(1, _RESULTS + 1)
+    ]
+    fake_api.set_query_pages(entity_pbs, _PAGE_SIZE)
+    query = client.query(kind=KIND)
+
+    def fetch_all():
+        return list(query.fetch())
+
+    entities = measure(fetch_all)
+
+    assert len(entities) == _RESULTS
@@ -0,0 +1,445 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import pytest
+
+PROJECT = "PROJECT"
+
+
+def _make_api(**kw):
+    from google.cloud.datastore._in_memory import InMemoryDatastoreAPI
+
+    return InMemoryDatastoreAPI(**kw)
+
+
+def _make_client(api=None, **kw):
+    import google.auth.credentials
+    from google.cloud.datastore.client import Client
+
+    credentials = mock.Mock(spec=google.auth.credentials.Credentials)
+    return Client(
+        project=PROJECT,
+        credentials=credentials,
+        _datastore_api=api if api is not None else _make_api(**kw),
+    )
+
+
+def _put_entities(client, count, kind="Kind", **properties):
+    from google.cloud.datastore.entity import Entity
+
+    entities = []
+    for id_ in range(1, count + 1):
+        entity = Entity(key=client.key(kind, id_))
+        entity.update({"n": id_, "parity": id_ % 2})
+        entity.update(properties)
+        entities.append(entity)
+    for start in range(0, count, 500):
+        client.put_multi(entities[start : start + 500])
+    return entities
+
+
+def _key_pb(kind, id_):
+    from google.cloud.datastore.key import Key
+
+    return Key(kind, id_, project=PROJECT).to_protobuf()
+
+
+def test_put_and_get_round_trip():
+    client = _make_client()
+    entity = _put_entities(client, 1, tags=["a", "b"], ratio=0.5)[0]
+
+    found = client.get(entity.key)
+
+    assert found == entity
+    assert found.version == entity.version == 1
+    assert found.update_time is not None
+    assert client.get(client.key("Kind", 99)) is None
+
+
+def test_put_completes_partial_key():
+    from google.cloud.datastore.entity import Entity
+
+    client = _make_client()
+    entity = Entity(key=client.key("Kind"))
+    entity["n"] = 1
+
+    client.put(entity)
+
+    assert entity.key.id is not None
+    assert client.get(entity.key)["n"] == 1
+
+
+def test_lookup_defers_keys():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    api = _make_api(max_lookup_results=2)
+    client = _make_client(api)
+    entities = _put_entities(client, 5)
+
+    response = api.lookup(
+        datastore_pb2.LookupRequest(
+            project_id=PROJECT, keys=[entity.key.to_protobuf() for entity in entities]
+        )
+    )
+    assert len(response.found) == 2
+    assert len(response.deferred) == 3
+
+    found = client.get_multi([entity.key for entity in entities])
+    assert sorted(entity["n"] for entity in found) == [1, 2, 3, 4, 5]
+
+
+def test_lookup_w_too_many_keys():
+    from google.api_core.exceptions import InvalidArgument
+
+    api = _make_api()
+    with pytest.raises(InvalidArgument):
+        api.lookup({"project_id": PROJECT, "keys": [_key_pb("Kind", 1)] * 1001})
+
+
+def test_query_pages_in_batches():
+    api = _make_api(max_batch_size=2)
+    client = _make_client(api)
+    _put_entities(client, 5)
+    query = client.query(kind="Kind")
+    query.order = ["-n"]
+
+    with mock.patch.object(api, "run_query", wraps=api.run_query) as run_query:
+        entities = list(query.fetch())
+
+    assert [entity["n"] for entity in entities] == [5, 4, 3, 2, 1]
+    assert run_query.call_count == 3
+
+
+def test_query_w_limit_and_cursor():
+    client = _make_client()
+    _put_entities(client, 5)
+    query = client.query(kind="Kind", order=["n"])
+
+    iterator = query.fetch(limit=2)
+    page = next(iterator.pages)
+    assert [entity["n"] for entity in page] == [1, 2]
+    cursor = iterator.next_page_token
+
+    entities = list(query.fetch(start_cursor=cursor))
+    assert [entity["n"] for entity in entities] == [3, 4, 5]
+
+
+def test_query_w_end_cursor():
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    api = _make_api()
+    client = _make_client(api)
+    _put_entities(client, 5)
+
+    response = api.run_query(
+        {
+            "project_id": PROJECT,
+            "partition_id": {"project_id": PROJECT},
+            "query": {"kind": [{"name": "Kind"}], "end_cursor": b"in-memory:3"},
+        }
+    )
+
+    assert len(response.batch.entity_results) == 3
+    assert (
+        response.batch.more_results
+        == query_pb2.QueryResultBatch.MoreResultsType.MORE_RESULTS_AFTER_CURSOR
+    )
+
+
+def test_query_w_large_offset():
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    api = _make_api()
+    client = _make_client(api)
+    _put_entities(client, 1200)
+    request = {
+        "project_id": PROJECT,
+        "partition_id": {"project_id": PROJECT},
+        "query": {"kind": [{"name": "Kind"}], "offset": 1150},
+    }
+
+    response = api.run_query(request)
+    assert response.batch.skipped_results == 1000
+    assert not response.batch.entity_results
+    assert (
+        response.batch.more_results
+        == query_pb2.QueryResultBatch.MoreResultsType.NOT_FINISHED
+    )
+
+    entities = list(client.query(kind="Kind").fetch(offset=1150))
+    assert [entity["n"] for entity in entities] == list(range(1151, 1201))
+
+
+def test_query_cache_is_bounded():
+    from google.cloud.datastore._in_memory import _QUERY_CACHE_SIZE
+    from google.cloud.datastore.query import PropertyFilter
+
+    api = _make_api()
+    client = _make_client(api)
+    _put_entities(client, 3)
+
+    for value in range(_QUERY_CACHE_SIZE + 8):
+        query = client.query(kind="Kind")
+        query.add_filter(filter=PropertyFilter("n", "=", value))
+        list(query.fetch())
+    first_key = next(iter(api._query_cache))
+    list(client.query(kind="Kind").fetch())
+
+    assert len(api._query_cache) == _QUERY_CACHE_SIZE
+    assert first_key not in api._query_cache
+
+
+def test_query_w_filters():
+    from google.cloud.datastore.query import Or
+    from google.cloud.datastore.query import PropertyFilter
+
+    client = _make_client()
+    _put_entities(client, 10)
+    _put_entities(client, 3, kind="Other")
+
+    query = client.query(kind="Kind", order=["n"])
+    query.add_filter(filter=PropertyFilter("n", ">", 6))
+    assert [entity["n"] for entity in query.fetch()] == [7, 8, 9, 10]
+
+    query = client.query(kind="Kind", order=["n"])
+    query.add_filter(
+        filter=Or([PropertyFilter("n", "=", 2), PropertyFilter("n", "IN", [4, 5])])
+    )
+    assert [entity["n"] for entity in query.fetch()] == [2, 4, 5]
+
+
+def test_query_w_ancestor():
+    from google.cloud.datastore.entity import Entity
+
+    client = _make_client()
+    parent = client.key("Parent", "p")
+    client.put_multi(
+        [
+            Entity(key=client.key("Kind", 1, parent=parent)),
+            Entity(key=client.key("Kind", 2)),
+        ]
+    )
+
+    entities = list(client.query(kind="Kind", ancestor=parent).fetch())
+
+    assert [entity.key.id for entity in entities] == [1]
+
+
+def test_query_w_projection_and_distinct_on():
+    client = _make_client()
+    _put_entities(client, 6)
+
+    query = client.query(kind="Kind", projection=["parity"], distinct_on=["parity"])
+    assert sorted(entity["parity"] for entity in query.fetch()) == [0, 1]
+
+    query = client.query(kind="Kind")
+    query.keys_only()
+    entities = list(query.fetch())
+    assert len(entities) == 6
+    assert all(not entity for entity in entities)
+
+
+def test_query_gql_not_supported():
+    from google.api_core.exceptions import InvalidArgument
+
+    client = _make_client()
+
+    with pytest.raises(InvalidArgument):
+        list(client.gql("SELECT * FROM Kind"))
+
+
+def test_read_time_not_supported():
+    import datetime
+
+    from google.api_core.exceptions import InvalidArgument
+
+    client = _make_client()
+    entity = _put_entities(client, 1)[0]
+    read_time = datetime.datetime.now(datetime.timezone.utc)
+
+    with pytest.raises(InvalidArgument):
+        client.get(entity.key, read_time=read_time)
+    with pytest.raises(InvalidArgument):
+        list(client.query(kind="Kind").fetch(read_time=read_time))
+
+
+def test_aggregation_query():
+    client = _make_client()
+    _put_entities(client, 4)
+    aggregation_query = client.aggregation_query(client.query(kind="Kind"))
+    aggregation_query.count(alias="count")
+    aggregation_query.sum("n", alias="sum")
+    aggregation_query.avg("n", alias="avg")
+
+    results = {
+        result.alias: result.value for result in list(aggregation_query.fetch())[0]
+    }
+
+    assert results == {"count": 4, "sum": 10, "avg": 2.5}
+
+
+def test_commit_w_too_many_mutations():
+    from google.api_core.exceptions import InvalidArgument
+
+    client = _make_client(max_mutations=2)
+
+    with pytest.raises(InvalidArgument):
+        _put_entities(client, 3)
+
+
+def test_commit_insert_existing_and_update_missing():
+    from google.api_core.exceptions import AlreadyExists
+    from google.api_core.exceptions import NotFound
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    api = _make_api()
+    mode = datastore_pb2.CommitRequest.Mode.NON_TRANSACTIONAL
+    entity_pb = {"key": _key_pb("Kind", 1)}
+    api.commit(
+        {"project_id": PROJECT, "mode": mode, "mutations": [{"insert": entity_pb}]}
+    )
+
+    with pytest.raises(AlreadyExists):
+        api.commit(
+            {"project_id": PROJECT, "mode": mode, "mutations": [{"insert": entity_pb}]}
+        )
+    with pytest.raises(NotFound):
+        api.commit(
+            {
+                "project_id": PROJECT,
+                "mode": mode,
+                "mutations": [{"update": {"key": _key_pb("Kind", 2)}}],
+            }
+        )
+
+
+def test_commit_non_transactional_w_duplicate_keys():
+    from google.api_core.exceptions import InvalidArgument
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    api = _make_api()
+    entity_pb = {"key": _key_pb("Kind", 1)}
+
+    with pytest.raises(InvalidArgument):
+        api.commit(
+            {
+                "project_id": PROJECT,
+                "mode": datastore_pb2.CommitRequest.Mode.NON_TRANSACTIONAL,
+                "mutations": [{"upsert": entity_pb}, {"delete": entity_pb["key"]}],
+            }
+        )
+
+
+def test_commit_w_version_precondition():
+    client = _make_client()
+    entity = _put_entities(client, 1)[0]
+    stale_version = entity.version
+    client.put(entity)
+
+    with client.batch() as batch:
+        batch.put(entity, if_version=stale_version)
+
+    assert batch.conflicts == [entity.key]
+
+
+def test_commit_w_transforms():
+    client = _make_client()
+    entity = _put_entities(client, 1, tags=["a"])[0]
+
+    with client.batch() as batch:
+        batch.increment(entity.key, "n", 5)
+        batch.array_union(entity.key, "tags", ["a", "b"])
+
+    assert batch.transform_results[0] == 6
+    found = client.get(entity.key)
+    assert found["n"] == 6
+    assert found["tags"] == ["a", "b"]
+
+
+def test_transaction_contention():
+    from google.api_core.exceptions import Aborted
+
+    client = _make_client()
+    entity = _put_entities(client, 1)[0]
+
+    first = client.transaction()
+    first.begin()
+    second = client.transaction()
+    second.begin()
+    for transaction in (first, second):
+        found = client.get(entity.key, transaction=transaction)
+        found["n"] += 1
+        transaction.put(found)
+
+    first.commit()
+    with pytest.raises(Aborted):
+        second.commit()
+
+    assert client.get(entity.key)["n"] == 2
+
+
+def test_read_only_transaction_never_aborts():
+    api = _make_api()
+    reader = _make_client(api)
+    writer = _make_client(api)
+    entity = _put_entities(writer, 1)[0]
+
+    transaction = reader.transaction(read_only=True)
+    transaction.begin()
+    assert reader.get(entity.key, transaction=transaction)["n"] == 1
+    entity["n"] = 2
+    writer.put(entity)
+
+    transaction.commit()
+
+
+def test_read_only_transaction_rejects_writes():
+    from google.api_core.exceptions import InvalidArgument
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    api = _make_api()
+    response = api.begin_transaction(
+        {"project_id": PROJECT, "transaction_options": {"read_only": {}}}
+    )
+
+    with pytest.raises(InvalidArgument):
+        api.commit(
+            {
+                "project_id": PROJECT,
+                "mode": datastore_pb2.CommitRequest.Mode.TRANSACTIONAL,
+                "transaction": response.transaction,
+                "mutations": [{"upsert": {"key": _key_pb("Kind", 1)}}],
+            }
+        )
+
+
+def test_rollback_unknown_transaction():
+    from google.api_core.exceptions import InvalidArgument
+
+    api = _make_api()
+    response = api.begin_transaction({"project_id": PROJECT})
+    api.rollback({"project_id": PROJECT, "transaction": response.transaction})
+
+    with pytest.raises(InvalidArgument):
+        api.rollback({"project_id": PROJECT, "transaction": response.transaction})
+
+
+def test_allocate_and_reserve_ids():
+    client = _make_client()
+    client.reserve_ids_multi([client.key("Kind", 10)])
+
+    keys = client.allocate_ids(client.key("Kind"), 2)
+
+    assert [key.id for key in keys] == [11, 12]
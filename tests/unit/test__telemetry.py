@@ -0,0 +1,203 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import pytest
+
+from google.cloud.datastore._telemetry import _HAVE_OPENTELEMETRY
+
+pytestmark = pytest.mark.skipif(not _HAVE_OPENTELEMETRY, reason="No OpenTelemetry")
+
+
+def _make_instrumented_api(datastore_api):
+    from google.cloud.datastore._telemetry import _InstrumentedDatastoreAPI
+
+    tracer = mock.MagicMock(spec=["start_as_current_span"])
+    meter = mock.Mock(spec=["create_histogram"])
+    api = _InstrumentedDatastoreAPI(datastore_api, tracer=tracer, meter=meter)
+    span = tracer.start_as_current_span.return_value.__enter__.return_value
+    return api, tracer, span, meter.create_histogram.return_value
+
+
+def _make_key_pb(id_):
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+
+    key_pb = entity_pb2.Key()
+    key_pb.partition_id.project_id = "PROJECT"
+    elem = key_pb._pb.path.add()
+    elem.kind = "Kind"
+    elem.id = id_
+    return key_pb
+
+
+def test_instrumented_api_lookup():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    response = datastore_pb2.LookupResponse(
+        found=[query_pb2.EntityResult(entity={"key": _make_key_pb(1)})],
+        deferred=[_make_key_pb(2)],
+    )
+    datastore_api = mock.Mock(spec=["lookup"])
+    datastore_api.lookup.return_value = response
+    api, tracer, span, histogram = _make_instrumented_api(datastore_api)
+    request = {
+        "project_id": "PROJECT",
+        "database_id": "DATABASE",
+        "keys": [_make_key_pb(1), _make_key_pb(2)],
+    }
+
+    assert api.lookup(request=request, timeout=5) is response
+
+    request_pb = datastore_pb2.LookupRequest(**request)
+    datastore_api.lookup.assert_called_once_with(request=request_pb, timeout=5)
+    tracer.start_as_current_span.assert_called_once_with(
+        "datastore.Lookup",
+        attributes={
+            "rpc.service": "google.datastore.v1.Datastore",
+            "rpc.method": "Lookup",
+            "gcp.datastore.project_id": "PROJECT",
+            "gcp.datastore.database_id": "DATABASE",
+        },
+    )
+    span.set_attribute.assert_has_calls(
+        [
+            mock.call("datastore.request_bytes", request_pb._pb.ByteSize()),
+            mock.call("datastore.response_bytes", response._pb.ByteSize()),
+            mock.call("datastore.keys", 2),
+            mock.call("datastore.found", 1),
+            mock.call("datastore.missing", 0),
+            mock.call("datastore.deferred", 1),
+        ]
+    )
+    ((duration, attributes), _) = histogram.record.call_args
+    assert duration >= 0
+    assert attributes == {"rpc.method": "Lookup", "status": "OK"}
+
+
+def test_instrumented_api_rollback_wo_counts():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    datastore_api = mock.Mock(spec=["rollback"])
+    datastore_api.rollback.return_value = datastore_pb2.RollbackResponse()
+    api, tracer, span, histogram = _make_instrumented_api(datastore_api)
+
+    api.rollback(request={"project_id": "PROJECT", "transaction": b"txn"})
+
+    assert [call[0][0] for call in span.set_attribute.call_args_list] == [
+        "datastore.request_bytes",
+        "datastore.response_bytes",
+    ]
+
+
+def test_instrumented_api_commit_failure():
+    from google.api_core import exceptions
+
+    datastore_api = mock.Mock(spec=["commit"])
+    datastore_api.commit.side_effect = exceptions.Aborted("contention")
+    api, tracer, span, histogram = _make_instrumented_api(datastore_api)
+
+    with pytest.raises(exceptions.Aborted):
+        api.commit(request={"project_id": "PROJECT"})
+
+    ((_, attributes), _) = histogram.record.call_args
+    assert attributes == {"rpc.method": "Commit", "status": "Aborted"}
+    span.set_attribute.assert_not_called()
+
+
+def test_instrumented_api_records_stats_wo_tracer():
+    from google.api_core import exceptions
+    from google.cloud.datastore._telemetry import _InstrumentedDatastoreAPI
+    from google.cloud.datastore.rpc_stats import _RPCStatsRecorder
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    response = datastore_pb2.BeginTransactionResponse(transaction=b"txn")
+    datastore_api = mock.Mock(spec=["begin_transaction"])
+    datastore_api.begin_transaction.side_effect = [
+        response,
+        exceptions.ServiceUnavailable("down"),
+    ]
+    stats = _RPCStatsRecorder()
+    api = _InstrumentedDatastoreAPI(datastore_api, stats=stats)
+    request = {"project_id": "PROJECT"}
+
+    assert api.begin_transaction(request=request) is response
+    with pytest.raises(exceptions.ServiceUnavailable):
+        api.begin_transaction(request=request)
+
+    begin_stats = stats.snapshot()["begin_transaction"]
+    assert begin_stats.calls == 2
+    assert begin_stats.errors == 1
+    request_bytes = datastore_pb2.BeginTransactionRequest(**request)._pb.ByteSize()
+    assert begin_stats.bytes_sent == 2 * request_bytes
+    assert begin_stats.bytes_received == response._pb.ByteSize()
+    with api.span("datastore.op") as span:
+        span.set_attribute("key", "value")
+
+
+def test_instrument():
+    from google.cloud.datastore._telemetry import _InstrumentedDatastoreAPI
+    from google.cloud.datastore._telemetry import instrument
+
+    datastore_api = mock.Mock(spec=[])
+    assert instrument(datastore_api, False, None) is datastore_api
+
+    stats = mock.Mock(spec=[])
+    api = instrument(datastore_api, False, stats)
+    assert isinstance(api, _InstrumentedDatastoreAPI)
+    assert api._tracer is None
+    assert api._stats is stats
+
+    api = instrument(datastore_api, True, None)
+    assert api._tracer is not None
+    assert api._duration is not None
+
+
+def test_instrumented_api_calls_hooks():
+    from google.cloud.datastore._telemetry import instrument
+    from google.cloud.datastore.hooks import ClientHook
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    hook = mock.Mock(spec=ClientHook)
+    datastore_api = mock.Mock(spec=["rollback"])
+    datastore_api.rollback.return_value = datastore_pb2.RollbackResponse()
+    api = instrument(datastore_api, False, None, (hook,))
+
+    api.rollback(request={"project_id": "PROJECT", "transaction": b"txn"})
+
+    (event,) = hook.pre_rpc.call_args[0]
+    hook.post_rpc.assert_called_once_with(event)
+    assert event.stage == "rpc"
+    assert event.method == "rollback"
+    assert event.duration >= 0
+
+
+def test_span_w_instrumented_api():
+    from google.cloud.datastore._telemetry import span
+
+    api, tracer, _, _ = _make_instrumented_api(mock.Mock(spec=[]))
+
+    result = span(api, "datastore.op", {"key": "value"})
+
+    assert result is tracer.start_as_current_span.return_value
+    tracer.start_as_current_span.assert_called_once_with(
+        "datastore.op", attributes={"key": "value"}
+    )
+
+
+def test_span_wo_instrumented_api():
+    from google.cloud.datastore._telemetry import span
+
+    with span(mock.Mock(spec=[]), "datastore.op") as result:
+        result.set_attribute("key", "value")
@@ -527,6 +527,28 @@ def test_iterator_explain_metrics(database_id):
     assert iterator.explain_metrics == ExplainMetrics._from_pb(expected_metrics)
 
 
+def test_iterator_sampled_by_query_profiler():
+    from google.cloud.datastore.query_profile import QueryProfiler
+    from google.cloud.datastore_v1.types import query_profile as query_profile_pb2
+
+    response_pb = _make_aggregation_query_response([], 0)
+    response_pb.explain_metrics = query_profile_pb2.ExplainMetrics(
+        execution_stats=query_profile_pb2.ExecutionStats(results_returned=1)
+    )
+    ds_api = _make_datastore_api_for_aggregation(response_pb)
+    client = _Client(None, datastore_api=ds_api)
+    client.query_profiler = QueryProfiler()
+    query = _make_aggregation_query(client=client, query=_make_query(client))
+    iterator = _make_aggregation_iterator(query, client)
+
+    iterator._next_page()
+
+    request = ds_api.run_aggregation_query.call_args[1]["request"]
+    assert request["explain_options"] == {"analyze": True}
+    (stats,) = client.query_profiler.stats().values()
+    assert stats.results_returned == 1
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_iterator_explain_metrics_no_explain(database_id):
     """
@@ -821,6 +843,7 @@ def test_transaction_begin_later(database_id, aggregation_type, aggregation_args
     transaction._begin_later = True
     transaction._status = transaction._INITIAL
     transaction._options = TransactionOptions(read_only=TransactionOptions.ReadOnly())
+    transaction._claim_begin.return_value = transaction._options
     mock_datastore_api = mock.Mock()
     mock_gapic = mock_datastore_api.run_aggregation_query
     mock_gapic.return_value = _make_aggregation_query_response([])
@@ -846,6 +869,137 @@ def test_transaction_begin_later(database_id, aggregation_type, aggregation_args
     assert read_options.new_transaction == transaction._options
 
 
+def test_query_fetch_partitions_w_limit():
+    client = _Client(_PROJECT)
+    query = _make_query(client, kind="Kind")
+    aggregation_query = _make_aggregation_query(client=client, query=query).count()
+
+    with pytest.raises(ValueError):
+        aggregation_query.fetch(partitions=2, limit=5)
+
+
+def test_query_fetch_partitions_w_explain_options():
+    from google.cloud.datastore.query_profile import ExplainOptions
+
+    client = _Client(_PROJECT)
+    query = _make_query(client, kind="Kind", explain_options=ExplainOptions())
+    aggregation_query = _make_aggregation_query(client=client, query=query).count()
+
+    with pytest.raises(ValueError):
+        aggregation_query.fetch(partitions=2)
+
+
+def test_query_fetch_partitions_wo_kind():
+    client = _Client(_PROJECT)
+    query = _make_query(client)
+    aggregation_query = _make_aggregation_query(client=client, query=query).count()
+
+    with pytest.raises(ValueError):
+        aggregation_query.fetch(partitions=2)
+
+
+def test_query_fetch_partitions_one():
+    from google.cloud.datastore.aggregation import AggregationResultIterator
+
+    client = _Client(_PROJECT)
+    query = _make_query(client, kind="Kind")
+    aggregation_query = _make_aggregation_query(client=client, query=query).count()
+
+    iterator = aggregation_query.fetch(partitions=1)
+
+    assert isinstance(iterator, AggregationResultIterator)
+
+
+def _partitioned_datastore_api(scatter_ids, rows):
+    """Fake API aggregating ``rows`` of ``(id, value)`` per key range."""
+    from google.cloud.datastore_v1.types import aggregation_result
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from tests.unit.test_query import _make_entity
+    from tests.unit.test_query import _make_query_response
+
+    no_more = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+
+    def run_query(request, **kwargs):
+        assert request["query"].order[0].property.name == "__scatter__"
+        entity_pbs = [_make_entity("Kind", id_, _PROJECT) for id_ in scatter_ids]
+        return _make_query_response(entity_pbs, b"", no_more, 0)
+
+    def run_aggregation_query(request, **kwargs):
+        pb = request["aggregation_query"]
+        low, high = float("-inf"), float("inf")
+        for filter_pb in pb.nested_query.filter.composite_filter.filters:
+            prop = filter_pb.property_filter
+            key_id = prop.value.key_value.path[-1].id
+            if prop.op == query_pb2.PropertyFilter.Operator.GREATER_THAN_OR_EQUAL:
+                low = key_id
+            else:
+                high = key_id
+        matched = [value for id_, value in rows if low <= id_ < high]
+        result = aggregation_result.AggregationResult()
+        for aggregation in pb.aggregations:
+            if "count" in aggregation:
+                total = len(matched)
+            else:
+                total = sum(matched)
+            result.aggregate_properties[aggregation.alias] = entity_pb2.Value(
+                integer_value=total
+            )
+        return datastore_pb2.RunAggregationQueryResponse(
+            batch=aggregation_result.AggregationResultBatch(
+                aggregation_results=[result], more_results=no_more
+            )
+        )
+
+    return mock.Mock(
+        run_query=mock.Mock(side_effect=run_query),
+        run_aggregation_query=mock.Mock(side_effect=run_aggregation_query),
+        spec=["run_query", "run_aggregation_query"],
+    )
+
+
+@pytest.mark.parametrize("in_transaction", [False, True])
+def test_query_fetch_partitions_combines_results(in_transaction):
+    rows = [(id_, id_ * 10) for id_ in range(1, 21)]
+    ds_api = _partitioned_datastore_api([15, 5, 10, 12, 3, 18], rows)
+    transaction = None
+    if in_transaction:
+        transaction = mock.Mock(id=b"txn", spec=["id"])
+    client = _Client(_PROJECT, datastore_api=ds_api, transaction=transaction)
+    query = _make_query(client, kind="Kind")
+    aggregation_query = _make_aggregation_query(client=client, query=query)
+    aggregation_query.count(alias="total").sum("value").avg("value", alias="mean")
+
+    results = list(aggregation_query.fetch(partitions=3))
+
+    assert len(results) == 1
+    assert [(result.alias, result.value) for result in results[0]] == [
+        ("total", 20),
+        ("property_1", 2100),
+        ("mean", 105.0),
+    ]
+    scatter_request = ds_api.run_query.call_args[1]["request"]
+    assert scatter_request["query"].limit == 64
+    assert ds_api.run_aggregation_query.call_count == 3
+
+
+def test_query_fetch_partitions_wo_split_keys():
+    ds_api = _partitioned_datastore_api([], [])
+    client = _Client(_PROJECT, datastore_api=ds_api)
+    query = _make_query(client, kind="Kind")
+    aggregation_query = _make_aggregation_query(client=client, query=query)
+    aggregation_query.count(alias="total").avg("value", alias="mean")
+
+    results = list(aggregation_query.fetch(partitions=4))
+
+    assert [(result.alias, result.value) for result in results[0]] == [
+        ("total", 0),
+        ("mean", None),
+    ]
+    assert ds_api.run_aggregation_query.call_count == 1
+
+
 class _Client(object):
     def __init__(
         self,
@@ -861,6 +1015,7 @@ class _Client(object):
         self._datastore_api = datastore_api
         self.namespace = namespace
         self._transaction = transaction
+        self.query_profiler = None
 
     @property
     def current_transaction(self):
@@ -41,6 +41,7 @@ def test_batch_ctor(database_id):
     assert batch._id is None
     assert batch._status == batch._INITIAL
     assert batch._mutations == []
+    assert batch.elided_mutations == 0
     assert batch._partial_key_entities == []
 
 
@@ -246,6 +247,421 @@ def test_batch_delete_w_completed_key(database_id):
     assert mutated_key == key._key
 
 
+def test_batch_put_and_delete_collapse_same_key():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    key1 = Key("Kind", 1, project=project)
+    key2 = Key("Kind", 2, project=project)
+
+    batch.begin()
+    first = Entity(key1)
+    first["value"] = 1
+    batch.put(first)
+    batch.put(Entity(key2))
+    second = Entity(Key("Kind", 1, project=project))
+    second["value"] = 2
+    batch.put(second)
+    assert len(batch.mutations) == 2
+    assert batch.elided_mutations == 1
+
+    # the latest write for key1 keeps the position of the first one
+    upsert = batch.mutations[0].upsert
+    assert upsert.key == key1.to_protobuf()
+    assert upsert.properties["value"].integer_value == 2
+
+    batch.delete(key2)
+    assert len(batch.mutations) == 2
+    assert batch.elided_mutations == 2
+    assert batch.mutations[1]._pb.WhichOneof("operation") == "delete"
+    assert batch.mutations[1].delete == key2.to_protobuf()
+
+
+def test_batch_put_encodes_lazily():
+    from google.cloud.datastore.batch import _PendingPut
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    entity = Entity(Key("Kind", 1, project=project))
+    entity["value"] = 1
+
+    batch.begin()
+    batch.put(entity)
+    (pending,) = batch._mutations
+    assert isinstance(pending, _PendingPut)
+    assert pending.entity is entity
+
+    # changes made before the mutations are needed are saved too
+    entity["value"] = 2
+    (mutation,) = batch.mutations
+    assert mutation.upsert.properties["value"].integer_value == 2
+    # the batch no longer holds on to the entity
+    assert batch._mutations == [mutation]
+
+
+def test_batch_put_collapsed_entities_not_encoded():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    key = Key("Kind", 1, project=project)
+
+    batch.begin()
+    batch.put(Entity(key))
+    batch.put(Entity(key))
+    with mock.patch(
+        "google.cloud.datastore.batch._assign_entity_to_pb"
+    ) as assign_entity_to_pb:
+        batch.mutations
+
+    assign_entity_to_pb.assert_called_once()
+
+
+def test_batch_put_and_delete_w_preconditions():
+    import datetime
+
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    update_time = datetime.datetime(2026, 1, 2, tzinfo=datetime.timezone.utc)
+
+    batch.begin()
+    batch.put(Entity(Key("Kind", 1, project=project)), if_version=5)
+    batch.delete(Key("Kind", 2, project=project), if_update_time=update_time)
+    batch.delete(Key("Kind", 3, project=project), if_version=0)
+
+    put_pb, delete_pb, delete_new_pb = batch.mutations
+    assert put_pb.base_version == 5
+    assert delete_pb.update_time == update_time
+    assert delete_new_pb._pb.WhichOneof("conflict_detection_strategy") == (
+        "base_version"
+    )
+    assert delete_new_pb.base_version == 0
+
+
+@pytest.mark.parametrize("method", ["put", "delete"])
+def test_batch_w_both_preconditions(method):
+    import datetime
+
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    key = Key("Kind", 1, project=project)
+    target = Entity(key) if method == "put" else key
+
+    batch.begin()
+    with pytest.raises(ValueError):
+        getattr(batch, method)(
+            target, if_version=1, if_update_time=datetime.datetime.now()
+        )
+    assert batch.mutations == []
+
+
+def test_batch_preconditions_not_collapsed():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    key = Key("Kind", 1, project=project)
+
+    batch.begin()
+    batch.put(Entity(key))
+    batch.put(Entity(key), if_version=3)
+    batch.delete(key)
+    batch.delete(key)
+
+    assert batch.elided_mutations == 1
+    operations = [
+        (mutation._pb.WhichOneof("operation"), mutation.base_version)
+        for mutation in batch.mutations
+    ]
+    assert operations == [("upsert", 0), ("upsert", 3), ("delete", 0)]
+
+
+def test_batch_commit_w_conflicts():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    response = datastore_pb2.CommitResponse(
+        mutation_results=[
+            datastore_pb2.MutationResult(conflict_detected=True),
+            datastore_pb2.MutationResult(),
+            datastore_pb2.MutationResult(conflict_detected=True),
+        ],
+    )
+    ds_api = _make_datastore_api()
+    ds_api.commit.return_value = response
+    client = _Client(project, datastore_api=ds_api)
+    batch = _make_batch(client)
+    key1 = Key("Kind", 1, project=project)
+    key3 = Key("Kind", 3, project=project)
+
+    assert batch.conflicts == []
+    batch.begin()
+    batch.put(Entity(key1), if_version=2)
+    batch.put(Entity(Key("Kind", 2, project=project)), if_version=4)
+    batch.delete(key3, if_version=6)
+    batch.commit()
+
+    assert batch.conflicts == [key1, key3]
+
+
+def test_batch_commit_w_hooks():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.hooks import ClientHook
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    ds_api = _make_datastore_api()
+    ds_api.commit.return_value = datastore_pb2.CommitResponse()
+    client = _Client(project, datastore_api=ds_api)
+    hook = mock.Mock(spec=ClientHook)
+    client._hooks = (hook,)
+    batch = _make_batch(client)
+
+    batch.begin()
+    batch.put(Entity(Key("Kind", 1, project=project)))
+    batch.delete(Key("Kind", 2, project=project))
+    batch.commit()
+
+    (event,) = hook.pre_encode.call_args[0]
+    hook.post_encode.assert_called_once_with(event)
+    assert event.method == "commit"
+    assert event.count == 2
+    assert event.duration >= 0
+
+
+def test_batch_commit_sets_entity_metadata():
+    import datetime
+
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    update_time = datetime.datetime(2026, 1, 2, tzinfo=datetime.timezone.utc)
+    response = datastore_pb2.CommitResponse(
+        mutation_results=[
+            datastore_pb2.MutationResult(version=11, update_time=update_time),
+            datastore_pb2.MutationResult(version=12),
+            datastore_pb2.MutationResult(version=13, conflict_detected=True),
+        ],
+    )
+    ds_api = _make_datastore_api()
+    ds_api.commit.return_value = response
+    client = _Client(project, datastore_api=ds_api)
+    batch = _make_batch(client)
+    entity1 = Entity(Key("Kind", 1, project=project))
+    replaced = Entity(Key("Kind", 2, project=project))
+    entity2 = Entity(Key("Kind", 2, project=project))
+    entity3 = Entity(Key("Kind", 3, project=project))
+
+    batch.begin()
+    batch.put(entity1)
+    batch.put(replaced)
+    batch.mutations  # encode the pending puts
+    batch.put(entity2)
+    batch.put(entity3, if_version=5)
+    batch.commit()
+
+    assert entity1.version == 11
+    assert entity1.update_time == update_time
+    assert replaced.version is None
+    assert entity2.version == 12
+    assert entity2.update_time is None
+    assert entity3.version is None
+
+
+def test_batch_increment_wo_pending_mutation():
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    key = Key("Kind", 1, project=project)
+
+    batch.begin()
+    batch.increment(key, "count")
+    batch.increment(key, "total", 2.5)
+
+    (mutation,) = batch.mutations
+    assert mutation.upsert.key == key.to_protobuf()
+    assert mutation._pb.HasField("property_mask")
+    assert list(mutation.property_mask.paths) == []
+    transforms = mutation.property_transforms
+    assert [transform.property for transform in transforms] == ["count", "total"]
+    assert transforms[0].increment.integer_value == 1
+    assert transforms[1].increment.double_value == 2.5
+
+
+def test_batch_transforms_after_put_and_delete():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    key1 = Key("Kind", 1, project=project)
+    key2 = Key("Kind", 2, project=project)
+    entity = Entity(key1)
+    entity["tags"] = ["a"]
+
+    batch.begin()
+    batch.put(entity)
+    batch.array_union(key1, "tags", ["b", "c"])
+    batch.delete(key2)
+    batch.maximum(key2, "high", 7)
+
+    put_mutation, delete_mutation = batch.mutations
+    assert (
+        put_mutation.upsert.properties["tags"].array_value.values[0].string_value == "a"
+    )
+    (transform,) = put_mutation.property_transforms
+    values = transform.append_missing_elements.values
+    assert [value.string_value for value in values] == ["b", "c"]
+
+    # The delete is replaced by an upsert of an empty entity.
+    assert delete_mutation.upsert.key == key2.to_protobuf()
+    assert not delete_mutation._pb.HasField("property_mask")
+    assert delete_mutation.property_transforms[0].maximum.integer_value == 7
+
+
+def test_batch_transform_after_delete_w_precondition():
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    key = Key("Kind", 1, project=project)
+
+    batch.begin()
+    batch.delete(key, if_version=3)
+    with pytest.raises(ValueError):
+        batch.increment(key, "count")
+
+    (mutation,) = batch.mutations
+    assert mutation.delete == key.to_protobuf()
+    assert mutation.base_version == 3
+
+
+def test_batch_transform_after_put_w_precondition():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    key = Key("Kind", 1, project=project)
+    entity = Entity(key)
+    entity["n"] = 0
+
+    batch.begin()
+    batch.put(entity, if_version=1)
+    batch.increment(key, "n")
+    batch.maximum(key, "high", 7)
+
+    # The transforms join the conditional put, so that a non-transactional
+    # commit does not get two mutations on the same entity.
+    (mutation,) = batch.mutations
+    assert mutation.upsert.key == key.to_protobuf()
+    assert mutation.base_version == 1
+    transforms = mutation.property_transforms
+    assert [transform.property for transform in transforms] == ["n", "high"]
+
+
+def test_batch_transform_w_partial_key():
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    batch = _make_batch(_Client(project))
+
+    batch.begin()
+    with pytest.raises(ValueError):
+        batch.increment(Key("Kind", project=project), "count")
+
+
+def test_batch_transform_wo_begin():
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    batch = _make_batch(_Client(project))
+
+    with pytest.raises(ValueError):
+        batch.increment(Key("Kind", 1, project=project), "count")
+
+
+def test_batch_commit_w_transform_results():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    response = datastore_pb2.CommitResponse(
+        mutation_results=[
+            datastore_pb2.MutationResult(
+                transform_results=[
+                    entity_pb2.Value(integer_value=5),
+                    entity_pb2.Value(null_value=0),
+                ]
+            ),
+            datastore_pb2.MutationResult(),
+        ],
+    )
+    ds_api = _make_datastore_api()
+    ds_api.commit.return_value = response
+    client = _Client(project, datastore_api=ds_api)
+    batch = _make_batch(client)
+    key1 = Key("Kind", 1, project=project)
+    key2 = Key("Kind", 2, project=project)
+
+    assert batch.transform_results == []
+    batch.begin()
+    batch.increment(key1, "count", 4)
+    batch.minimum(key2, "low", 3)
+    batch.array_remove(key1, "tags", ["x"])
+    batch.put(Entity(key2))  # replaces the ``minimum`` transform
+    batch.commit()
+
+    assert batch.transform_results == [5, None, None]
+
+
+def test_batch_put_partial_keys_not_collapsed():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    client = _Client(project)
+    batch = _make_batch(client)
+    key = Key("Kind", project=project)
+
+    batch.begin()
+    batch.put(Entity(key))
+    batch.put(Entity(key))
+
+    assert len(batch.mutations) == 2
+    assert batch.elided_mutations == 0
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_batch_begin_w_wrong_status(database_id):
     project = "PROJECT"
@@ -545,7 +961,23 @@ def test__parse_commit_response():
 
     result = _parse_commit_response(response)
 
-    assert result == (index_updates, [i._pb for i in keys])
+    assert result == (index_updates, [i._pb for i in keys], [])
+
+
+def test__parse_commit_response_w_conflicts():
+    from google.cloud.datastore.batch import _parse_commit_response
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    response = datastore_pb2.CommitResponse(
+        mutation_results=[
+            datastore_pb2.MutationResult(version=3),
+            datastore_pb2.MutationResult(conflict_detected=True, version=7),
+            datastore_pb2.MutationResult(version=4),
+            datastore_pb2.MutationResult(conflict_detected=True, version=8),
+        ],
+    )
+
+    assert _parse_commit_response(response) == (0, [], [1, 3])
 
 
 class _Entity(dict):
@@ -102,6 +102,10 @@ def _make_client(
     _http=None,
     _use_grpc=None,
     database="",
+    enable_telemetry=False,
+    enable_stats=False,
+    begin_transactions_lazily=True,
+    _datastore_api=None,
 ):
     from google.cloud.datastore.client import Client
 
@@ -112,8 +116,12 @@ def _make_client(
         credentials=credentials,
         client_info=client_info,
         client_options=client_options,
+        enable_telemetry=enable_telemetry,
+        enable_stats=enable_stats,
+        begin_transactions_lazily=begin_transactions_lazily,
         _http=_http,
         _use_grpc=_use_grpc,
+        _datastore_api=_datastore_api,
     )
 
 
@@ -347,6 +355,68 @@ def test__datastore_api_property_http():
     make_api.assert_called_once_with(client)
 
 
+def test_client__datastore_api_property_w_backend():
+    client = _make_client(
+        credentials=_make_credentials(),
+        enable_stats=True,
+        _datastore_api=mock.sentinel.backend,
+    )
+
+    ds_api = client._datastore_api
+
+    assert ds_api._datastore_api is mock.sentinel.backend
+    assert client._datastore_api is ds_api
+
+
+def test_client__datastore_api_property_w_telemetry():
+    from google.cloud.datastore._telemetry import _InstrumentedDatastoreAPI
+
+    client = _make_client(
+        credentials=_make_credentials(), _use_grpc=False, enable_telemetry=True
+    )
+
+    patch = mock.patch(
+        "google.cloud.datastore.client.HTTPDatastoreAPI",
+        return_value=mock.sentinel.ds_api,
+    )
+    with patch:
+        ds_api = client._datastore_api
+
+    assert isinstance(ds_api, _InstrumentedDatastoreAPI)
+    assert ds_api._datastore_api is mock.sentinel.ds_api
+
+
+def test_client_stats():
+    client = _make_client(
+        credentials=_make_credentials(), _use_grpc=False, enable_stats=True
+    )
+    assert client.stats() == {}
+
+    patch = mock.patch("google.cloud.datastore.client.HTTPDatastoreAPI")
+    with patch:
+        ds_api = client._datastore_api
+
+    ds_api._stats.record("commit", 0.5, 10, 20, False)
+    stats = client.stats()
+    assert stats["commit"].calls == 1
+    assert stats["commit"].bytes_received == 20
+
+
+def test_client_stats_wo_enable_stats():
+    client = _make_client(credentials=_make_credentials())
+    with pytest.raises(ValueError):
+        client.stats()
+
+
+def test_client_ctor_w_telemetry_wo_opentelemetry():
+    patch = mock.patch(
+        "google.cloud.datastore._telemetry._HAVE_OPENTELEMETRY", new=False
+    )
+    with patch:
+        with pytest.raises(ValueError):
+            _make_client(credentials=_make_credentials(), enable_telemetry=True)
+
+
 def test_client__push_batch_and__pop_batch():
     creds = _make_credentials()
     client = _make_client(credentials=creds)
@@ -361,7 +431,7 @@ def test_client__push_batch_and__pop_batch():
     client._push_batch(xact)
     assert client.current_batch is xact
     assert client.current_transaction is xact
-    # list(_LocalStack) returns in reverse order.
+    # list(_ContextLocalStack) returns in reverse order.
     assert list(client._batch_stack) == [xact, batch]
 
     assert client._pop_batch() is xact
@@ -373,6 +443,74 @@ def test_client__push_batch_and__pop_batch():
     assert list(client._batch_stack) == []
 
 
+def test_client__pop_batch_empty():
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+
+    with pytest.raises(IndexError):
+        client._pop_batch()
+
+
+def test_client_batch_stack_is_per_client():
+    client = _make_client(credentials=_make_credentials())
+    other = _make_client(credentials=_make_credentials())
+    batch = client.batch()
+
+    client._push_batch(batch)
+    try:
+        assert client.current_batch is batch
+        assert other.current_batch is None
+    finally:
+        client._pop_batch()
+
+
+def test_client_batch_stack_is_thread_local():
+    import threading
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    batch = client.batch()
+    seen = []
+
+    client._push_batch(batch)
+    try:
+        thread = threading.Thread(target=lambda: seen.append(client.current_batch))
+        thread.start()
+        thread.join()
+    finally:
+        client._pop_batch()
+
+    assert seen == [None]
+
+
+@pytest.mark.asyncio
+async def test_client_batch_stack_is_task_local():
+    import asyncio
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    entered = asyncio.Event()
+    checked = asyncio.Event()
+
+    async def in_transaction():
+        xact = client.transaction()
+        client._push_batch(xact)
+        entered.set()
+        await checked.wait()
+        assert client.current_transaction is xact
+        assert client._pop_batch() is xact
+
+    async def outside():
+        await entered.wait()
+        try:
+            assert client.current_batch is None
+        finally:
+            checked.set()
+
+    await asyncio.gather(in_transaction(), outside())
+    assert client.current_batch is None
+
+
 def test_client_get_miss():
     creds = _make_credentials()
     client = _make_client(credentials=creds)
@@ -391,6 +529,7 @@ def test_client_get_miss():
         retry=None,
         timeout=None,
         read_time=None,
+        properties=None,
     )
 
 
@@ -414,6 +553,7 @@ def test_client_get_hit():
         retry=None,
         timeout=None,
         read_time=None,
+        properties=None,
     )
 
 
@@ -616,6 +756,123 @@ def test_client_get_multi_w_deferred_from_backend_but_not_passed(database_id):
     )
 
 
+def test_client_get_multi_w_deferred_traces_lookup_loops():
+    from google.cloud.datastore._telemetry import _InstrumentedDatastoreAPI
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+    from google.cloud.datastore.key import Key
+
+    key1 = Key("Kind", 1234, project=PROJECT)
+    key2 = Key("Kind", 2345, project=PROJECT)
+    entity1_pb = entity_pb2.Entity()
+    entity1_pb._pb.key.CopyFrom(key1.to_protobuf()._pb)
+    entity2_pb = entity_pb2.Entity()
+    entity2_pb._pb.key.CopyFrom(key2.to_protobuf()._pb)
+
+    client = _make_client(credentials=_make_credentials(), database=None)
+    ds_api = mock.MagicMock(spec=_InstrumentedDatastoreAPI)
+    ds_api.lookup.side_effect = [
+        _make_lookup_response(results=[entity1_pb], deferred=[key2.to_protobuf()]),
+        _make_lookup_response(results=[entity2_pb]),
+    ]
+    client._datastore_api_internal = ds_api
+
+    assert len(client.get_multi([key1, key2])) == 2
+
+    ds_api.span.assert_called_once_with("datastore.get_multi", {"datastore.keys": 2})
+    span = ds_api.span.return_value.__enter__.return_value
+    span.set_attribute.assert_any_call("datastore.lookup_loops", 2)
+    span.set_attribute.assert_any_call("datastore.found", 2)
+
+
+def test_client_get_multi_w_hooks():
+    from google.cloud.datastore.hooks import ClientHook
+    from google.cloud.datastore.key import Key
+
+    key = Key("Kind", 1234, project=PROJECT)
+    entity_pb = _make_entity_pb(PROJECT, "Kind", 1234)
+    hook = mock.Mock(spec=ClientHook)
+    client = _make_client(credentials=_make_credentials(), database=None)
+    client._hooks = (hook,)
+    ds_api = _make_datastore_api(
+        lookup_response=_make_lookup_response(results=[entity_pb])
+    )
+    client._datastore_api_internal = ds_api
+
+    (entity,) = client.get_multi([key])
+
+    assert entity.key == key
+    (event,) = hook.pre_decode.call_args[0]
+    hook.post_decode.assert_called_once_with(event)
+    assert event.method == "lookup"
+    assert event.count == 1
+    assert event.duration >= 0
+
+
+def test_client_get_multi_w_properties():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore.key import Key
+
+    entity_pb = _make_entity_pb(PROJECT, "Kind", 1234, "foo", "Foo")
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    lookup_response = _make_lookup_response(results=[entity_pb])
+    ds_api = _make_datastore_api(lookup_response=lookup_response)
+    client._datastore_api_internal = ds_api
+    key = Key("Kind", 1234, project=PROJECT)
+
+    (result,) = client.get_multi([key], properties=("foo",))
+
+    assert result["foo"] == "Foo"
+    ds_api.lookup.assert_called_once_with(
+        request={
+            "project_id": PROJECT,
+            "database_id": "",
+            "keys": [key.to_protobuf()],
+            "read_options": datastore_pb2.ReadOptions(),
+            "property_mask": datastore_pb2.PropertyMask(paths=["foo"]),
+        },
+    )
+
+
+def test_client_get_multi_w_properties_str():
+    from google.cloud.datastore.key import Key
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    client._datastore_api_internal = _make_datastore_api()
+
+    with pytest.raises(ValueError):
+        client.get_multi([Key("Kind", 1234, project=PROJECT)], properties="foo")
+
+
+def test_client_get_multi_hit_w_metadata():
+    import datetime
+
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from google.cloud.datastore.key import Key
+
+    update_time = datetime.datetime(2026, 1, 2, tzinfo=datetime.timezone.utc)
+    entity_pb = _make_entity_pb(PROJECT, "Kind", 1234, "foo", "Foo")
+    lookup_response = datastore_pb2.LookupResponse(
+        found=[
+            query_pb2.EntityResult(entity=entity_pb, version=7, update_time=update_time)
+        ]
+    )
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    client._datastore_api_internal = _make_datastore_api(
+        lookup_response=lookup_response
+    )
+
+    (result,) = client.get_multi([Key("Kind", 1234, project=PROJECT)])
+
+    assert result["foo"] == "Foo"
+    assert result.version == 7
+    assert result.update_time == update_time
+    assert result.create_time is None
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_client_get_multi_hit_w_retry_w_timeout(database_id):
     from google.cloud.datastore_v1.types import datastore as datastore_pb2
@@ -751,6 +1008,66 @@ def test_client_get_multi_hit_w_transaction_begin_later(database_id):
     ds_api.lookup.assert_called_once_with(request=expected_request)
 
 
+def test_client_get_multi_concurrent_in_transaction_begin_later():
+    """
+    Only the first of several concurrent reads should begin the transaction
+    """
+    import concurrent.futures
+    import threading
+
+    from google.cloud.datastore.key import Key
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    first_read = threading.Event()
+    requests = []
+
+    def lookup(request, **kwargs):
+        requests.append(request)
+        if "new_transaction" in request["read_options"]:
+            # hold the first read until the others have had a chance to start
+            first_read.wait(0.1)
+            return _make_lookup_response(transaction=b"txn")
+        return _make_lookup_response()
+
+    ds_api = _make_datastore_api()
+    ds_api.lookup.side_effect = lookup
+    client._datastore_api_internal = ds_api
+
+    txn = client.transaction(begin_later=True)
+    keys = [Key("Kind", index, project=PROJECT) for index in range(1, 6)]
+    with concurrent.futures.ThreadPoolExecutor(5) as executor:
+        list(executor.map(lambda key: client.get_multi([key], transaction=txn), keys))
+    first_read.set()
+
+    assert txn.id == b"txn"
+    new_transaction_reads = [
+        request for request in requests if "new_transaction" in request["read_options"]
+    ]
+    assert len(new_transaction_reads) == 1
+    assert len(requests) == 5
+    for request in requests:
+        if request is not new_transaction_reads[0]:
+            assert request["read_options"].transaction == b"txn"
+
+
+def test_client_get_multi_w_transaction_begin_later_lookup_failure():
+    from google.cloud.datastore.key import Key
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    ds_api = _make_datastore_api()
+    ds_api.lookup.side_effect = RuntimeError("boom")
+    client._datastore_api_internal = ds_api
+
+    txn = client.transaction()
+    with pytest.raises(RuntimeError):
+        client.get_multi([Key("Kind", 1234, project=PROJECT)], transaction=txn)
+
+    assert txn.id is None
+    assert not txn._begin_pending
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_client_get_multi_hit_w_read_time(database_id):
     from datetime import datetime
@@ -1079,6 +1396,59 @@ def test_client_delete_multi_w_existing_batch(database_id):
     client._datastore_api_internal.commit.assert_not_called()
 
 
+def test_client_increment_no_batch():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+
+    key = _Key()
+    creds = _make_credentials()
+    client = _make_client(credentials=creds, database=None)
+    ds_api = _make_datastore_api()
+    ds_api.commit.return_value = datastore_pb2.CommitResponse(
+        mutation_results=[
+            datastore_pb2.MutationResult(
+                transform_results=[entity_pb2.Value(integer_value=8)]
+            )
+        ]
+    )
+    client._datastore_api_internal = ds_api
+
+    assert client.increment(key, "count", 3, timeout=5) == 8
+
+    request = ds_api.commit.call_args[1]["request"]
+    (mutation,) = request["mutations"]
+    assert mutation.upsert.key == key.to_protobuf()
+    (transform,) = mutation.property_transforms
+    assert transform.property == "count"
+    assert transform.increment.integer_value == 3
+    assert ds_api.commit.call_args[1]["timeout"] == 5
+
+
+@pytest.mark.parametrize(
+    "method, transform_type",
+    [
+        ("maximum", "maximum"),
+        ("minimum", "minimum"),
+        ("array_union", "append_missing_elements"),
+        ("array_remove", "remove_all_from_array"),
+    ],
+)
+def test_client_transform_w_existing_batch(method, transform_type):
+    creds = _make_credentials()
+    client = _make_client(credentials=creds, database=None)
+    client._datastore_api_internal = _make_datastore_api()
+    value = [1] if method.startswith("array") else 1
+
+    with _NoCommitBatch(client) as CURR_BATCH:
+        result = getattr(client, method)(_Key(), "prop", value)
+
+    assert result is None
+    (mutation,) = CURR_BATCH.mutations
+    (transform,) = mutation.property_transforms
+    assert transform_type in transform
+    client._datastore_api_internal.commit.assert_not_called()
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_client_delete_multi_w_existing_transaction(database_id):
     creds = _make_credentials()
@@ -1564,7 +1934,67 @@ def test_client_transaction_w_defaults():
     with patch as mock_klass:
         xact = client.transaction()
         assert xact is mock_klass.return_value
-        mock_klass.assert_called_once_with(client)
+        mock_klass.assert_called_once_with(client, begin_later=True)
+
+
+def test_client_transaction_w_begin_later_false():
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+
+    patch = mock.patch("google.cloud.datastore.client.Transaction", spec=["__call__"])
+    with patch as mock_klass:
+        client.transaction(begin_later=False)
+        mock_klass.assert_called_once_with(client, begin_later=False)
+
+
+def test_client_transaction_wo_begin_transactions_lazily():
+    creds = _make_credentials()
+    client = _make_client(credentials=creds, begin_transactions_lazily=False)
+
+    patch = mock.patch("google.cloud.datastore.client.Transaction", spec=["__call__"])
+    with patch as mock_klass:
+        client.transaction()
+        client.transaction(begin_later=True)
+        assert mock_klass.call_args_list == [
+            mock.call(client, begin_later=False),
+            mock.call(client, begin_later=True),
+        ]
+
+
+def test_client_transaction_write_only_commits_once():
+    """
+    By default, a transaction which only writes is begun and committed by
+    a single Commit call.
+    """
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    ds_api = _make_datastore_api()
+    ds_api.commit.return_value = datastore_pb2.CommitResponse(
+        mutation_results=[datastore_pb2.MutationResult()]
+    )
+    client._datastore_api_internal = ds_api
+
+    with client.transaction() as xact:
+        xact.put(Entity(client.key("Kind", 1)))
+
+    # ``ds_api`` has no ``begin_transaction``: calling it would raise.
+    (call,) = ds_api.commit.call_args_list
+    assert "single_use_transaction" in call.kwargs["request"]
+
+
+def test_client_snapshot():
+    import datetime
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    read_time = datetime.datetime(2026, 1, 2, tzinfo=datetime.timezone.utc)
+
+    snapshot = client.snapshot(read_time=read_time)
+    assert snapshot._client is client
+    assert snapshot.read_time == read_time
 
 
 def test_client_transaction_w_read_only():
@@ -1580,6 +2010,146 @@ def test_client_transaction_w_read_only():
     assert xact._options._pb.read_only == TransactionOptions.ReadOnly()._pb
 
 
+def _make_transaction_api(*commit_effects):
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    begin_responses = [
+        datastore_pb2.BeginTransactionResponse(transaction=b"txn-%d" % (index,))
+        for index in range(len(commit_effects))
+    ]
+    return mock.Mock(
+        begin_transaction=mock.Mock(side_effect=begin_responses, spec=[]),
+        commit=mock.Mock(side_effect=list(commit_effects), spec=[]),
+        rollback=mock.Mock(spec=[]),
+        spec=["begin_transaction", "commit", "rollback"],
+    )
+
+
+def test_client_run_in_transaction_success():
+    from google.cloud.datastore_v1.types import TransactionOptions
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    ds_api = _make_transaction_api(_make_commit_response())
+    client._datastore_api_internal = ds_api
+    seen = []
+
+    def fn(transaction):
+        seen.append(transaction.attempt)
+        transaction.delete(client.key("Kind", 1234))
+        return "done"
+
+    assert client.run_in_transaction(fn) == "done"
+    assert seen == [1]
+    # Write-only transactions are begun by the commit itself.
+    ds_api.begin_transaction.assert_not_called()
+    request = ds_api.commit.call_args.kwargs["request"]
+    assert request["single_use_transaction"] == TransactionOptions()
+
+
+def test_client_run_in_transaction_retries_aborted_with_previous_transaction():
+    from google.api_core import exceptions
+    from google.cloud.datastore_v1.types import TransactionOptions
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    ds_api = _make_transaction_api(
+        exceptions.Aborted("contention"),
+        exceptions.Conflict("contention"),
+        _make_commit_response(),
+    )
+    client._datastore_api_internal = ds_api
+    attempts = []
+
+    def fn(transaction):
+        attempts.append(transaction.attempt)
+        transaction.delete(client.key("Kind", 1234))
+        return transaction.attempt
+
+    sleep_patch = mock.patch("google.cloud.datastore.client.time.sleep")
+    uniform_patch = mock.patch(
+        "google.cloud.datastore.client.random.uniform",
+        side_effect=lambda low, high: high,
+    )
+    with sleep_patch as sleep, uniform_patch:
+        result = client.run_in_transaction(
+            fn, initial_backoff=0.5, max_backoff=0.75, begin_later=False
+        )
+
+    assert result == 3
+    assert attempts == [1, 2, 3]
+    assert sleep.call_args_list == [mock.call(0.5), mock.call(0.75)]
+
+    begin_calls = ds_api.begin_transaction.call_args_list
+    assert begin_calls[0].kwargs["request"]["transaction_options"] == (
+        TransactionOptions()
+    )
+    for call, previous in zip(begin_calls[1:], [b"txn-0", b"txn-1"]):
+        options = call.kwargs["request"]["transaction_options"]
+        assert options.read_write.previous_transaction == previous
+
+
+def test_client_run_in_transaction_exhausts_attempts():
+    from google.api_core import exceptions
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    ds_api = _make_transaction_api(
+        exceptions.Aborted("first"), exceptions.Aborted("second")
+    )
+    client._datastore_api_internal = ds_api
+
+    def fn(transaction):
+        transaction.delete(client.key("Kind", 1234))
+
+    with mock.patch("google.cloud.datastore.client.time.sleep") as sleep:
+        with pytest.raises(exceptions.Aborted, match="second"):
+            client.run_in_transaction(fn, max_attempts=2)
+
+    sleep.assert_called_once()
+
+
+def test_client_run_in_transaction_does_not_retry_other_errors():
+    from google.api_core import exceptions
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    ds_api = _make_transaction_api(exceptions.AlreadyExists("exists"), None)
+    client._datastore_api_internal = ds_api
+
+    def fn(transaction):
+        transaction.delete(client.key("Kind", 1234))
+
+    with pytest.raises(exceptions.AlreadyExists):
+        client.run_in_transaction(fn)
+
+    ds_api.commit.assert_called_once()
+
+
+def test_client_run_in_transaction_rolls_back_on_error():
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    ds_api = _make_transaction_api(None)
+    client._datastore_api_internal = ds_api
+
+    def fn(transaction):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        client.run_in_transaction(fn, begin_later=False)
+
+    ds_api.rollback.assert_called_once()
+    ds_api.commit.assert_not_called()
+
+
+def test_client_run_in_transaction_w_invalid_max_attempts():
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+
+    with pytest.raises(ValueError):
+        client.run_in_transaction(mock.Mock(), max_attempts=0)
+
+
 def test_client_query_w_other_client():
     KIND = "KIND"
 
@@ -1687,6 +2257,26 @@ def test_client_query_w_namespace_collision(database_id):
         )
 
 
+def test_client_gql():
+    namespace = object()
+    creds = _make_credentials()
+    client = _make_client(namespace=namespace, credentials=creds)
+
+    patch = mock.patch("google.cloud.datastore.client.GqlQuery")
+    with patch as mock_klass:
+        iterator = client.gql("SELECT * FROM Kind WHERE a = @1 AND b = @b", 1, b=2)
+        assert iterator is mock_klass.return_value.fetch.return_value
+        mock_klass.assert_called_once_with(
+            client,
+            "SELECT * FROM Kind WHERE a = @1 AND b = @b",
+            positional_bindings=(1,),
+            named_bindings={"b": 2},
+            project=PROJECT,
+            namespace=namespace,
+        )
+        mock_klass.return_value.fetch.assert_called_once_with()
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_client_aggregation_query_w_defaults(database_id):
     creds = _make_credentials()
@@ -1753,6 +2343,176 @@ def test_client_reserve_ids_multi(database_id):
     reserve_ids.assert_called_once_with(request=expected_request)
 
 
+def _make_aggregation_response(**values):
+    from google.cloud.datastore_v1.types import aggregation_result
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    result = aggregation_result.AggregationResult()
+    for alias, value in values.items():
+        result.aggregate_properties[alias] = entity_pb2.Value(integer_value=value)
+    return datastore_pb2.RunAggregationQueryResponse(
+        batch=aggregation_result.AggregationResultBatch(
+            aggregation_results=[result],
+            more_results=query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS,
+        )
+    )
+
+
+def _make_aggregations_client(values_by_kind):
+    def run_aggregation_query(request, **kwargs):
+        kind = request["aggregation_query"].nested_query.kind[0].name
+        return _make_aggregation_response(**values_by_kind[kind])
+
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    client._datastore_api_internal = mock.Mock(
+        run_aggregation_query=mock.Mock(side_effect=run_aggregation_query),
+        spec=["run_aggregation_query"],
+    )
+    return client
+
+
+def test_client_run_aggregations_empty():
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+
+    assert client.run_aggregations([]) == {}
+
+
+@pytest.mark.parametrize("aliases", [(None,), ("total", "total")])
+def test_client_run_aggregations_w_bad_aliases(aliases):
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+    aggregation_queries = [
+        client.aggregation_query(client.query(kind="Kind")).count(alias=alias)
+        for alias in aliases
+    ]
+
+    with pytest.raises(ValueError):
+        client.run_aggregations(aggregation_queries)
+
+
+def test_client_run_aggregations():
+    client = _make_aggregations_client({"A": {"a": 3}, "B": {"b": 5, "b_sum": 9}})
+    aggregation_queries = [
+        client.aggregation_query(client.query(kind="A")).count(alias="a"),
+        client.aggregation_query(client.query(kind="B"))
+        .count(alias="b")
+        .sum("x", alias="b_sum"),
+    ]
+
+    values = client.run_aggregations(aggregation_queries, timeout=30)
+
+    assert values == {"a": 3, "b": 5, "b_sum": 9}
+    run_aggregation_query = client._datastore_api.run_aggregation_query
+    assert run_aggregation_query.call_count == 2
+    for call in run_aggregation_query.call_args_list:
+        assert 0 < call[1]["timeout"] <= 30
+
+
+def test_client_run_aggregations_in_transaction():
+    client = _make_aggregations_client({"A": {"a": 3}, "B": {"b": 5}})
+    aggregation_queries = [
+        client.aggregation_query(client.query(kind=kind)).count(alias=kind.lower())
+        for kind in ("A", "B")
+    ]
+
+    with _NoCommitTransaction(client, transaction_id=b"txn"):
+        values = client.run_aggregations(aggregation_queries)
+
+    assert values == {"a": 3, "b": 5}
+    for call in client._datastore_api.run_aggregation_query.call_args_list:
+        assert call[1]["request"]["read_options"].transaction == b"txn"
+
+
+def test_client_run_aggregations_past_deadline():
+    import threading
+
+    from google.api_core.exceptions import DeadlineExceeded
+
+    client = _make_aggregations_client({"A": {"a": 3}})
+    release = threading.Event()
+    run_aggregation_query = client._datastore_api.run_aggregation_query
+    respond = run_aggregation_query.side_effect
+
+    def slow_run_aggregation_query(request, **kwargs):
+        release.wait(5)
+        return respond(request, **kwargs)
+
+    run_aggregation_query.side_effect = slow_run_aggregation_query
+    aggregation_queries = [
+        client.aggregation_query(client.query(kind="A")).count(alias="a")
+    ]
+
+    try:
+        with pytest.raises(DeadlineExceeded):
+            client.run_aggregations(aggregation_queries, timeout=0.01)
+    finally:
+        release.set()
+
+
+@pytest.mark.asyncio
+async def test_client_run_aggregations_async():
+    client = _make_aggregations_client({"A": {"a": 3}, "B": {"b": 5}})
+    aggregation_queries = [
+        client.aggregation_query(client.query(kind=kind)).count(alias=kind.lower())
+        for kind in ("A", "B")
+    ]
+
+    values = await client.run_aggregations_async(aggregation_queries, timeout=30)
+
+    assert values == {"a": 3, "b": 5}
+
+
+@pytest.mark.asyncio
+async def test_client_run_aggregations_async_empty():
+    creds = _make_credentials()
+    client = _make_client(credentials=creds)
+
+    assert await client.run_aggregations_async([]) == {}
+
+
+@pytest.mark.asyncio
+async def test_client_run_aggregations_async_in_transaction():
+    client = _make_aggregations_client({"A": {"a": 3}})
+    aggregation_queries = [
+        client.aggregation_query(client.query(kind="A")).count(alias="a")
+    ]
+
+    with _NoCommitTransaction(client):
+        with pytest.raises(ValueError):
+            await client.run_aggregations_async(aggregation_queries)
+
+
+@pytest.mark.asyncio
+async def test_client_run_aggregations_async_past_deadline():
+    import threading
+
+    from google.api_core.exceptions import DeadlineExceeded
+
+    client = _make_aggregations_client({"A": {"a": 3}})
+    release = threading.Event()
+    run_aggregation_query = client._datastore_api.run_aggregation_query
+    respond = run_aggregation_query.side_effect
+
+    def slow_run_aggregation_query(request, **kwargs):
+        release.wait(5)
+        return respond(request, **kwargs)
+
+    run_aggregation_query.side_effect = slow_run_aggregation_query
+    aggregation_queries = [
+        client.aggregation_query(client.query(kind="A")).count(alias="a")
+    ]
+
+    try:
+        with pytest.raises(DeadlineExceeded):
+            await client.run_aggregations_async(aggregation_queries, timeout=0.01)
+    finally:
+        release.set()
+
+
 class _NoCommitBatch(object):
     def __init__(self, client):
         from google.cloud.datastore.batch import Batch
@@ -1894,9 +2654,9 @@ def _make_commit_response(*keys):
 
 
 def _make_lookup_response(results=(), missing=(), deferred=(), transaction=None):
-    entity_results_found = [
-        mock.Mock(entity=result, spec=["entity"]) for result in results
-    ]
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    entity_results_found = [query_pb2.EntityResult(entity=result) for result in results]
     entity_results_missing = [
         mock.Mock(entity=missing_entity, spec=["entity"]) for missing_entity in missing
     ]
@@ -0,0 +1,211 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import base64
+
+import mock
+import pytest
+
+_PROJECT = "PROJECT"
+_NAMESPACE = "NAMESPACE"
+
+
+class _Client(object):
+    def __init__(self, *results):
+        self.project = _PROJECT
+        self.namespace = _NAMESPACE
+        self.database = None
+        self.current_transaction = None
+        self.query_profiler = None
+        self._datastore_api = mock.Mock(
+            run_query=mock.Mock(side_effect=results, spec=[]), spec=["run_query"]
+        )
+
+    @property
+    def requests(self):
+        return [
+            call[1]["request"] for call in self._datastore_api.run_query.call_args_list
+        ]
+
+
+def _make_gql_query(*args, **kw):
+    from google.cloud.datastore.gql import GqlQuery
+
+    return GqlQuery(*args, **kw)
+
+
+def _make_entity_pb(id_):
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+
+    entity_pb = entity_pb2.Entity()
+    entity_pb.key.partition_id.project_id = _PROJECT
+    elem = entity_pb._pb.key.path.add()
+    elem.kind = "Kind"
+    elem.id = id_
+    return entity_pb
+
+
+def _make_response(ids, cursor, more_results, parsed=None, skipped_results=0):
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    response = datastore_pb2.RunQueryResponse(
+        batch=query_pb2.QueryResultBatch(
+            skipped_results=skipped_results,
+            end_cursor=cursor,
+            more_results=more_results,
+            entity_results=[
+                query_pb2.EntityResult(entity=_make_entity_pb(id_)) for id_ in ids
+            ],
+        )
+    )
+    if parsed is not None:
+        response.query = parsed
+    return response
+
+
+def _make_parsed(**kw):
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    return query_pb2.Query(kind=[query_pb2.KindExpression(name="Kind")], **kw)
+
+
+def _more_results(name):
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    return getattr(query_pb2.QueryResultBatch.MoreResultsType, name)
+
+
+def test__binding_sites():
+    from google.cloud.datastore.gql import _binding_sites
+
+    names, max_position = _binding_sites(
+        "SELECT * FROM Kind WHERE a = @a AND b > @2 AND c = @1 "
+        "AND d = '@quoted' AND `@e` = @b_1"
+    )
+    assert names == frozenset(["a", "b_1"])
+    assert max_position == 2
+
+
+def test__binding_sites_is_cached():
+    from google.cloud.datastore.gql import _binding_sites
+
+    query_string = "SELECT * FROM Kind WHERE a = @a"
+    assert _binding_sites(query_string) is _binding_sites(query_string)
+
+
+def test_gql_query_ctor_binds_values():
+    client = _Client()
+    query = _make_gql_query(
+        client,
+        "SELECT * FROM Kind WHERE a = @1 AND b = @name",
+        positional_bindings=(1,),
+        named_bindings={"name": "x"},
+        allow_literals=False,
+    )
+
+    assert query.project == _PROJECT
+    assert query.namespace == _NAMESPACE
+    assert query.query_string == "SELECT * FROM Kind WHERE a = @1 AND b = @name"
+    assert query._compiled_pb() is None
+    gql_pb = query._gql_pb
+    assert not gql_pb.allow_literals
+    assert [b.value.integer_value for b in gql_pb.positional_bindings] == [1]
+    assert gql_pb.named_bindings["name"].value.string_value == "x"
+
+
+def test_gql_query_ctor_w_missing_named_binding():
+    with pytest.raises(ValueError, match="Missing GQL bindings: a, b"):
+        _make_gql_query(_Client(), "SELECT * FROM Kind WHERE a = @a AND b = @b")
+
+
+def test_gql_query_ctor_w_unused_named_binding():
+    with pytest.raises(ValueError, match="Unused GQL bindings: b, c"):
+        _make_gql_query(
+            _Client(),
+            "SELECT * FROM Kind WHERE a = @a",
+            named_bindings={"a": 1, "b": 2, "c": 3},
+        )
+
+
+def test_gql_query_ctor_w_wrong_positional_count():
+    with pytest.raises(ValueError, match="Expected 2 positional"):
+        _make_gql_query(
+            _Client(),
+            "SELECT * FROM Kind WHERE a = @1 AND b = @2",
+            positional_bindings=(1,),
+        )
+
+
+def test_gql_query_fetch_sends_gql_then_parsed_query():
+    parsed = _make_parsed(limit={"value": 3})
+    client = _Client(
+        _make_response([1, 2], b"c1", _more_results("NOT_FINISHED"), parsed),
+        _make_response([3], b"c2", _more_results("MORE_RESULTS_AFTER_LIMIT")),
+    )
+    query = _make_gql_query(
+        client, "SELECT * FROM Kind LIMIT @1", positional_bindings=(3,)
+    )
+
+    entities = list(query.fetch())
+
+    assert [entity.key.id for entity in entities] == [1, 2, 3]
+    first, second = client.requests
+    assert first["gql_query"]._pb is query._gql_pb
+    assert "query" not in first
+    assert first["partition_id"].namespace_id == _NAMESPACE
+    assert "gql_query" not in second
+    assert second["query"].kind[0].name == "Kind"
+    assert second["query"].start_cursor == b"c1"
+    assert second["query"].limit == 1
+    # The cached template holds none of the in-flight fields.
+    assert not query._compiled_pb().HasField("limit")
+
+
+def test_gql_query_fetch_reuses_parsed_query():
+    parsed = _make_parsed(start_cursor=b"start", end_cursor=b"end", limit={"value": 5})
+    client = _Client(
+        _make_response([1], b"c1", _more_results("NO_MORE_RESULTS"), parsed),
+        _make_response([1], b"c1", _more_results("NO_MORE_RESULTS")),
+    )
+    query = _make_gql_query(client, "SELECT * FROM Kind")
+    list(query.fetch())
+
+    iterator = query.fetch()
+    assert iterator.max_results == 5
+    assert iterator.next_page_token == base64.urlsafe_b64encode(b"start")
+    list(iterator)
+
+    request = client.requests[1]
+    assert "gql_query" not in request
+    assert request["query"].start_cursor == b"start"
+    assert request["query"].end_cursor == b"end"
+    assert request["query"].limit == 5
+
+
+def test_gql_query_fetch_skips_offset_with_parsed_query():
+    parsed = _make_parsed(offset=1500)
+    client = _Client(
+        _make_response([], b"c1", _more_results("NOT_FINISHED"), parsed, 1000),
+        _make_response([1], b"c2", _more_results("NO_MORE_RESULTS"), None, 500),
+    )
+    query = _make_gql_query(client, "SELECT * FROM Kind OFFSET 1500")
+
+    entities = list(query.fetch())
+
+    assert [entity.key.id for entity in entities] == [1]
+    second = client.requests[1]
+    assert "gql_query" not in second
+    assert second["query"].offset == 500
+    assert second["query"].start_cursor == b"c1"
@@ -192,6 +192,50 @@ def test_entity_from_protobuf_w_index_mismatch_w_empty_list():
     assert entity_dict["baz"] == []
 
 
+def test_entity_from_result():
+    import datetime
+
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from google.cloud.datastore.helpers import entity_from_result
+
+    create_time = datetime.datetime(2026, 1, 2, tzinfo=datetime.timezone.utc)
+    update_time = datetime.datetime(2026, 3, 4, tzinfo=datetime.timezone.utc)
+    entity_pb = entity_pb2.Entity()
+    entity_pb.key.partition_id.project_id = "PROJECT"
+    entity_pb.key._pb.path.add(kind="KIND", id=1234)
+    entity_pb._pb.properties["foo"].string_value = "Foo"
+    result_pb = query_pb2.EntityResult(
+        entity=entity_pb,
+        version=42,
+        create_time=create_time,
+        update_time=update_time,
+    )
+
+    entity = entity_from_result(result_pb)
+
+    assert entity.key.id == 1234
+    assert entity["foo"] == "Foo"
+    assert entity.version == 42
+    assert entity.create_time == create_time
+    assert entity.update_time == update_time
+
+
+def test_entity_from_result_wo_metadata():
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from google.cloud.datastore.helpers import entity_from_result
+
+    result_pb = query_pb2.EntityResult()
+    result_pb.entity.key.partition_id.project_id = "PROJECT"
+    result_pb.entity.key._pb.path.add(kind="KIND", id=1234)
+
+    entity = entity_from_result(result_pb._pb)
+
+    assert entity.version is None
+    assert entity.create_time is None
+    assert entity.update_time is None
+
+
 def _compare_entity_proto(entity_pb1, entity_pb2):
     assert entity_pb1.key == entity_pb2.key
     value_list1 = sorted(entity_pb1.properties.items())
@@ -673,6 +717,71 @@ def test__get_transaction_options_not_started():
     assert new_t is None
 
 
+def test__get_transaction_options_w_begin_in_flight():
+    """
+    Concurrent reads wait for the first read to return the transaction id
+    """
+    import threading
+
+    from google.cloud.datastore.helpers import get_transaction_options
+    from google.cloud.datastore import Transaction
+
+    txn = Transaction(None, begin_later=True)
+    assert get_transaction_options(txn) == (None, txn._options)
+
+    results = []
+    waiter = threading.Thread(
+        target=lambda: results.append(get_transaction_options(txn))
+    )
+    waiter.start()
+    waiter.join(0.05)
+    assert waiter.is_alive()
+
+    txn._begin_with_id(b"123abc")
+    waiter.join(5)
+    assert results == [(b"123abc", None)]
+
+
+def test__begin_transaction_from_read_w_transaction():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore.helpers import begin_transaction_from_read
+    from google.cloud.datastore import Transaction
+
+    txn = Transaction(None, begin_later=True)
+    options = txn._claim_begin()
+    response_pb = datastore_pb2.LookupResponse(transaction=b"123abc")
+    begin_transaction_from_read(txn, response_pb, options)
+    assert txn.id == b"123abc"
+    assert txn._status == Transaction._IN_PROGRESS
+
+
+@pytest.mark.parametrize("w_response", [False, True])
+def test__begin_transaction_from_read_wo_transaction(w_response):
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore.helpers import begin_transaction_from_read
+    from google.cloud.datastore import Transaction
+
+    response_pb = datastore_pb2.LookupResponse() if w_response else None
+    txn = Transaction(None, begin_later=True)
+    options = txn._claim_begin()
+    begin_transaction_from_read(txn, response_pb, options)
+    assert txn.id is None
+    assert txn._status == Transaction._INITIAL
+    # the next read may try to begin the transaction instead
+    assert txn._claim_begin() is options
+
+
+def test__begin_transaction_from_read_not_claimed():
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+    from google.cloud.datastore.helpers import begin_transaction_from_read
+    from google.cloud.datastore import Transaction
+
+    txn = Transaction(None, begin_later=True)
+    response_pb = datastore_pb2.LookupResponse(transaction=b"123abc")
+    begin_transaction_from_read(txn, response_pb, None)
+    assert txn.id is None
+
+
 def test__pb_attr_value_w_datetime_naive():
     import calendar
     import datetime
@@ -935,6 +1044,21 @@ def test__get_value_from_value_pb_w_array():
     assert items == ["Foo", "Bar"]
 
 
+def test__get_value_from_value_pb_w_vector():
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+    from google.cloud.datastore.helpers import _get_value_from_value_pb
+    from google.cloud.datastore.helpers import Vector
+
+    value = entity_pb2.Value(meaning=31)
+    for component in (0.5, 1.0, -2.0):
+        value.array_value.values._pb.add().double_value = component
+
+    result = _get_value_from_value_pb(value._pb)
+
+    assert isinstance(result, Vector)
+    assert result == Vector([0.5, 1.0, -2.0])
+
+
 def test__get_value_from_value_pb_w_geo_point():
     from google.type import latlng_pb2
     from google.cloud.datastore_v1.types import entity as entity_pb2
@@ -1121,6 +1245,17 @@ def test__set_protobuf_value_w_array():
     assert marshalled[2].double_value == values[2]
 
 
+def test__set_protobuf_value_w_vector():
+    from google.cloud.datastore.helpers import _set_protobuf_value
+    from google.cloud.datastore.helpers import Vector
+
+    pb = _make_empty_value_pb()
+    _set_protobuf_value(pb, Vector([1, 2.5]))
+
+    assert pb.meaning == 31
+    assert [item.double_value for item in pb.array_value.values] == [1.0, 2.5]
+
+
 def test__set_protobuf_value_w_geo_point():
     from google.type import latlng_pb2
     from google.cloud.datastore.helpers import GeoPoint
@@ -1409,6 +1544,106 @@ def test__array_w_meaning_end_to_end():
     assert final_pb.array_value.values[2].double_value == 3
 
 
+def test_vector():
+    from google.cloud.datastore.helpers import Vector
+
+    vector = Vector([1, 2, 3.5])
+
+    assert len(vector) == 3
+    assert list(vector) == [1.0, 2.0, 3.5]
+    assert vector[2] == 3.5
+    assert vector == Vector((1.0, 2.0, 3.5))
+    assert vector != Vector([1.0, 2.0])
+    assert vector != [1.0, 2.0, 3.5]
+    assert repr(vector) == "Vector([1.0, 2.0, 3.5])"
+
+
+def test_vector_end_to_end():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.helpers import entity_from_protobuf
+    from google.cloud.datastore.helpers import entity_to_protobuf
+    from google.cloud.datastore.helpers import Vector
+
+    entity = Entity()
+    entity["embedding"] = Vector([0.25, 0.5])
+
+    round_tripped = entity_from_protobuf(entity_to_protobuf(entity)._pb)
+
+    assert round_tripped["embedding"] == Vector([0.25, 0.5])
+    assert entity_to_protobuf(round_tripped).properties["embedding"].meaning == 31
+
+
+def test_vector_from_buffer():
+    import array
+
+    from google.cloud.datastore.helpers import Vector
+
+    source = array.array("d", [1.5, -2.0])
+    vector = Vector(source)
+    source[0] = 0.0
+
+    assert list(vector) == [1.5, -2.0]
+    assert Vector(vector) == vector
+    copy = vector.to_array()
+    assert copy.typecode == "d"
+    assert list(copy) == [1.5, -2.0]
+
+
+def test_vector_excluded_from_indexes():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.helpers import entity_from_protobuf
+    from google.cloud.datastore.helpers import entity_to_protobuf
+    from google.cloud.datastore.helpers import Vector
+
+    entity = Entity()
+    entity["embedding"] = Vector([1.0, 2.0, 3.0])
+
+    entity_pb = entity_to_protobuf(entity)
+    value_pb = entity_pb._pb.properties["embedding"]
+
+    assert value_pb.exclude_from_indexes
+    # Components carry only their double value.
+    assert not any(item.exclude_from_indexes for item in value_pb.array_value.values)
+    assert entity_from_protobuf(entity_pb._pb).exclude_from_indexes == {"embedding"}
+
+
+def test_nested_vector_excluded_from_indexes():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.helpers import entity_from_protobuf
+    from google.cloud.datastore.helpers import entity_to_protobuf
+    from google.cloud.datastore.helpers import Vector
+
+    inner = Entity()
+    inner["embedding"] = Vector([1.0, 2.0])
+    entity = Entity()
+    entity["inner"] = inner
+    entity["items"] = [Vector([3.0]), "indexed"]
+
+    entity_pb = entity_to_protobuf(entity)._pb
+
+    inner_pb = entity_pb.properties["inner"]
+    assert not inner_pb.exclude_from_indexes
+    assert inner_pb.entity_value.properties["embedding"].exclude_from_indexes
+    # List items are indexed as a whole, per ``exclude_from_indexes``.
+    items_pb = entity_pb.properties["items"].array_value.values
+    assert not any(item_pb.exclude_from_indexes for item_pb in items_pb)
+    assert entity_from_protobuf(entity_pb)["items"] == entity["items"]
+
+
+def test__get_value_from_value_pb_w_vector_meaning_wo_doubles():
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+    from google.cloud.datastore.helpers import _get_value_from_value_pb
+
+    value = entity_pb2.Value(meaning=31)
+    value.array_value.values._pb.add().double_value = 1.0
+    item_pb = value.array_value.values._pb.add()
+    item_pb.double_value = 2.0
+    item_pb.exclude_from_indexes = True
+    value.array_value.values._pb.add().integer_value = 3
+
+    assert _get_value_from_value_pb(value._pb) == [1.0, 2.0, 3]
+
+
 def _make_geopoint(*args, **kwargs):
     from google.cloud.datastore.helpers import GeoPoint
 
@@ -0,0 +1,85 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+
+class _RecordingHook(object):
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def method(event):
+            self.calls.append((name, event.stage, event.duration))
+
+        return method
+
+
+def test_client_hook_methods_are_no_ops():
+    from google.cloud.datastore.hooks import ClientHook
+    from google.cloud.datastore.hooks import HookEvent
+
+    hook = ClientHook()
+    event = HookEvent("rpc", "commit")
+    for stage in ("encode", "rpc", "decode"):
+        assert getattr(hook, "pre_" + stage)(event) is None
+        assert getattr(hook, "post_" + stage)(event) is None
+
+
+def test_hook_event_repr():
+    from google.cloud.datastore.hooks import HookEvent
+
+    event = HookEvent("decode", "lookup", 3)
+    assert repr(event) == "<HookEvent decode lookup count=3 duration=None>"
+
+
+def test__stage_wo_hooks():
+    from google.cloud.datastore.hooks import _stage
+
+    with _stage((), "encode", "commit", 2) as event:
+        assert event is None
+
+
+def test__stage_w_hooks():
+    from google.cloud.datastore.hooks import _stage
+
+    first, second = _RecordingHook(), _RecordingHook()
+
+    with _stage((first, second), "encode", "commit", 2) as event:
+        assert event.start_time is not None
+        assert first.calls == [("pre_encode", "encode", None)]
+
+    assert event.method == "commit"
+    assert event.count == 2
+    assert event.duration >= 0
+    assert event.error is None
+    for hook in (first, second):
+        assert hook.calls == [
+            ("pre_encode", "encode", None),
+            ("post_encode", "encode", event.duration),
+        ]
+
+
+def test__stage_w_error():
+    from google.cloud.datastore.hooks import _stage
+
+    hook = _RecordingHook()
+    error = RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        with _stage((hook,), "rpc", "lookup") as event:
+            raise error
+
+    assert event.error is error
+    assert [name for name, _, _ in hook.calls] == ["pre_rpc", "post_rpc"]
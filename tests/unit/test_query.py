@@ -26,6 +26,7 @@ from google.cloud.datastore.query import (
 )
 
 from google.cloud.datastore.helpers import set_database_id_to_request
+from google.cloud.datastore.key import Key
 
 _PROJECT = "PROJECT"
 
@@ -713,6 +714,7 @@ def test_query_transaction_begin_later(database_id):
     transaction._begin_later = True
     transaction._status = transaction._INITIAL
     transaction._options = TransactionOptions(read_only=TransactionOptions.ReadOnly())
+    transaction._claim_begin.return_value = transaction._options
 
     mock_datastore_api = mock.Mock()
     mock_gapic = mock_datastore_api.run_query
@@ -739,6 +741,397 @@ def test_query_transaction_begin_later(database_id):
     assert read_options.new_transaction == transaction._options
 
 
+def test_query_fetch_fan_out_w_cursor():
+    query = _make_query(_make_client(), filters=[PropertyFilter("a", "IN", [1, 2])])
+
+    with pytest.raises(ValueError):
+        query.fetch(fan_out=True, start_cursor=b"abc")
+
+
+def test_query_fetch_fan_out_w_distinct_on():
+    query = _make_query(
+        _make_client(),
+        filters=[PropertyFilter("a", "IN", [1, 2])],
+        distinct_on=["a"],
+    )
+
+    with pytest.raises(ValueError):
+        query.fetch(fan_out=True)
+
+
+def test_query_fetch_fan_out_w_explain_options():
+    from google.cloud.datastore.query_profile import ExplainOptions
+
+    query = _make_query(
+        _make_client(),
+        filters=[PropertyFilter("a", "IN", [1, 2])],
+        explain_options=ExplainOptions(),
+    )
+
+    with pytest.raises(ValueError):
+        query.fetch(fan_out=True)
+
+
+def test_query_fetch_fan_out_too_many_sub_queries():
+    query = _make_query(
+        _make_client(),
+        filters=[
+            PropertyFilter("a", "IN", list(range(6))),
+            PropertyFilter("b", "IN", list(range(6))),
+        ],
+    )
+
+    with pytest.raises(ValueError):
+        query.fetch(fan_out=True)
+
+
+def test_query_fetch_fan_out_wo_disjunction():
+    from google.cloud.datastore.query import Iterator
+
+    query = _make_query(_make_client(), filters=[PropertyFilter("a", "=", 1)])
+
+    iterator = query.fetch(fan_out=True, limit=3, page_size=2, adaptive_page_size=True)
+
+    assert type(iterator) is Iterator
+    assert iterator.max_results == 3
+    assert iterator._page_size == 2
+    assert iterator._page_sizer is not None
+
+
+def test_query_fetch_w_properties():
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    no_more = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+    entity_pb = _make_entity("Kind", 1234, _PROJECT)
+    ds_api = mock.Mock(spec=["run_query"])
+    ds_api.run_query.return_value = _make_query_response([entity_pb], b"", no_more, 0)
+    client = _Client(_PROJECT, datastore_api=ds_api)
+    query = _make_query(client, kind="Kind")
+
+    entities = list(query.fetch(properties=["name", "address.city"]))
+
+    assert [entity.key.id for entity in entities] == [1234]
+    request = ds_api.run_query.call_args.kwargs["request"]
+    assert list(request["property_mask"].paths) == ["name", "address.city"]
+
+
+def test_query_fetch_w_properties_w_projection():
+    query = _make_query(_make_client(), projection=["name"])
+
+    with pytest.raises(ValueError):
+        query.fetch(properties=["name"])
+
+
+def test_query_fetch_w_empty_properties():
+    query = _make_query(_make_client())
+
+    with pytest.raises(ValueError):
+        list(query.fetch(properties=[]))
+
+
+def test_query_fetch_fan_out_w_properties_wo_order_property():
+    query = _make_query(
+        _make_client(),
+        filters=[PropertyFilter("a", "IN", [1, 2])],
+        order=["rank", "__key__"],
+    )
+
+    with pytest.raises(ValueError):
+        query.fetch(fan_out=True, properties=["name"])
+
+
+def _fan_out_datastore_api(results_by_value):
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    no_more = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+
+    def run_query(request, **kwargs):
+        filter_pb = request["query"].filter.composite_filter.filters[0]
+        value = filter_pb.property_filter.value.integer_value
+        return _make_query_response(results_by_value[value], b"", no_more, 0)
+
+    return mock.Mock(run_query=mock.Mock(side_effect=run_query), spec=["run_query"])
+
+
+def _make_ordered_entity(id_, rank):
+    entity_pb = _make_entity("Kind", id_, _PROJECT)
+    entity_pb._pb.properties.get_or_create("rank").integer_value = rank
+    return entity_pb
+
+
+@pytest.mark.parametrize("in_transaction", [False, True])
+def test_query_fetch_fan_out_merges_in_order(in_transaction):
+    from google.cloud.datastore.query import _FanOutIterator
+
+    ds_api = _fan_out_datastore_api(
+        {
+            1: [_make_ordered_entity(10, 1), _make_ordered_entity(11, 4)],
+            2: [
+                _make_ordered_entity(12, 2),
+                _make_ordered_entity(11, 4),
+                _make_ordered_entity(13, 5),
+            ],
+        }
+    )
+    transaction = None
+    if in_transaction:
+        transaction = mock.Mock(id=b"txn", spec=["id"])
+    client = _Client(_PROJECT, datastore_api=ds_api, transaction=transaction)
+    query = _make_query(
+        client, filters=[PropertyFilter("a", "IN", [1, 2])], order=["rank"]
+    )
+
+    iterator = query.fetch(fan_out=True)
+
+    assert isinstance(iterator, _FanOutIterator)
+    entities = list(iterator)
+    assert [entity.key.id for entity in entities] == [10, 12, 11, 13]
+    assert ds_api.run_query.call_count == 2
+    assert iterator.next_page_token is None
+
+
+def test_query_fetch_fan_out_w_properties():
+    ds_api = _fan_out_datastore_api(
+        {1: [_make_ordered_entity(10, 1)], 2: [_make_ordered_entity(11, 2)]}
+    )
+    client = _Client(_PROJECT, datastore_api=ds_api)
+    query = _make_query(
+        client, filters=[PropertyFilter("a", "IN", [1, 2])], order=["-rank"]
+    )
+
+    entities = list(query.fetch(fan_out=True, properties=["rank"]))
+
+    assert [entity.key.id for entity in entities] == [11, 10]
+    for call in ds_api.run_query.call_args_list:
+        assert list(call.kwargs["request"]["property_mask"].paths) == ["rank"]
+
+
+def test_query_fetch_fan_out_w_descending_order_offset_and_limit():
+    ds_api = _fan_out_datastore_api(
+        {
+            1: [_make_ordered_entity(11, 4), _make_ordered_entity(10, 1)],
+            2: [_make_ordered_entity(13, 5), _make_ordered_entity(12, 2)],
+        }
+    )
+    client = _Client(_PROJECT, datastore_api=ds_api)
+    query = _make_query(
+        client,
+        filters=[Or([PropertyFilter("a", "=", 1), PropertyFilter("a", "=", 2)])],
+        order=["-rank"],
+    )
+
+    entities = list(query.fetch(fan_out=True, offset=1, limit=2))
+
+    assert [entity.key.id for entity in entities] == [11, 12]
+    for call in ds_api.run_query.call_args_list:
+        assert call[1]["request"]["query"].limit == 3
+        assert call[1]["request"]["query"].offset == 0
+
+
+def test_query_fetch_fan_out_w_projection_on_multi_valued_property():
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    no_more = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+
+    def make_row(id_, tag):
+        entity_pb = _make_entity("Kind", id_, _PROJECT)
+        entity_pb._pb.properties.get_or_create("tags").string_value = tag
+        return entity_pb
+
+    # Entity 1 matches both sub-queries, with one row per ``tags`` value.
+    results = {
+        1: [make_row(1, "a"), make_row(1, "b"), make_row(1, "c")],
+        2: [make_row(1, "a"), make_row(1, "b"), make_row(1, "c"), make_row(2, "a")],
+    }
+
+    def run_query(request, **kwargs):
+        filter_pb = request["query"].filter.composite_filter.filters[0]
+        value = filter_pb.property_filter.value.integer_value
+        return _make_query_response(results[value], b"", no_more, 0)
+
+    ds_api = mock.Mock(run_query=mock.Mock(side_effect=run_query), spec=["run_query"])
+    client = _Client(_PROJECT, datastore_api=ds_api)
+    query = _make_query(
+        client, filters=[PropertyFilter("x", "IN", [1, 2])], projection=["tags"]
+    )
+
+    rows = list(query.fetch(fan_out=True))
+
+    assert [(row.key.id, row["tags"]) for row in rows] == [
+        (1, "a"),
+        (1, "b"),
+        (1, "c"),
+        (2, "a"),
+    ]
+
+
+def test_query_fetch_fan_out_w_page_size():
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    more = query_pb2.QueryResultBatch.MoreResultsType.MORE_RESULTS_AFTER_LIMIT
+    no_more = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+    responses = {
+        (1, b""): ([_make_ordered_entity(10, 1)], b"c1", more),
+        (1, b"c1"): ([_make_ordered_entity(12, 3)], b"", no_more),
+        (2, b""): ([_make_ordered_entity(11, 2)], b"c2", more),
+        (2, b"c2"): ([_make_ordered_entity(13, 4)], b"", no_more),
+    }
+
+    def run_query(request, **kwargs):
+        query_pb = request["query"]
+        assert query_pb.limit == 1
+        filter_pb = query_pb.filter.composite_filter.filters[0]
+        value = filter_pb.property_filter.value.integer_value
+        entity_pbs, cursor, more_results = responses[(value, query_pb.start_cursor)]
+        return _make_query_response(entity_pbs, cursor, more_results, 0)
+
+    ds_api = mock.Mock(run_query=mock.Mock(side_effect=run_query), spec=["run_query"])
+    client = _Client(_PROJECT, datastore_api=ds_api)
+    query = _make_query(
+        client, filters=[PropertyFilter("a", "IN", [1, 2])], order=["rank"]
+    )
+
+    pages = query.fetch(fan_out=True, page_size=1).pages
+    first_page = next(pages)
+
+    # Only the first page of each sub-query is needed so far.
+    assert [entity.key.id for entity in first_page] == [10]
+    assert ds_api.run_query.call_count == 2
+
+    rest = [entity.key.id for page in pages for entity in page]
+    assert rest == [11, 12, 13]
+    assert ds_api.run_query.call_count == 4
+
+
+def test__unique_rows_w_projection_on_geo_point():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.helpers import GeoPoint
+    from google.cloud.datastore.key import Key
+    from google.cloud.datastore.query import _unique_rows
+
+    key = Key("Kind", 1, project=_PROJECT)
+    rows = [Entity(key), Entity(key), Entity(key)]
+    rows[0]["where"] = GeoPoint(1.0, 2.0)
+    rows[1]["where"] = GeoPoint(1.0, 2.0)
+    rows[2]["where"] = GeoPoint(3.0, 4.0)
+
+    assert list(_unique_rows(rows, ["where"])) == [rows[0], rows[2]]
+    assert list(_unique_rows(rows)) == [rows[0]]
+
+
+def test_query_fetch_fan_out_w_different_inequalities_wo_order():
+    query = _make_query(
+        _make_client(),
+        filters=[Or([PropertyFilter("a", ">", 5), PropertyFilter("b", "<", 3)])],
+    )
+
+    with pytest.raises(ValueError, match="sorted differently"):
+        query.fetch(fan_out=True, limit=2)
+
+
+def test_query_fetch_fan_out_w_different_inequalities_and_limit():
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    no_more = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+
+    def make_entity(id_, a, b):
+        entity_pb = _make_entity("Kind", id_, _PROJECT)
+        entity_pb._pb.properties.get_or_create("a").integer_value = a
+        entity_pb._pb.properties.get_or_create("b").integer_value = b
+        return entity_pb
+
+    results = {
+        "a": [make_entity(1, 6, 9), make_entity(2, 7, 1)],
+        "b": [make_entity(3, 1, 2), make_entity(2, 7, 1)],
+    }
+
+    def run_query(request, **kwargs):
+        filter_pb = request["query"].filter.composite_filter.filters[0]
+        return _make_query_response(
+            results[filter_pb.property_filter.property.name], b"", no_more, 0
+        )
+
+    ds_api = mock.Mock(run_query=mock.Mock(side_effect=run_query), spec=["run_query"])
+    client = _Client(_PROJECT, datastore_api=ds_api)
+    query = _make_query(
+        client,
+        filters=[Or([PropertyFilter("a", ">", 5), PropertyFilter("b", "<", 3)])],
+        order=["a", "b"],
+    )
+
+    entities = list(query.fetch(fan_out=True, limit=2))
+
+    assert [entity.key.id for entity in entities] == [3, 1]
+    for call in ds_api.run_query.call_args_list:
+        order = call.kwargs["request"]["query"].order
+        assert [order_pb.property.name for order_pb in order] == ["a", "b", "__key__"]
+
+
+def test__branch_order():
+    from google.cloud.datastore.query import _branch_order
+
+    conjunction = [PropertyFilter("b", ">", 1), PropertyFilter("a", "!=", 2)]
+
+    assert _branch_order([], conjunction) == ["a", "b", "__key__"]
+    assert _branch_order(["-b"], conjunction) == ["-b", "a", "__key__"]
+    assert _branch_order(["c", "__key__"], conjunction) == ["c", "__key__"]
+    assert _branch_order([], [PropertyFilter("a", "=", 1)]) == ["__key__"]
+
+
+def test_split_disjunctions():
+    from google.cloud.datastore.query import _split_disjunctions
+
+    eq_a = PropertyFilter("a", "=", 1)
+    eq_b = PropertyFilter("b", "=", 2)
+    eq_c = PropertyFilter("c", "=", 3)
+    filters = [
+        ("x", ">", 0),
+        Or([eq_a, And([eq_b, Or([eq_c, PropertyFilter("d", "IN", [4, 5])])])]),
+    ]
+
+    conjunctions = _split_disjunctions(filters)
+
+    assert [
+        [(f.property_name, f.operator, f.value) for f in conjunction]
+        for conjunction in conjunctions
+    ] == [
+        [("x", ">", 0), ("a", "=", 1)],
+        [("x", ">", 0), ("b", "=", 2), ("c", "=", 3)],
+        [("x", ">", 0), ("b", "=", 2), ("d", "=", 4)],
+        [("x", ">", 0), ("b", "=", 2), ("d", "=", 5)],
+    ]
+
+
+def test_value_sort_key_orders_across_types():
+    from google.cloud.datastore.helpers import GeoPoint
+    from google.cloud.datastore.key import Key
+    from google.cloud.datastore.query import _value_sort_key
+
+    values = [
+        Key("Kind", "name", project=_PROJECT),
+        Key("Kind", 2, project=_PROJECT),
+        GeoPoint(1.0, 2.0),
+        1.5,
+        "b",
+        "a",
+        b"z",
+        True,
+        datetime.datetime(1970, 1, 1, 0, 0, 0, 5, tzinfo=datetime.timezone.utc),
+        3,
+        None,
+    ]
+
+    assert sorted(values, key=_value_sort_key) == list(reversed(values))
+
+
+def test_value_sort_key_w_list():
+    from google.cloud.datastore.query import _value_sort_key
+
+    assert _value_sort_key([3, 1, 2]) == (1, 1)
+    assert _value_sort_key([3, 1, 2], descending=True) == (1, 3)
+    assert _value_sort_key([]) == (0,)
+
+
 def test_iterator_constructor_defaults():
     query = object()
     client = object()
@@ -855,6 +1248,194 @@ def test_iterator__build_protobuf_all_values_except_start_and_end_cursor():
     assert pb == expected_pb
 
 
+def test_iterator_constructor_w_page_size():
+    iterator = _make_iterator(object(), object(), page_size=25)
+
+    assert iterator.page_size == 25
+    assert iterator._page_sizer is None
+
+
+def test_iterator_constructor_w_bad_page_size():
+    with pytest.raises(ValueError):
+        _make_iterator(object(), object(), page_size=0)
+
+
+def test_iterator_constructor_w_adaptive_page_size():
+    from google.cloud.datastore.query import _ADAPTIVE_INITIAL_PAGE_SIZE
+
+    iterator = _make_iterator(object(), object(), adaptive_page_size=True)
+
+    assert iterator.page_size == _ADAPTIVE_INITIAL_PAGE_SIZE
+
+
+def test_iterator__build_protobuf_w_page_size_lt_limit():
+    from google.cloud.datastore.query import Query
+
+    client = _Client(None)
+    iterator = _make_iterator(Query(client), client, limit=15, page_size=5)
+
+    pb = iterator._build_protobuf()
+    assert pb.limit == 5
+    assert iterator._limited_by_page_size
+
+
+def test_iterator__build_protobuf_w_page_size_gt_remaining():
+    from google.cloud.datastore.query import Query
+
+    client = _Client(None)
+    iterator = _make_iterator(Query(client), client, limit=15, page_size=5)
+    iterator.num_results = 12
+
+    pb = iterator._build_protobuf()
+    assert pb.limit == 3
+    assert not iterator._limited_by_page_size
+
+
+def test_iterator__process_query_results_after_page_size_limit():
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from google.cloud.datastore.query import Query
+
+    client = _Client(None)
+    iterator = _make_iterator(Query(client), client, page_size=1)
+    iterator._build_protobuf()
+
+    more_results_enum = (
+        query_pb2.QueryResultBatch.MoreResultsType.MORE_RESULTS_AFTER_LIMIT
+    )
+    response_pb = _make_query_response(
+        [_make_entity("Hello", 1, "PROJECT")], b"\x9ai\xe7", more_results_enum, 0
+    )
+    iterator._process_query_results(response_pb)
+
+    assert iterator._more_results
+    assert iterator.next_page_token == b"mmnn"
+
+
+def test_iterator__process_query_results_after_caller_limit():
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from google.cloud.datastore.query import Query
+
+    client = _Client(None)
+    iterator = _make_iterator(Query(client), client, limit=1, page_size=5)
+    iterator._build_protobuf()
+
+    more_results_enum = (
+        query_pb2.QueryResultBatch.MoreResultsType.MORE_RESULTS_AFTER_LIMIT
+    )
+    response_pb = _make_query_response(
+        [_make_entity("Hello", 1, "PROJECT")], b"\x9ai\xe7", more_results_enum, 0
+    )
+    iterator._process_query_results(response_pb)
+
+    assert not iterator._more_results
+
+
+def test_iterator_w_page_size_pages_until_done():
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from google.cloud.datastore.query import Query
+
+    after_limit = query_pb2.QueryResultBatch.MoreResultsType.MORE_RESULTS_AFTER_LIMIT
+    no_more = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+    response_1 = _make_query_response(
+        [_make_entity("Kind", 1, "PROJECT"), _make_entity("Kind", 2, "PROJECT")],
+        b"CURSOR1",
+        after_limit,
+        0,
+    )
+    response_2 = _make_query_response(
+        [_make_entity("Kind", 3, "PROJECT")], b"CURSOR2", no_more, 0
+    )
+    ds_api = _make_datastore_api(response_1, response_2)
+    client = _Client("PROJECT", datastore_api=ds_api)
+    iterator = _make_iterator(Query(client), client, page_size=2)
+
+    entities = list(iterator)
+
+    assert [entity.key.id for entity in entities] == [1, 2, 3]
+    requests = [call[1]["request"] for call in ds_api.run_query.call_args_list]
+    assert [request["query"].limit for request in requests] == [2, 2]
+    assert requests[1]["query"].start_cursor == b"CURSOR1"
+
+
+def test_iterator_w_adaptive_page_size_observes_pages():
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from google.cloud.datastore.query import Query
+
+    no_more = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+    response = _make_query_response(
+        [_make_entity("Kind", 1, "PROJECT")], b"", no_more, 0
+    )
+    ds_api = _make_datastore_api(response)
+    client = _Client("PROJECT", datastore_api=ds_api)
+    iterator = _make_iterator(
+        Query(client), client, page_size=20, adaptive_page_size=True
+    )
+
+    with mock.patch.object(iterator._page_sizer, "observe") as observe:
+        list(iterator)
+
+    observe.assert_called_once()
+    num_results, num_bytes, elapsed = observe.call_args[0]
+    assert num_results == 1
+    assert num_bytes == response._pb.ByteSize()
+    assert elapsed >= 0
+    assert ds_api.run_query.call_args[1]["request"]["query"].limit == 20
+
+
+def test_adaptive_page_size_grows_for_cheap_pages():
+    from google.cloud.datastore.query import _AdaptivePageSize
+
+    sizer = _AdaptivePageSize(100)
+    sizer.observe(100, 10 * 1024, 0.01)
+
+    assert sizer.size == 200
+
+
+def test_adaptive_page_size_shrinks_for_wide_entities():
+    from google.cloud.datastore.query import _AdaptivePageSize
+
+    sizer = _AdaptivePageSize(100)
+    # 32KiB per entity: 1MiB target fits 32 entities.
+    sizer.observe(100, 100 * 32 * 1024, 0.01)
+
+    assert sizer.size == 50
+    sizer.observe(50, 50 * 32 * 1024, 0.01)
+    assert sizer.size == 32
+
+
+def test_adaptive_page_size_shrinks_for_slow_pages():
+    from google.cloud.datastore.query import _AdaptivePageSize
+
+    sizer = _AdaptivePageSize(100)
+    sizer.observe(100, 1024, 0.8)
+
+    assert sizer.size == 62
+
+
+def test_adaptive_page_size_respects_bounds():
+    from google.cloud.datastore.query import _ADAPTIVE_MAX_PAGE_SIZE
+    from google.cloud.datastore.query import _ADAPTIVE_MIN_PAGE_SIZE
+    from google.cloud.datastore.query import _AdaptivePageSize
+
+    sizer = _AdaptivePageSize(_ADAPTIVE_MAX_PAGE_SIZE)
+    sizer.observe(_ADAPTIVE_MAX_PAGE_SIZE, 1, 0.0)
+    assert sizer.size == _ADAPTIVE_MAX_PAGE_SIZE
+
+    sizer = _AdaptivePageSize(_ADAPTIVE_MIN_PAGE_SIZE)
+    sizer.observe(_ADAPTIVE_MIN_PAGE_SIZE, 1024 * 1024 * 1024, 10.0)
+    assert sizer.size == _ADAPTIVE_MIN_PAGE_SIZE
+
+
+def test_adaptive_page_size_ignores_empty_pages():
+    from google.cloud.datastore.query import _AdaptivePageSize
+
+    sizer = _AdaptivePageSize(100)
+    sizer.observe(0, 0, 1.0)
+    sizer.observe(5, 0, 0.0)
+
+    assert sizer.size == 100
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_iterator__process_query_results(database_id):
     from google.cloud.datastore_v1.types import query as query_pb2
@@ -871,7 +1452,7 @@ def test_iterator__process_query_results(database_id):
         entity_pbs, cursor_as_bytes, more_results_enum, skipped_results
     )
     result = iterator._process_query_results(response_pb)
-    assert result == entity_pbs
+    assert [entity_result.entity for entity_result in result] == entity_pbs
 
     assert iterator._skipped_results == skipped_results
     assert iterator.next_page_token == cursor
@@ -893,7 +1474,7 @@ def test_iterator__process_query_results_done(database_id):
         entity_pbs, cursor_as_bytes, more_results_enum, skipped_results
     )
     result = iterator._process_query_results(response_pb)
-    assert result == entity_pbs
+    assert [entity_result.entity for entity_result in result] == entity_pbs
 
     assert iterator._skipped_results == skipped_results
     assert iterator.next_page_token is None
@@ -997,6 +1578,91 @@ def test_iterator__next_page_in_transaction(database_id):
     _next_page_helper(txn_id, database=database_id)
 
 
+def test_iterator__next_page_w_telemetry():
+    from google.cloud.datastore._telemetry import _InstrumentedDatastoreAPI
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    more_enum = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+    entity_pb = _make_entity("KIND", 1234, "prujekt")
+    ds_api = mock.MagicMock(spec=_InstrumentedDatastoreAPI)
+    ds_api.run_query.return_value = _make_query_response([entity_pb], b"", more_enum, 0)
+    client = _Client("prujekt", datastore_api=ds_api)
+    iterator = _make_iterator(_make_query(client), client)
+
+    iterator._next_page()
+
+    ds_api.span.assert_called_once_with(
+        "datastore.query.page", {"datastore.page_number": 0}
+    )
+    span = ds_api.span.return_value.__enter__.return_value
+    span.set_attribute.assert_called_once_with("datastore.results", 1)
+
+
+def test_iterator__next_page_w_hooks():
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.hooks import ClientHook
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    more_enum = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+    entity_pb = _make_entity("KIND", 1234, "prujekt")
+    response_pb = _make_query_response([entity_pb], b"", more_enum, 0)
+    client = _Client("prujekt", datastore_api=_make_datastore_api(response_pb))
+    hook = mock.Mock(spec=ClientHook)
+    client._hooks = (hook,)
+    iterator = _make_iterator(_make_query(client), client)
+
+    page = iterator._next_page()
+
+    # The page is decoded within the hooks.
+    (event,) = hook.post_decode.call_args[0]
+    hook.pre_decode.assert_called_once_with(event)
+    assert event.method == "run_query"
+    assert event.count == 1
+    (entity,) = list(page)
+    assert isinstance(entity, Entity)
+    assert entity.key.id == 1234
+
+
+def test_iterator__next_page_begins_transaction_later():
+    from google.cloud.datastore.transaction import Transaction
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    more_enum = query_pb2.QueryResultBatch.MoreResultsType.NOT_FINISHED
+    first = _make_query_response([], b"abc", more_enum, 0)
+    first.transaction = b"txn"
+    second = _make_query_response([], b"def", more_enum, 0)
+    ds_api = _make_datastore_api(first, second)
+    client = _Client("prujekt", datastore_api=ds_api)
+    transaction = Transaction(client, begin_later=True)
+    iterator = _make_iterator(_make_query(client), client, transaction=transaction)
+
+    iterator._next_page()
+    assert transaction.id == b"txn"
+    assert transaction._status == Transaction._IN_PROGRESS
+    iterator._next_page()
+
+    first_request, second_request = [
+        call[1]["request"] for call in ds_api.run_query.call_args_list
+    ]
+    assert first_request["read_options"].new_transaction == transaction._options
+    assert second_request["read_options"].transaction == b"txn"
+
+
+def test_iterator__next_page_failure_releases_transaction_begin():
+    from google.cloud.datastore.transaction import Transaction
+
+    ds_api = _make_datastore_api(RuntimeError("boom"))
+    client = _Client("prujekt", datastore_api=ds_api)
+    transaction = Transaction(client, begin_later=True)
+    iterator = _make_iterator(_make_query(client), client, transaction=transaction)
+
+    with pytest.raises(RuntimeError):
+        iterator._next_page()
+
+    assert not transaction._begin_pending
+    assert transaction._claim_begin() == transaction._options
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_iterator__next_page_w_read_time(database_id):
     read_time = datetime.datetime.utcfromtimestamp(1641058200.123456)
@@ -1126,6 +1792,73 @@ def test_iterator_explain_metrics(database_id):
     assert iterator.explain_metrics == ExplainMetrics._from_pb(expected_metrics)
 
 
+def test_iterator_sampled_by_query_profiler():
+    from google.cloud.datastore.query_profile import QueryProfiler
+    from google.cloud.datastore_v1.types import query_profile as query_profile_pb2
+
+    response_pb = _make_query_response([], b"", 0, 0)
+    response_pb.explain_metrics = query_profile_pb2.ExplainMetrics(
+        execution_stats=query_profile_pb2.ExecutionStats(read_operations=7)
+    )
+    ds_api = _make_datastore_api(response_pb)
+    client = _Client(None, datastore_api=ds_api)
+    client.query_profiler = QueryProfiler()
+    iterator = _make_iterator(Query(client, kind="Person"), client)
+
+    iterator._next_page()
+
+    request = ds_api.run_query.call_args[1]["request"]
+    assert request["explain_options"] == {"analyze": True}
+    (stats,) = client.query_profiler.stats().values()
+    assert stats.samples == 1
+    assert stats.read_operations == 7
+
+
+def test_iterator_sampled_by_query_profiler_w_multiple_pages():
+    from google.cloud.datastore.query_profile import QueryProfiler
+    from google.cloud.datastore_v1.types import entity as entity_pb2
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from google.cloud.datastore_v1.types import query_profile as query_profile_pb2
+
+    not_finished = query_pb2.QueryResultBatch.MoreResultsType.NOT_FINISHED
+    no_more = query_pb2.QueryResultBatch.MoreResultsType.NO_MORE_RESULTS
+    first_page = _make_query_response([entity_pb2.Entity()], b"cursor", not_finished, 0)
+    last_page = _make_query_response([entity_pb2.Entity()], b"", no_more, 0)
+    last_page.explain_metrics = query_profile_pb2.ExplainMetrics(
+        execution_stats=query_profile_pb2.ExecutionStats(
+            results_returned=2, read_operations=2
+        )
+    )
+    ds_api = _make_datastore_api(first_page, last_page)
+    client = _Client(None, datastore_api=ds_api)
+    client.query_profiler = QueryProfiler()
+    iterator = _make_iterator(Query(client, kind="Person"), client)
+
+    assert len(list(iterator)) == 2
+
+    assert ds_api.run_query.call_count == 2
+    for call in ds_api.run_query.call_args_list:
+        assert call[1]["request"]["explain_options"] == {"analyze": True}
+    (stats,) = client.query_profiler.stats().values()
+    assert stats.samples == 1
+    assert stats.results_returned == 2
+    assert stats.read_operations == 2
+
+
+def test_iterator_not_sampled_by_query_profiler():
+    from google.cloud.datastore.query_profile import QueryProfiler
+
+    ds_api = _make_datastore_api(_make_query_response([], b"", 0, 0))
+    client = _Client(None, datastore_api=ds_api)
+    client.query_profiler = QueryProfiler(sample_rate=0)
+    iterator = _make_iterator(Query(client), client)
+
+    iterator._next_page()
+
+    assert "explain_options" not in ds_api.run_query.call_args[1]["request"]
+    assert client.query_profiler.stats() == {}
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_iterator_explain_metrics_no_explain(database_id):
     """
@@ -1228,14 +1961,34 @@ def test_iterator_explain_analyze_access_before_complete(database_id):
 def test__item_to_entity():
     from google.cloud.datastore.query import _item_to_entity
 
-    entity_pb = mock.Mock()
-    entity_pb._pb = mock.sentinel.entity_pb
-    patch = mock.patch("google.cloud.datastore.helpers.entity_from_protobuf")
-    with patch as entity_from_protobuf:
-        result = _item_to_entity(None, entity_pb)
-        assert result is entity_from_protobuf.return_value
+    entity_result = mock.Mock()
+    patch = mock.patch("google.cloud.datastore.helpers.entity_from_result")
+    with patch as entity_from_result:
+        result = _item_to_entity(None, entity_result)
+        assert result is entity_from_result.return_value
+
+    entity_from_result.assert_called_once_with(entity_result)
+
+
+def test__item_to_entity_w_metadata():
+    import datetime
+
+    from google.cloud.datastore.query import _item_to_entity
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    update_time = datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    entity_result = query_pb2.EntityResult(
+        entity=_make_entity("Kind", 1234, "PROJECT"),
+        version=17,
+        update_time=update_time,
+    )
+
+    entity = _item_to_entity(None, entity_result)
 
-    entity_from_protobuf.assert_called_once_with(entity_pb)
+    assert entity.key.id == 1234
+    assert entity.version == 17
+    assert entity.update_time == update_time
+    assert entity.create_time is None
 
 
 def test_pb_from_query_empty():
@@ -1445,6 +2198,141 @@ def test_pb_from_query_distinct_on():
     assert [item.name for item in pb.distinct_on] == ["a", "b", "c"]
 
 
+def test_pb_from_query_find_nearest():
+    from google.cloud.datastore_v1.types import query as query_pb2
+    from google.cloud.datastore.query import _pb_from_query
+
+    query = _make_stub_query(kind="Doc", filters=[PropertyFilter("lang", "=", "en")])
+
+    result = query.find_nearest(
+        "embedding",
+        [0.5, 1],
+        "DOT_PRODUCT",
+        limit=10,
+        distance_result_property="score",
+        distance_threshold=0.75,
+    )
+
+    assert result is query
+    find_nearest = _pb_from_query(query).find_nearest
+    assert find_nearest.vector_property.name == "embedding"
+    assert find_nearest.query_vector.meaning == 31
+    values = find_nearest.query_vector.array_value.values
+    assert [value.double_value for value in values] == [0.5, 1.0]
+    assert (
+        find_nearest.distance_measure
+        == query_pb2.FindNearest.DistanceMeasure.DOT_PRODUCT
+    )
+    assert find_nearest.limit == 10
+    assert find_nearest.distance_result_property == "score"
+    assert find_nearest.distance_threshold == 0.75
+
+
+def test_pb_from_query_find_nearest_wo_options():
+    from google.cloud.datastore.helpers import Vector
+    from google.cloud.datastore.query import _pb_from_query
+
+    query = _make_stub_query(kind="Doc")
+    query.find_nearest("embedding", Vector([1.0]), "COSINE", limit=1)
+
+    pb = _pb_from_query(query)._pb
+    assert pb.find_nearest.distance_result_property == ""
+    assert not pb.find_nearest.HasField("distance_threshold")
+
+
+@pytest.mark.parametrize(
+    "distance_measure, limit", [("MANHATTAN", 5), ("EUCLIDEAN", 0), ("COSINE", 101)]
+)
+def test_query_find_nearest_invalid(distance_measure, limit):
+    query = _make_stub_query(kind="Doc")
+
+    with pytest.raises(ValueError):
+        query.find_nearest("embedding", [1.0], distance_measure, limit)
+
+
+def test_query_fetch_fan_out_w_find_nearest():
+    query = _make_query(_make_client(), filters=[PropertyFilter("a", "IN", [1, 2])])
+    query.find_nearest("embedding", [1.0], "EUCLIDEAN", 5)
+
+    with pytest.raises(ValueError):
+        query.fetch(fan_out=True)
+
+
+def test_pb_from_query_returns_independent_copies():
+    from google.cloud.datastore.query import _pb_from_query
+
+    query = _make_stub_query(kind="Kind", order=["a"])
+
+    pb_1 = _pb_from_query(query)
+    pb_1.limit = 5
+    pb_2 = _pb_from_query(query)
+
+    assert pb_1 is not pb_2
+    assert not pb_2._pb.HasField("limit")
+    assert pb_2.kind[0].name == "Kind"
+
+
+def test_pb_from_query_compiles_once():
+    from google.cloud.datastore import query as query_module
+
+    query = _make_stub_query(kind="Kind")
+    _pb_from_query = query_module._pb_from_query
+
+    with mock.patch.object(
+        query_module, "_compile_query_pb", wraps=query_module._compile_query_pb
+    ) as compile_pb:
+        _pb_from_query(query)
+        _pb_from_query(query)
+
+    compile_pb.assert_called_once_with(query)
+
+
+@pytest.mark.parametrize(
+    "mutate,check",
+    [
+        (lambda q: setattr(q, "kind", "Other"), lambda pb: pb.kind[0].name == "Other"),
+        (
+            lambda q: q.add_filter(filter=PropertyFilter("a", "=", 1)),
+            lambda pb: len(pb.filter.composite_filter.filters) == 1,
+        ),
+        (lambda q: setattr(q, "projection", ["a"]), lambda pb: len(pb.projection) == 1),
+        (
+            lambda q: q.keys_only(),
+            lambda pb: pb.projection[0].property.name == "__key__",
+        ),
+        (lambda q: setattr(q, "order", ["-a"]), lambda pb: len(pb.order) == 1),
+        (
+            lambda q: setattr(q, "distinct_on", ["a"]),
+            lambda pb: len(pb.distinct_on) == 1,
+        ),
+        (
+            lambda q: setattr(q, "ancestor", Key("Parent", 1, project=_PROJECT)),
+            lambda pb: len(pb.filter.composite_filter.filters) == 1,
+        ),
+    ],
+)
+def test_pb_from_query_invalidated_by_setters(mutate, check):
+    from google.cloud.datastore.query import _pb_from_query
+
+    query = _make_stub_query(kind="Kind")
+    _pb_from_query(query)
+
+    mutate(query)
+
+    assert check(_pb_from_query(query))
+
+
+def test_pb_from_query_invalidated_by_ancestor_deleter():
+    from google.cloud.datastore.query import _pb_from_query
+
+    query = _make_stub_query(ancestor=Key("Parent", 1, project=_PROJECT))
+    assert _pb_from_query(query).filter.composite_filter.filters
+
+    del query.ancestor
+
+    assert not _pb_from_query(query)._pb.HasField("filter")
+
+
 def _make_stub_query(
     client=object(),
     kind=None,
@@ -1484,6 +2372,7 @@ class _Client(object):
         self.database = database
         self.namespace = namespace
         self._transaction = transaction
+        self.query_profiler = None
 
     @property
     def current_transaction(self):
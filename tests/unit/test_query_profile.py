@@ -124,3 +124,109 @@ def test_explain_options__to_dict():
 
     assert ExplainOptions(analyze=True)._to_dict() == {"analyze": True}
     assert ExplainOptions(analyze=False)._to_dict() == {"analyze": False}
+
+
+def _make_analyze_metrics(results_returned, read_operations, seconds):
+    from google.cloud.datastore.query_profile import ExplainMetrics
+    from google.cloud.datastore_v1.types import query_profile as query_profile_pb2
+    from google.protobuf import duration_pb2
+
+    return ExplainMetrics._from_pb(
+        query_profile_pb2.ExplainMetrics(
+            plan_summary=query_profile_pb2.PlanSummary(),
+            execution_stats=query_profile_pb2.ExecutionStats(
+                results_returned=results_returned,
+                execution_duration=duration_pb2.Duration(seconds=seconds),
+                read_operations=read_operations,
+            ),
+        )
+    )
+
+
+def _make_query_request(value, limit=None):
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    query = query_pb2.Query(
+        kind=[query_pb2.KindExpression(name="Person")],
+        filter=query_pb2.Filter(
+            composite_filter=query_pb2.CompositeFilter(
+                op=query_pb2.CompositeFilter.Operator.AND,
+                filters=[
+                    query_pb2.Filter(
+                        property_filter=query_pb2.PropertyFilter(
+                            property=query_pb2.PropertyReference(name="age"),
+                            op=query_pb2.PropertyFilter.Operator.GREATER_THAN,
+                            value={"integer_value": value},
+                        )
+                    )
+                ],
+            )
+        ),
+    )
+    if limit is not None:
+        query.limit = limit
+    return {"query": query}
+
+
+def test_query_profiler_ctor_w_bad_sample_rate():
+    from google.cloud.datastore.query_profile import QueryProfiler
+
+    with pytest.raises(ValueError):
+        QueryProfiler(sample_rate=1.5)
+
+
+def test_query_profiler__explain_options():
+    from google.cloud.datastore.query_profile import ExplainOptions
+    from google.cloud.datastore.query_profile import QueryProfiler
+
+    explain_options = ExplainOptions()
+    assert QueryProfiler(sample_rate=0)._explain_options(None) is None
+    assert QueryProfiler()._explain_options(None) == ExplainOptions(analyze=True)
+    assert QueryProfiler()._explain_options(explain_options) is explain_options
+
+
+def test_query_profiler__record_aggregates_by_shape():
+    import datetime
+    import mock
+    from google.cloud.datastore.query_profile import ExplainMetrics
+    from google.cloud.datastore.query_profile import PlanSummary
+    from google.cloud.datastore.query_profile import QueryProfiler
+    from google.cloud.datastore.query_profile import QueryShapeStats
+
+    callback = mock.Mock(spec=[])
+    profiler = QueryProfiler(callback=callback)
+    first = _make_analyze_metrics(3, 4, 1)
+    profiler._record(_make_query_request(10, limit=5), first)
+    profiler._record(_make_query_request(20), _make_analyze_metrics(5, 6, 2))
+    # Metrics without execution stats are ignored.
+    profiler._record(
+        _make_query_request(30), ExplainMetrics(plan_summary=PlanSummary([]))
+    )
+
+    (shape,) = profiler.stats()
+    assert "Person" in shape
+    assert "age" in shape
+    assert "integer_value" not in shape
+    assert profiler.stats()[shape] == QueryShapeStats(
+        shape, 2, 8, 10, datetime.timedelta(seconds=3)
+    )
+    assert callback.call_count == 2
+    callback.assert_any_call(shape, first)
+
+    profiler.reset()
+    assert profiler.stats() == {}
+
+
+def test__query_shape_w_aggregation_query():
+    from google.cloud.datastore.query_profile import _query_shape
+    from google.cloud.datastore_v1.types import query as query_pb2
+
+    query = _make_query_request(10, limit=5)["query"]
+    aggregation_query = query_pb2.AggregationQuery(nested_query=query)
+
+    shape = _query_shape({"aggregation_query": aggregation_query})
+    assert shape.startswith("nested_query {")
+    assert "limit" not in shape
+    assert "integer_value" not in shape
+    # The request itself is left alone.
+    assert aggregation_query.nested_query.limit == 5
@@ -0,0 +1,108 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+
+def _make_recorder():
+    from google.cloud.datastore.rpc_stats import _RPCStatsRecorder
+
+    return _RPCStatsRecorder()
+
+
+def test_rpc_stats_error_rate():
+    from google.cloud.datastore.rpc_stats import RPCStats
+
+    stats = RPCStats("commit", 4, 1, 0, 0, None, None, None)
+    assert stats.error_rate == 0.25
+    assert RPCStats("commit", 0, 0, 0, 0, None, None, None).error_rate == 0.0
+
+
+@pytest.mark.parametrize("duration", [1e-7, 1e-3, 0.25, 3.0, 1e6])
+def test__bucket_index_bounds(duration):
+    from google.cloud.datastore.rpc_stats import _bucket_index
+    from google.cloud.datastore.rpc_stats import _bucket_upper_bound
+    from google.cloud.datastore.rpc_stats import _NUM_BUCKETS
+
+    index = _bucket_index(duration)
+    assert 0 <= index < _NUM_BUCKETS
+    if index < _NUM_BUCKETS - 1:
+        assert duration <= _bucket_upper_bound(index)
+        # Buckets are less than 10% wide.
+        assert _bucket_upper_bound(index) <= max(duration, 1e-6) * 1.1
+
+
+def test__percentile():
+    from google.cloud.datastore.rpc_stats import _bucket_index
+    from google.cloud.datastore.rpc_stats import _bucket_upper_bound
+    from google.cloud.datastore.rpc_stats import _percentile
+    from google.cloud.datastore.rpc_stats import _NUM_BUCKETS
+
+    latencies = [0] * _NUM_BUCKETS
+    assert _percentile(latencies, 0.5) is None
+
+    latencies[_bucket_index(0.01)] = 90
+    latencies[_bucket_index(1.0)] = 10
+    assert _percentile(latencies, 0.5) == _bucket_upper_bound(_bucket_index(0.01))
+    assert _percentile(latencies, 0.95) == _bucket_upper_bound(_bucket_index(1.0))
+
+
+def test_recorder_snapshot_empty():
+    assert _make_recorder().snapshot() == {}
+
+
+def test_recorder_record_and_snapshot():
+    recorder = _make_recorder()
+    for _ in range(99):
+        recorder.record("lookup", 0.01, 10, 100, False)
+    recorder.record("lookup", 2.0, 10, 0, True)
+    recorder.record("commit", 0.05, 50, 5, False)
+
+    stats = recorder.snapshot()
+
+    assert sorted(stats) == ["commit", "lookup"]
+    lookup = stats["lookup"]
+    assert lookup.method == "lookup"
+    assert lookup.calls == 100
+    assert lookup.errors == 1
+    assert lookup.error_rate == 0.01
+    assert lookup.bytes_sent == 1000
+    assert lookup.bytes_received == 9900
+    assert 0.01 <= lookup.latency_p50 <= 0.011
+    assert lookup.latency_p95 == lookup.latency_p50
+    assert lookup.latency_p99 == lookup.latency_p50
+    assert stats["commit"].calls == 1
+
+
+def test_recorder_merges_threads():
+    recorder = _make_recorder()
+
+    def work():
+        for _ in range(1000):
+            recorder.record("run_query", 0.001, 1, 1, False)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.record("run_query", 0.001, 1, 1, False)
+
+    assert recorder.snapshot()["run_query"].calls == 4001
+    # The exited threads' counters have been folded together.
+    assert len(recorder._shards) == 1
+    assert recorder._retired["run_query"].calls == 4000
+    assert recorder.snapshot()["run_query"].calls == 4001
@@ -0,0 +1,145 @@
+# Copyright 2026 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import mock
+import pytest
+
+READ_TIME = datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+
+
+def _make_snapshot(client, **kw):
+    from google.cloud.datastore.snapshot import Snapshot
+
+    return Snapshot(client, **kw)
+
+
+def test_snapshot_ctor_defaults():
+    from google.cloud.datastore.snapshot import _READ_TIME_MARGIN
+
+    client = mock.Mock(spec=[])
+    before = datetime.datetime.now(datetime.timezone.utc)
+    snapshot = _make_snapshot(client)
+    after = datetime.datetime.now(datetime.timezone.utc)
+
+    assert snapshot._client is client
+    assert before - _READ_TIME_MARGIN <= snapshot.read_time
+    assert snapshot.read_time <= after - _READ_TIME_MARGIN
+
+
+def test_snapshot_ctor_w_read_time():
+    snapshot = _make_snapshot(mock.Mock(spec=[]), read_time=READ_TIME)
+    assert snapshot.read_time == READ_TIME
+
+
+def test_snapshot_get():
+    client = mock.Mock(spec=["get"])
+    snapshot = _make_snapshot(client, read_time=READ_TIME)
+    key = mock.sentinel.key
+
+    assert snapshot.get(key, timeout=5) is client.get.return_value
+    client.get.assert_called_once_with(
+        key,
+        missing=None,
+        deferred=None,
+        retry=None,
+        timeout=5,
+        read_time=READ_TIME,
+        properties=None,
+    )
+
+
+def test_snapshot_get_multi():
+    client = mock.Mock(spec=["get_multi"])
+    snapshot = _make_snapshot(client, read_time=READ_TIME)
+    keys = [mock.sentinel.key]
+    missing = []
+
+    properties = ["name"]
+
+    assert (
+        snapshot.get_multi(keys, missing=missing, properties=properties)
+        is client.get_multi.return_value
+    )
+    client.get_multi.assert_called_once_with(
+        keys,
+        missing=missing,
+        deferred=None,
+        retry=None,
+        timeout=None,
+        read_time=READ_TIME,
+        properties=properties,
+    )
+
+
+def test_snapshot_fetch():
+    client = mock.Mock(spec=[])
+    snapshot = _make_snapshot(client, read_time=READ_TIME)
+    query = mock.Mock(spec=["fetch"])
+
+    assert snapshot.fetch(query, limit=3) is query.fetch.return_value
+    query.fetch.assert_called_once_with(client=client, read_time=READ_TIME, limit=3)
+
+
+def test_snapshot_run_aggregations():
+    client = mock.Mock(spec=["run_aggregations"])
+    snapshot = _make_snapshot(client, read_time=READ_TIME)
+    queries = [mock.sentinel.aggregation_query]
+
+    result = snapshot.run_aggregations(queries, max_workers=2)
+
+    assert result is client.run_aggregations.return_value
+    client.run_aggregations.assert_called_once_with(
+        queries, retry=None, timeout=None, read_time=READ_TIME, max_workers=2
+    )
+
+
+def test_snapshot_context_manager():
+    client = mock.Mock(spec=["get"])
+
+    with _make_snapshot(client, read_time=READ_TIME) as snapshot:
+        snapshot.get(mock.sentinel.key)
+
+    with pytest.raises(ValueError):
+        snapshot.get(mock.sentinel.key)
+    with pytest.raises(ValueError):
+        snapshot.__enter__()
+    client.get.assert_called_once()
+
+
+def test_snapshot_concurrent_reads_send_read_time():
+    import concurrent.futures
+
+    import google.auth.credentials
+    from google.cloud.datastore.client import Client
+    from google.cloud.datastore.key import Key
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
+    credentials = mock.Mock(spec=google.auth.credentials.Credentials)
+    client = Client(project="PROJECT", credentials=credentials, _http=object())
+    lookup = mock.Mock(return_value=datastore_pb2.LookupResponse(), spec=[])
+    client._datastore_api_internal = mock.Mock(lookup=lookup, spec=["lookup"])
+
+    keys = [Key("Kind", index, project="PROJECT") for index in range(1, 5)]
+    with client.snapshot(read_time=READ_TIME) as snapshot:
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(snapshot.get, keys))
+
+    assert results == [None] * 4
+    assert lookup.call_count == 4
+    for call in lookup.call_args_list:
+        read_options = call[1]["request"]["read_options"]
+        assert read_options.read_time == READ_TIME
+        assert not read_options.transaction
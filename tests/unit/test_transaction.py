@@ -102,6 +102,24 @@ def test_transaction_constructor_begin_later(database_id):
         xact._begin_with_id(expected_id)
 
 
+def test_transaction_constructor_w_previous_transaction():
+    from google.cloud.datastore_v1.types import TransactionOptions
+
+    client = _Client("PROJECT")
+    xact = _make_transaction(client, previous_transaction=b"prev")
+
+    expected = TransactionOptions(
+        read_write=TransactionOptions.ReadWrite(previous_transaction=b"prev")
+    )
+    assert xact._options == expected
+
+
+def test_transaction_constructor_read_only_w_previous_transaction():
+    client = _Client("PROJECT")
+    with pytest.raises(ValueError):
+        _make_transaction(client, read_only=True, previous_transaction=b"prev")
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_transaction_current(database_id):
     from google.cloud.datastore_v1.types import datastore as datastore_pb2
@@ -491,6 +509,30 @@ def test_transaction_put_read_only(database_id):
         xact.put(entity)
 
 
+@pytest.mark.parametrize(
+    "method, args",
+    [
+        ("increment", ()),
+        ("maximum", (1,)),
+        ("minimum", (1,)),
+        ("array_union", ([1],)),
+        ("array_remove", ([1],)),
+    ],
+)
+def test_transaction_transform_read_only(method, args):
+    from google.cloud.datastore.key import Key
+
+    project = "PROJECT"
+    ds_api = _make_datastore_api(xact_id=943243)
+    client = _Client(project, datastore_api=ds_api)
+    xact = _make_transaction(client, read_only=True)
+    xact.begin()
+
+    with pytest.raises(RuntimeError):
+        getattr(xact, method)(Key("Kind", 1, project=project), "prop", *args)
+    assert xact.mutations == []
+
+
 @pytest.mark.parametrize("database_id", [None, "somedb"])
 def test_transaction_put_w_begin_later(database_id):
     """
@@ -550,8 +592,10 @@ def test_transaction_rollback_no_begin(database_id):
 def test_transaction_commit_no_begin(database_id):
     """
     If commit is called without begin, and it has mutations staged,
-    should call begin before commit
+    should begin the transaction as part of the commit request
     """
+    from google.cloud.datastore_v1.types import datastore as datastore_pb2
+
     project = "PROJECT"
     id_ = 943243
     ds_api = _make_datastore_api(xact_id=id_)
@@ -562,9 +606,21 @@ def test_transaction_commit_no_begin(database_id):
         xact.put(entity)
         assert xact._status == xact._INITIAL
         with mock.patch.object(xact, "begin") as begin:
-            begin.side_effect = lambda: setattr(xact, "_status", xact._IN_PROGRESS)
             xact.commit()
-            begin.assert_called_once_with()
+            begin.assert_not_called()
+
+    assert xact._status == xact._FINISHED
+    ds_api.begin_transaction.assert_not_called()
+    mode = datastore_pb2.CommitRequest.Mode.TRANSACTIONAL
+    expected_request = {
+        "project_id": project,
+        "mode": mode,
+        "single_use_transaction": _make_options(),
+        "mutations": xact.mutations,
+    }
+    set_database_id_to_request(expected_request, database_id)
+    ds_api.commit.assert_called_once_with(request=expected_request)
+    assert xact._single_use_options is None
 
 
 @pytest.mark.parametrize("database_id", [None, "somedb"])